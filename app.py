@@ -1,14 +1,22 @@
-from flask import Flask, request, render_template_string, redirect, url_for
-import fitz#PyMuPDF
-from PIL import Image
+from flask import Flask, request, render_template, redirect, url_for, jsonify, Response, stream_template
+from markupsafe import Markup
 import pytesseract
-import os, uuid
+import os, uuid, zipfile
 from werkzeug.utils import secure_filename
+import motor_ocr
+import estaticos
+import uploads
+import lote_ocr
+import layout_ocr
+import fila_jobs
+import threading
 
 
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
 app = Flask(__name__)
+estaticos.configurar(app)
+uploads.configurar(app)
 
 
 INDEX_HTML = '''
@@ -31,6 +39,8 @@ INDEX_HTML = '''
     <form method="POST" action="/ocr" enctype="multipart/form-data">
       <input type="file" name="file" accept="image/*,.pdf" required>
       <br>
+      <label><input type="checkbox" name="stream" value="1" checked> Mostrar cada página assim que ficar pronta</label>
+      <br>
       <button type="submit">Processar OCR</button>
     </form>
   </div>
@@ -64,62 +74,7 @@ RESULT_HTML = '''
   <script src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js" async></script>
   <link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/antijingoist/open-dyslexic@master/open-dyslexic-regular.css">
   <link href="https://fonts.googleapis.com/css2?family=Atkinson+Hyperlegible&family=Lexend&display=swap" rel="stylesheet">
-  <link rel="stylesheet" href="/static/temas.css">
-
-  <style>
-    body {font-family: Verdana, Arial, sans-serif; line-height: 1.6; padding: 20px; background-color: #f0f0f0; color: #333;}
-
-    #accessibility-controls {position: sticky; top: 0; z-index: 1000; padding: 10px; margin-bottom: 20px; border: 1px solid; border-radius: 5px;}
-    body.normal-mode #accessibility-controls {background-color: #e0e0e0; border-color: #ccc; color: #000;}
-    body.dark-mode #accessibility-controls {background-color: #1e1e1e; border-color: #444; color: #fff;}
-    body.high-contrast-mode #accessibility-controls {background-color: #000; border-color: #00FF00; color: #00FF00;}
-
-    #accessibility-controls button,
-    #accessibility-controls select {margin: 0 5px; padding: 5px 10px; cursor: pointer;}
-
-    .page-content {background-color: #fff; padding: 15px; margin-bottom: 20px; border: 1px solid #ddd; border-radius: 3px;}
-    body.normal-mode {background-color: #f0f0f0; color: #333;}
-    body.dark-mode {background-color: #121212; color: #ffffff;}
-    body.high-contrast-mode {background-color: #000000;color: #00FF00;}
-    body.normal-mode .page-content {background-color: #ffffff;border-color: #dddddd;}
-    body.dark-mode .page-content {background-color: #1e1e1e;border-color: #444444;}
-    body.high-contrast-mode .page-content {background-color: #000000;border-color: #00FF00;}
-
-    h1, h2, h3 {border-bottom: 1px solid; padding-bottom: 0.3em;}
-    body.normal-mode h1, body.normal-mode h2, body.normal-mode h3 { color: #000; border-color: #eee;}
-    body.dark-mode h1, body.dark-mode h2, body.dark-mode h3 {color: #ffffff; border-color: #444;}
-    body.high-contrast-mode h1, body.high-contrast-mode h2, body.high-contrast-mode h3 {color: #00FF00; border-color: #00FF00;}
-
-    hr.page-separator {margin-top: 2em; margin-bottom: 2em; border: 1px dashed #ccc; }
-    hr.footnotes-separator { margin-top: 1.5em; margin-bottom: 1em; border-style: dotted; border-width: 1px 0 0 0; }
-
-    .footnotes-section { margin-top: 1em; padding-top: 0.5em; }
-    .footnotes-list { list-style-type: decimal; padding-left: 20px; font-size: 0.9em; }
-    .footnotes-list li { margin-bottom: 0.5em; }
-    .footnotes-list li a { text-decoration: none; }
-
-    .sr-only {
-        position: absolute;
-        width: 1px;
-        height: 1px;
-        padding: 0;
-        margin: -1px;
-        overflow: hidden;
-        clip: rect(0, 0, 0, 0);
-        white-space: nowrap;
-        border-width: 0;
-    }
-
-    p i, span i {color: #555; font-style: italic;}
-
-    sup > a {
-        text-decoration: none;
-        color: #0066cc;
-    }
-    sup > a:hover {
-        text-decoration: underline;
-    }
-  </style>
+  <link rel="stylesheet" href="{{ estatico('temas.css') }}">
 </head>
 
 <body class="normal-mode">
@@ -157,86 +112,39 @@ RESULT_HTML = '''
   <div class="page-content">
     <h1>Resultado do OCR</h1>
     <h2>{{ filename }}</h2>
+    {% if paginas is defined %}
+    {% for texto in paginas %}
+    <div class="pagina-ocr">{{ texto }}</div>
+    {% endfor %}
+    {% else %}
     <p>{{ text }}</p>
+    {% endif %}
     <a href="/">← Voltar</a>
   </div>
 
   <!-- TODOS OS SCRIPTS APÓS O DOM TER SIDO CARREGADO -->
-  <script>
-    // variáveis de controle
-    let currentFontSize = 16;
-    const fonts = ['Atkinson Hyperlegible','Lexend','OpenDyslexicRegular','Verdana','Arial','Times New Roman','Courier New'];
-    let currentFontIndex = 0;
-    const synth = window.speechSynthesis;
-    let utterance, isPaused = false;
-
-    // funções
-    function applyFontSize() {
-      document.querySelectorAll('.page-content').forEach(el => {
-        el.style.fontSize = currentFontSize + 'px';
-      });
-    }
-
-    function applyFontFamily() {
-      const ff = fonts[currentFontIndex];
-      document.querySelectorAll('.page-content').forEach(el => {
-        el.style.fontFamily = ff + ', sans-serif';
-      });
-    }
-
-    function changeTheme(mode) {
-      document.body.classList.remove('normal-mode','dark-mode','high-contrast-mode');
-      document.body.classList.add(mode + '-mode');
-    }
-
-    function getTextToSpeak() {
-      const sel = window.getSelection().toString();
-      if (sel) return sel;
-      return document.querySelector('.page-content').innerText;
-    }
-
-    function speak() {
-      const text = getTextToSpeak();
-      if (!text) return alert('Nada para ler');
-      if (synth.speaking) return;
-      utterance = new SpeechSynthesisUtterance(text);
-      utterance.lang = 'pt-BR';
-      synth.speak(utterance);
-    }
-
-    function pauseSpeech() { if (synth.speaking) { synth.pause(); isPaused = true; } }
-    function resumeSpeech() { if (isPaused) { synth.resume(); isPaused = false; } }
-    function stopSpeech() { synth.cancel(); isPaused = false; }
-
-    // eventos
-    document.getElementById('decreaseFont').onclick = () => { currentFontSize = Math.max(10, currentFontSize - 2); applyFontSize(); };
-    document.getElementById('increaseFont').onclick = () => { currentFontSize = Math.min(40, currentFontSize + 2); applyFontSize(); };
-    document.getElementById('fontSelector').onchange = e => { currentFontIndex = fonts.indexOf(e.target.value); applyFontFamily(); };
-
-    document.getElementById('play').onclick = () => { if (isPaused) resumeSpeech(); else speak(); };
-    document.getElementById('pause').onclick = pauseSpeech;
-    document.getElementById('stop').onclick = stopSpeech;
-
-    document.getElementById('themeSelector').onchange = e => { changeTheme(e.target.value); };
-
-    // inicialização
-    document.addEventListener('DOMContentLoaded', () => {
-      applyFontSize();
-      applyFontFamily();
-      changeTheme('normal');
-      document.getElementById('fontSelector').value = fonts[0];
-      document.getElementById('themeSelector').value = 'normal';
-    });
-  </script>
+  <script src="{{ estatico('leitor.js') }}"></script>
 </body>
 </html>
 
 '''
 
+# Compilados uma vez só: render_template_string recompila o template a cada requisição
+INDEX = app.jinja_env.from_string(INDEX_HTML)
+RESULT = app.jinja_env.from_string(RESULT_HTML)
+
+
+def _paginas_em_streaming(origem, nome):
+    """Gera o HTML de cada página (blocos do layout) assim que fica pronto"""
+    relatorio = []
+    for html_pagina, _ in layout_ocr.ocr_paginas_html(origem, relatorio=relatorio):
+        yield Markup(html_pagina)
+    print(f"OCR de {nome}: {motor_ocr.resumir_relatorio(relatorio)}")
+
 
 @app.route('/')
 def index():
-    return render_template_string(INDEX_HTML)
+    return render_template(INDEX)
 
 @app.route('/ocr', methods=['POST'])
 def ocr():
@@ -244,40 +152,103 @@ def ocr():
     if not uploaded:
         return redirect(url_for('index'))
 
-    # Nome seguro e pasta temporária
+    # Nome seguro
     original_name = secure_filename(uploaded.filename)
-    tmp_dir = 'tmp'
-    os.makedirs(tmp_dir, exist_ok=True)
-    tmp_name = f"tmp_{uuid.uuid4().hex}_{original_name}"
-    tmp_path = os.path.join(tmp_dir, tmp_name)
 
-    # Salva o arquivo temporário
-    uploaded.save(tmp_path)
+    # Bytes na memória ou caminho do temporário, se o upload passou do limite;
+    # o temporário é apagado no fim da requisição (uploads.RequisicaoUpload)
+    origem = uploads.conteudo(uploaded)
 
-    texts = []
     ext = os.path.splitext(original_name)[1].lower()
 
+    if ext == '.pdf' and request.form.get('stream'):
+        # Streaming: o navegador recebe cada página assim que o tesseract termina
+        pagina = stream_template(RESULT, filename=original_name,
+                                 paginas=_paginas_em_streaming(origem, original_name))
+        return Response(pagina, mimetype='text/html', headers={'X-Accel-Buffering': 'no'})
+
+    if ext == '.pdf':
+        # PDF: processa todas as páginas
+        # Páginas processadas em paralelo (texto nativo ou OCR), na ordem original
+        relatorio = []
+        paginas = list(layout_ocr.ocr_paginas_html(origem, relatorio=relatorio))
+        print(f"OCR de {original_name}: {motor_ocr.resumir_relatorio(relatorio)}")
+    else:
+        # Imagem única
+        paginas = [layout_ocr.ocr_imagem_html(origem)]
+
+    return render_template(RESULT, filename=original_name,
+                           paginas=[Markup(html_pagina) for html_pagina, _ in paginas])
+
+
+@app.route('/lote', methods=['POST'])
+def lote():
+    """Vários PDFs/imagens (ou um .zip deles) de uma vez: devolve um .zip com um HTML por arquivo"""
+    entradas = [(secure_filename(f.filename), uploads.conteudo(f))
+                for f in request.files.getlist('files') if f.filename]
     try:
-        if ext == '.pdf':
-            # PDF: processa todas as páginas
-            doc = fitz.open(tmp_path)
-            for page in doc:
-                pix = page.get_pixmap(dpi=200, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                txt = pytesseract.image_to_string(img, lang='por+eng')
-                texts.append(txt)
-            doc.close()
-        else:
-            # Imagem única
-            with Image.open(tmp_path) as img:
-                txt = pytesseract.image_to_string(img, lang='por+eng')
-                texts.append(txt)
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
-    full_text = "\n\n".join(texts)
-    return render_template_string(RESULT_HTML, filename=original_name, text=full_text)
+        entradas = lote_ocr.expandir_zips(entradas)
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify(erro=f"Zip inválido: {e}"), 400
+    if not entradas:
+        return jsonify(erro="Nenhum PDF ou imagem enviado."), 400
+
+    dados, resumo = lote_ocr.zip_de_html(entradas)
+    print(f"Lote: {resumo}")
+    return Response(dados, mimetype='application/zip',
+                    headers={'Content-Disposition': 'attachment; filename=lote_acessivel.zip'})
+
+
+# --- Fila de jobs: OCR fora da thread da requisição ---
+JOBS_DIR = 'jobs'
+_jobs = None
+_trava_jobs = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+
+
+def _job_ocr(parametros, progresso):
+    return "\n\n".join(motor_ocr.ocr_arquivo(parametros['caminho'], progresso))
+
+
+def obter_jobs():
+    """Fila de jobs do processo, criada no primeiro uso. Na importação ela subiria
+    também nos workers do motor_ocr, que no spawn (Windows, macOS) reimportam
+    este módulo, e cada um disputaria os jobs"""
+    global _jobs
+    with _trava_jobs:
+        if _jobs is None:
+            _jobs = fila_jobs.FilaJobs(os.path.join(JOBS_DIR, 'fila.sqlite3'),
+                                       workers=int(os.environ.get('JOBS_WORKERS', 2)))
+            _jobs.registrar('ocr', _job_ocr)
+    return _jobs
+
+
+@app.route('/jobs/ocr', methods=['POST'])
+def criar_job_ocr():
+    uploaded = request.files.get('file')
+    if not uploaded:
+        return jsonify(erro="Nenhum arquivo enviado."), 400
+
+    original_name = secure_filename(uploaded.filename)
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    caminho = os.path.join(JOBS_DIR, f"upload_{uuid.uuid4().hex}_{original_name}")
+    uploaded.save(caminho)
+
+    job_id = obter_jobs().enviar('ocr', {'caminho': caminho}, arquivos=[caminho])
+    return jsonify(id=job_id, status=url_for('status_job', job_id=job_id)), 202
+
+@app.route('/jobs/<job_id>')
+def status_job(job_id):
+    status = obter_jobs().status(job_id)
+    if status is None:
+        return jsonify(erro="Job não encontrado."), 404
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/cancelar', methods=['POST'])
+def cancelar_job(job_id):
+    if not obter_jobs().cancelar(job_id):
+        return jsonify(erro="Job não encontrado ou já finalizado."), 409
+    return jsonify(obter_jobs().status(job_id))
 
 if __name__ == '__main__':
+    obter_jobs()  # retoma já os jobs interrompidos pelo último reinício
     app.run(debug=True)
@@ -1,53 +1,44 @@
-from flask import Flask, request, render_template_string, redirect, url_for, send_file
-import fitz
-from PIL import Image
+from flask import Flask, request, render_template, redirect, url_for, jsonify, send_file, Response, stream_template
+from markupsafe import Markup
 import pytesseract
-import os, uuid # 'os' é importante aqui
+import os, uuid, zipfile # 'os' é importante aqui
 from werkzeug.utils import secure_filename
+import motor_ocr
+import estaticos
+import uploads
+import lote_ocr
+import layout_ocr
+import fila_jobs
+import threading
+import gemini_blocos
+import cliente_llm
+import cache_gemini
+import correcao_seletiva
+import prompt_gemini
+import documentos
+import servico_tts
+import audiolivro
 import google.generativeai as genai
 import json
-import speech_recognition as sr
-import pyttsx3
 import io
-from pydub import AudioSegment
-import tempfile # Ainda usaremos tempfile, mas direcionaremos sua base
+import time
+import audio_voz
+import reconhecimento_voz
 
 # --- Configurações Iniciais ---
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
 app = Flask(__name__)
+estaticos.configurar(app)
+uploads.configurar(app)
 
-genai.configure(api_key="")
-
-model = genai.GenerativeModel('models/gemini-2.0-flash')
-
-engine = pyttsx3.init()
-voices = engine.getProperty('voices')
-for voice in voices:
-    if "brazil" in voice.name.lower() or "portuguese" in voice.name.lower():
-        engine.setProperty('voice', voice.id)
-        break
-else:
-    engine.setProperty('voice', voices[0].id)
-engine.setProperty('rate', 150)
-engine.setProperty('volume', 1.0)
+# A voz (pyttsx3, pt-BR, 150 ppm) fica nos workers do servico_tts: um motor por
+# processo em vez de um global compartilhado pelas threads do Flask
 # --- Fim das Configurações Iniciais ---
 
-# --- Definição da Pasta Temporária Customizada ---
-# Pega o diretório do script atual e anexa 'temp_audios'
-# Isso garante que a pasta temporária seja relativa ao seu projeto
-CUSTOM_TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_audios')
-
-# Garante que o diretório exista. Se não existir, ele será criado.
-os.makedirs(CUSTOM_TEMP_DIR, exist_ok=True)
-
-# Opcional: Define a variável de ambiente TEMP para a sua pasta customizada
-# Isso faz com que 'tempfile' use essa pasta por padrão para tudo,
-# mas podemos ser mais específicos na rota.
-# os.environ['TMPDIR'] = CUSTOM_TEMP_DIR # Para sistemas Unix-like
-# os.environ['TEMP'] = CUSTOM_TEMP_DIR   # Para Windows
-# os.environ['TMP'] = CUSTOM_TEMP_DIR    # Para Windows
-# ^^^ Comentadas, pois vamos passar 'dir' diretamente para NamedTemporaryFile
+# O áudio da pergunta é decodificado em memória (audio_voz): sem WAV temporário em disco
+# Reconhecimento: RECONHECIMENTO_BACKEND=google (padrão), vosk (offline) ou auto;
+# o modelo local começa a carregar já na subida do servidor (bloco __main__)
 
 INDEX_HTML = '''
 <!DOCTYPE html>
@@ -66,6 +57,7 @@ INDEX_HTML = '''
     <form method="POST" action="/ocr" enctype="multipart/form-data">
         <label>Escolha um arquivo PDF ou imagem:</label><br>
         <input type="file" name="file" accept="image/*,.pdf" required><br><br>
+        <label><input type="checkbox" name="stream" value="1" checked> Mostrar cada página assim que ficar pronta</label><br><br>
         <button type="submit">📄 Processar OCR</button>
     </form>
 </div>
@@ -79,91 +71,11 @@ RESULT_HTML = '''
 <head>
   <meta charset="UTF-8">
   <title>{{ filename }}</title>
-  <script src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js" async></script>
+  <script src="{{ estatico('fragmentos.js') }}"></script>
+  <script src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js" async></script>
   <link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/antijingoist/open-dyslexic@master/open-dyslexic-regular.css">
   <link href="https://fonts.googleapis.com/css2?family=Atkinson+Hyperlegible&family=Lexend&display=swap" rel="stylesheet">
-  <style>
-    body { font-family: Verdana, Arial, sans-serif; line-height: 1.6; padding: 20px; background-color: #f0f0f0; color: #333; }
-
-    #accessibility-controls {
-      position: sticky; top: 0; z-index: 1000;
-      padding: 10px; margin-bottom: 20px;
-      border: 1px solid; border-radius: 5px;
-    }
-
-    body.normal-mode #accessibility-controls {
-      background-color: #e0e0e0; border-color: #ccc; color: #000;
-    }
-
-    body.dark-mode #accessibility-controls {
-      background-color: #1e1e1e; border-color: #444; color: #fff;
-    }
-
-    body.high-contrast-mode #accessibility-controls {
-      background-color: #000; border-color: #00FF00; color: #00FF00;
-    }
-
-    #accessibility-controls button,
-    #accessibility-controls select {
-      margin: 0 5px; padding: 5px 10px; cursor: pointer;
-    }
-
-    .page-content {
-      background-color: #fff; padding: 15px;
-      margin-bottom: 20px; border: 1px solid #ddd;
-      border-radius: 3px;
-    }
-
-    body.normal-mode { background-color: #f0f0f0; color: #333; }
-    body.dark-mode { background-color: #121212; color: #ffffff; }
-    body.high-contrast-mode { background-color: #000000; color: #00FF00; }
-
-    body.normal-mode .page-content { background-color: #ffffff; border-color: #dddddd; }
-    body.dark-mode .page-content { background-color: #1e1e1e; border-color: #444444; }
-    body.high-contrast-mode .page-content { background-color: #000000; border-color: #00FF00; }
-
-    h1, h2, h3 {
-      border-bottom: 1px solid; padding-bottom: 0.3em;
-    }
-
-    body.normal-mode h1, body.normal-mode h2, body.normal-mode h3 {
-      color: #000; border-color: #eee;
-    }
-
-    body.dark-mode h1, body.dark-mode h2, body.dark-mode h3 {
-      color: #fff; border-color: #444;
-    }
-
-    body.high-contrast-mode h1, body.high-contrast-mode h2, body.high-contrast-mode h3 {
-      color: #00FF00; border-color: #00FF00;
-    }
-
-    hr.page-separator {
-      margin-top: 2em; margin-bottom: 2em;
-      border: 1px dashed #ccc;
-    }
-
-    hr.footnotes-separator {
-      margin-top: 1.5em; margin-bottom: 1em;
-      border-style: dotted; border-width: 1px 0 0 0;
-    }
-
-    .footnotes-section { margin-top: 1em; padding-top: 0.5em; }
-    .footnotes-list { list-style-type: decimal; padding-left: 20px; font-size: 0.9em; }
-    .footnotes-list li { margin-bottom: 0.5em; }
-    .footnotes-list li a { text-decoration: none; }
-
-    .sr-only {
-      position: absolute; width: 1px; height: 1px;
-      padding: 0; margin: -1px; overflow: hidden;
-      clip: rect(0, 0, 0, 0); white-space: nowrap; border-width: 0;
-    }
-
-    p i, span i { color: #555; font-style: italic; }
-
-    sup > a { text-decoration: none; color: #0066cc; }
-    sup > a:hover { text-decoration: underline; }
-  </style>
+  <link rel="stylesheet" href="{{ estatico('temas.css') }}">
 </head>
 
 <body class="normal-mode">
@@ -200,262 +112,229 @@ RESULT_HTML = '''
 
     <button id="talkToAI">🗣️ Falar com IA</button>
     <span id="recordingStatus" style="margin-left: 10px; color: red;"></span>
+
+    <button id="audiolivro">🎧 Audiolivro</button>
   </div>
 
-    <div class="page-content">
+    <div id="painel-audiolivro" hidden>
+    <audio id="player-audiolivro" controls preload="metadata"></audio>
+    <ol id="indice-audiolivro" aria-label="Parágrafos do audiolivro"></ol>
+  </div>
+
+    <div class="page-content">
     <h1>Resultado OCR – {{ filename }}</h1>
+    {% if paginas is defined %}
+    {% for texto in paginas %}
+    <div class="pagina-ocr">{{ texto }}</div>
+    {% endfor %}
+    {% elif fragmentos is defined %}
+    <div id="resultado-ia" aria-busy="true">
+    {% for fragmento in fragmentos %}
+    <div class="fragmento-ia">{{ fragmento }}</div><script>tipografarFragmento(document.currentScript)</script>
+    {% endfor %}
+    </div>
+    {% else %}
     <div>{{ text|safe }}</div>
+    {% endif %}
 
     <form method="POST" action="/gerar_html">
-      <input type="hidden" name="ocr_texto" value="{{ text|e }}">
-      <button type="submit">🧠 Reestruturar com IA (Gemini)</button>
+      <input type="hidden" name="documento_id" value="{{ documento_id }}">
+      <input type="hidden" name="stream" value="1">
+      <button type="submit" {% if paginas is defined or fragmentos is defined %}disabled{% endif %}>🧠 Reestruturar com IA (Gemini)</button>
     </form>
+    {% if paginas is defined or fragmentos is defined %}
+    <script>
+      // Streaming: todas as páginas (ou fragmentos) chegaram e o documento já está salvo no servidor
+      document.getElementById('resultado-ia')?.setAttribute('aria-busy', 'false');
+      document.querySelector('form[action="/gerar_html"] button').disabled = false;
+    </script>
+    {% endif %}
 
     <div class="actions">
       <a href="/">← Voltar</a>
     </div>
   </div>
 
-    <script>
-    let currentFontSize = 16;
-    const fonts = ['Atkinson Hyperlegible','Lexend','OpenDyslexicRegular','Verdana','Arial','Times New Roman','Courier New'];
-    let currentFontIndex = 0;
-    const synth = window.speechSynthesis;
-    let utterance, isPaused = false;
-    let mediaRecorder;
-    let audioChunks = [];
-    const talkToAIButton = document.getElementById('talkToAI');
-    const recordingStatus = document.getElementById('recordingStatus');
-
-    function applyFontSize() {
-      document.querySelectorAll('.page-content').forEach(el => {
-        el.style.fontSize = currentFontSize + 'px';
-      });
-    }
-
-    function applyFontFamily() {
-      const ff = fonts[currentFontIndex];
-      document.querySelectorAll('.page-content').forEach(el => {
-        el.style.fontFamily = ff + ', sans-serif';
-      });
-    }
-
-    function changeTheme(mode) {
-      document.body.classList.remove('normal-mode','dark-mode','high-contrast-mode');
-      document.body.classList.add(mode + '-mode');
-    }
-
-    function getTextToSpeak() {
-      const sel = window.getSelection().toString();
-      return sel || document.querySelector('.page-content').innerText;
-    }
-
-    function speak() {
-      const text = getTextToSpeak();
-      if (!text) return alert('Nada para ler');
-      if (synth.speaking) return;
-      utterance = new SpeechSynthesisUtterance(text);
-      utterance.lang = 'pt-BR';
-      synth.speak(utterance);
-    }
-
-    function pauseSpeech() { if (synth.speaking) { synth.pause(); isPaused = true; } }
-    function resumeSpeech() { if (isPaused) { synth.resume(); isPaused = false; } }
-    function stopSpeech() { synth.cancel(); isPaused = false; }
-
-    document.getElementById('decreaseFont').onclick = () => {
-      currentFontSize = Math.max(10, currentFontSize - 2);
-      applyFontSize();
-    };
-    document.getElementById('increaseFont').onclick = () => {
-      currentFontSize = Math.min(40, currentFontSize + 2);
-      applyFontSize();
-    };
-    document.getElementById('fontSelector').onchange = e => {
-      currentFontIndex = fonts.indexOf(e.target.value);
-      applyFontFamily();
-    };
-
-    document.getElementById('play').onclick = () => {
-      if (isPaused) resumeSpeech();
-      else speak();
-    };
-    document.getElementById('pause').onclick = pauseSpeech;
-    document.getElementById('stop').onclick = stopSpeech;
-
-    document.getElementById('themeSelector').onchange = e => {
-      changeTheme(e.target.value);
-    };
-
-    function copyText() {
-      const text = document.querySelector('.page-content').innerText;
-      navigator.clipboard.writeText(text).then(() => alert('Texto copiado!'));
-    }
-
-    function saveHTML() {
-      const content = document.documentElement.outerHTML;
-      const blob = new Blob([content], { type: 'text/html' });
-      const link = document.createElement('a');
-      link.href = URL.createObjectURL(blob);
-      link.download = 'documento_acessivel.html';
-      link.click();
-    }
-
-    // LÓGICA PARA INTERAÇÃO COM A IA POR VOZ - AJUSTADA PARA GARANTIR COMPATIBILIDADE
-    talkToAIButton.onclick = async () => {
-        if (mediaRecorder && mediaRecorder.state === 'recording') {
-            mediaRecorder.stop();
-            talkToAIButton.textContent = '🗣️ Falar com IA';
-            recordingStatus.textContent = '';
-        } else {
-            try {
-                const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
-                
-                // Definir o mimeType para WebM com Opus, que é um formato eficiente e amplamente suportado
-                // pelo MediaRecorder e que o pydub consegue lidar bem.
-                const options = { mimeType: 'audio/webm;codecs=opus' };
-                mediaRecorder = new MediaRecorder(stream, options);
-                
-                audioChunks = [];
-
-                mediaRecorder.ondataavailable = event => {
-                    audioChunks.push(event.data);
-                };
-
-                mediaRecorder.onstop = async () => {
-                    const audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType }); // Usa o tipo MIME real da gravação
-                    const formData = new FormData();
-                    formData.append('audio', audioBlob, 'query.webm'); // Envia como .webm
-
-                    recordingStatus.textContent = 'Enviando e processando...';
-
-                    try {
-                        const response = await fetch('/ask_ai_voice', {
-                            method: 'POST',
-                            body: formData
-                        });
-
-                        if (response.ok) {
-                            const audioResponseBlob = await response.blob();
-                            const audioUrl = URL.createObjectURL(audioResponseBlob);
-                            const audio = new Audio(audioUrl);
-                            audio.onended = () => {
-                                recordingStatus.textContent = 'Pronto!';
-                            };
-                            audio.play();
-                        } else {
-                            const errorText = await response.text();
-                            recordingStatus.textContent = `Erro: ${errorText}`;
-                            alert('Erro ao se comunicar com a IA: ' + errorText);
-                        }
-                    } catch (error) {
-                        recordingStatus.textContent = `Erro de rede: ${error.message}`;
-                        console.error('Erro ao enviar áudio para a IA:', error);
-                        alert('Erro de conexão ao enviar áudio.');
-                    } finally {
-                        stream.getTracks().forEach(track => track.stop()); // Para o microfone
-                    }
-                };
-
-                mediaRecorder.start();
-                talkToAIButton.textContent = '🔴 Parar Gravação';
-                recordingStatus.textContent = 'Gravando...';
-            } catch (error) {
-                console.error('Erro ao acessar o microfone:', error);
-                alert('Não foi possível acessar o microfone. Verifique as permissões.');
-            }
-        }
-    };
-
-
-    document.addEventListener('DOMContentLoaded', () => {
-      applyFontSize();
-      applyFontFamily();
-      changeTheme('normal');
-      document.getElementById('fontSelector').value = fonts[0];
-      document.getElementById('themeSelector').value = 'normal';
-    });
-  </script>
+    <script src="{{ estatico('leitor.js') }}"></script>
+    <script src="{{ estatico('voz.js') }}"></script>
+    <script src="{{ estatico('audiolivro.js') }}"></script>
 </body>
 </html>
 '''
 
+# Compilados uma vez só: render_template_string recompila o template a cada requisição
+INDEX = app.jinja_env.from_string(INDEX_HTML)
+RESULT = app.jinja_env.from_string(RESULT_HTML)
+
+
+# Gemini: o cliente nasce no primeiro uso. Os workers dos pools do motor_ocr e
+# do servico_tts reimportam este módulo no spawn (Windows, macOS) e não precisam dele
+MODELO_GEMINI = 'models/gemini-2.0-flash'
+_modelos = {}
+_trava_modelos = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+
+
+def _modelo(instrucoes=None):
+    """Um cliente só para o processo (limite de chamadas em voo, taxa, timeout e
+    novas tentativas) ou, com `instrucoes`, um derivado com as instruções fixas
+    (prompt_gemini) fora do prompt de cada chamada, com as mesmas vagas e taxa"""
+    with _trava_modelos:
+        if None not in _modelos:
+            genai.configure(api_key="")  # Usa a chave da variável de ambiente
+            _modelos[None] = cliente_llm.ClienteLLM(genai.GenerativeModel(MODELO_GEMINI))
+        if instrucoes not in _modelos:
+            _modelos[instrucoes] = _modelos[None].derivado(
+                prompt_gemini.ModeloComInstrucoes(MODELO_GEMINI, instrucoes))
+        return _modelos[instrucoes]
+
+
+# Blocos do tamanho que cabe no orçamento de tokens por requisição
+CARACTERES_BLOCO_HTML = prompt_gemini.caracteres_por_bloco(prompt_gemini.PROMPT_HTML)
+CARACTERES_BLOCO_CORRECAO = prompt_gemini.caracteres_por_bloco(prompt_gemini.PROMPT_CORRECAO)
+
 
 def gerar_html_acessivel_com_gemini(texto_ocr):
-    prompt = f"""
-    Você é uma IA que transforma textos escaneados via OCR em documentos HTML acessíveis.
-    Suas tarefas incluem:
-    - Corrigir erros de OCR
-    - Detectar e formatar títulos, listas, tabelas e seções
-    - Converter equações para LaTeX (exibidas com MathJax)
-    - Estruturar o conteúdo com marcação HTML limpa
-    - Tornar o conteúdo ideal para leitores de tela
-    Você atuará como um conversor de expressões matemáticas para uma versão descritiva, em linguagem natural, ideal para leitores de tela e acessibilidade web.
-    O conteúdo a seguir é extraído por OCR a partir de documentos didáticos contendo expressões matemáticas (como derivadas, limites, integrais, funções, matrizes, planilhas etc).
-    Sua tarefa é:
-    1. Corrigir qualquer erro ortográfico ou de OCR;
-    2. Converter expressões matemáticas para texto descritivo, seguindo os exemplos abaixo;
-    3. Manter o conteúdo formatado com marcação HTML simples e/ou MathJax (`\( ... \)` para inline e `$$ ... $$` para blocos);
-    4. Retornar o resultado em **HTML completo**, pronto para ser exibido em navegadores com suporte a leitores automáticos.
-    ### Exemplo de Conversões:
-    `f(x) = x^2 + 1` → `A função f de x é igual a x ao quadrado mais um. Escrito como \( f(x) = x^2 + 1 \)`
-    `lim x→0 f(x)` → `O limite de f de x quando x tende a zero. Escrito como 
-    `∫x^2 dx` → `A integral de x ao quadrado em relação a x. Escrito como
-    `2,34` → `dois vírgula três quatro`
-    `Matriz [[1, 2], [3, 4]]` → `Matriz de duas linhas e duas colunas com os elementos: primeira linha um e dois, segunda linha três e quatro`
-    `f'(x)` → `Derivada da função f em relação a x. Escrito como \( f'(x) \)`
-    `|x|` → `Valor absoluto de x. Escrito como \( |x| \)`
-    `Δx` → `Variação de x. Escrito como \( \Delta x \)`
-    ### Importante:
-    - Sempre que possível, forneça as duas formas: descritiva e matemática.
-- Mantenha títulos, subtítulos e parágrafos intactos, substituindo apenas os trechos matemáticos ou ambíguos.
-- Conserve os separadores visuais e use HTML para listas, ênfases e headings.
-- Retorne o resultado em HTML **completo** entre `<html>...</html>`.
-
-    Gere o corpo HTML (sem <html> ou <head>), apenas o conteúdo principal com marcação semântica:
-
-
-    Texto OCR:
-    \"\"\"{texto_ocr}\"\"\"
-    """
-
-    response = model.generate_content(prompt)
+    prompt = prompt_gemini.montar(prompt_gemini.TEXTO_HTML, texto_ocr, prompt_gemini.INSTRUCOES_HTML)
+
+    response = _modelo(prompt_gemini.INSTRUCOES_HTML).generate_content(prompt)
+    return response.text
+
+
+def gerar_html_acessivel_em_fluxo(texto_ocr):
+    prompt = prompt_gemini.montar(prompt_gemini.TEXTO_HTML, texto_ocr, prompt_gemini.INSTRUCOES_HTML)
+
+    for pedaco in _modelo(prompt_gemini.INSTRUCOES_HTML).generate_content(prompt, stream=True):
+        yield pedaco.text
+
+
+# Mesmo texto, modelo, prompt e conversor de matemática: a resposta sai do cache em disco
+gerar_html_com_cache = cache_gemini.memoizar(gerar_html_acessivel_com_gemini, MODELO_GEMINI,
+                                             prompt_gemini.PROMPT_HTML, prompt_gemini.VERSAO_TEXTO)
+gerar_html_em_fluxo_com_cache = cache_gemini.memoizar_fluxo(gerar_html_acessivel_em_fluxo, MODELO_GEMINI,
+                                                           prompt_gemini.PROMPT_HTML, prompt_gemini.VERSAO_TEXTO)
+
+
+# Correção seletiva (correcao_seletiva): só os trechos duvidosos do OCR, numerados
+def corrigir_trechos_com_gemini(trechos):
+    prompt = prompt_gemini.montar(prompt_gemini.TEXTO_CORRECAO, trechos, prompt_gemini.INSTRUCOES_CORRECAO)
+    response = _modelo(prompt_gemini.INSTRUCOES_CORRECAO).generate_content(prompt)
     return response.text
 
+
+corrigir_com_cache = cache_gemini.memoizar(corrigir_trechos_com_gemini, MODELO_GEMINI,
+                                           prompt_gemini.PROMPT_CORRECAO, prompt_gemini.VERSAO_TEXTO)
+
+
+def _reestruturar(texto_ocr, documento_id=None, progresso=None):
+    """HTML acessível do documento. Com o layout guardado, só os trechos duvidosos
+    vão para o Gemini; sem ele, o texto inteiro vai em blocos paralelos"""
+    estrutura = None
+    if documento_id and correcao_seletiva.SELETIVA:
+        estrutura = documentos.obter_estrutura(documento_id)
+    if estrutura:
+        estatisticas = {}
+        html_resultado = correcao_seletiva.gerar_html(estrutura, corrigir_com_cache, progresso=progresso,
+                                                      max_caracteres=CARACTERES_BLOCO_CORRECAO,
+                                                      estatisticas=estatisticas)
+        print(correcao_seletiva.resumir(estatisticas))
+        return html_resultado
+    return gemini_blocos.gerar_html_em_blocos(texto_ocr, gerar_html_com_cache, progresso=progresso,
+                                              max_caracteres=CARACTERES_BLOCO_HTML)
+
+
+def _reestruturar_em_fluxo(texto_ocr, documento_id=None):
+    """Como _reestruturar, mas gera o HTML (saneado) aos pedaços: página a página
+    na correção seletiva; sem layout, o primeiro bloco sai em streaming do modelo"""
+    estrutura = None
+    if documento_id and correcao_seletiva.SELETIVA:
+        estrutura = documentos.obter_estrutura(documento_id)
+    if estrutura:
+        estatisticas = {}
+        yield from correcao_seletiva.paginas_html(estrutura, corrigir_com_cache,
+                                                  max_caracteres=CARACTERES_BLOCO_CORRECAO,
+                                                  estatisticas=estatisticas)
+        print(correcao_seletiva.resumir(estatisticas))
+        return
+    yield from gemini_blocos.gerar_fragmentos_em_fluxo(texto_ocr, gerar_html_em_fluxo_com_cache,
+                                                       gerar_html_com_cache, max_caracteres=CARACTERES_BLOCO_HTML)
+
+
+def _fragmentos_em_streaming(texto_ocr, documento_id, novo_id):
+    """Gera cada fragmento do HTML reestruturado assim que fica pronto; no fim
+    guarda o documento completo no servidor"""
+    fragmentos = []
+    try:
+        for fragmento in _reestruturar_em_fluxo(texto_ocr, documento_id):
+            fragmentos.append(fragmento)
+            yield Markup(fragmento)
+    except Exception as e:
+        # Os cabeçalhos já foram enviados: o erro só pode ir no corpo da página
+        print(f"\033[31mErro ao reestruturar em streaming: {e}\033[0m")
+        yield Markup('<p role="alert">A reestruturação foi interrompida por um erro. Tente novamente.</p>')
+    documentos.guardar('\n'.join(fragmentos), novo_id)
+
+def _prompt_voz(text_input):
+    return f"O usuário perguntou: '{text_input}'. Responda de forma concisa e útil."
+
+MENSAGEM_ERRO_VOZ = "Desculpe, tive um problema ao gerar a resposta de áudio."
+
 # Nova função para interagir com a IA por voz
-def ask_gemini_and_get_audio(text_input):
-    prompt = f"O usuário perguntou: '{text_input}'. Responda de forma concisa e útil."
-    ai_response = model.generate_content(prompt).text
+def ask_gemini_and_get_audio(text_input, tempos=None):
+    tempos = {} if tempos is None else tempos
+    inicio = time.perf_counter()
+    ai_response = _modelo().generate_content(_prompt_voz(text_input)).text
+    tempos['gemini'] = time.perf_counter() - inicio
 
-    audio_buffer = io.BytesIO()
+    inicio = time.perf_counter()
     try:
-        # Usa a pasta temporária customizada para o pyttsx3 também
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".wav", dir=CUSTOM_TEMP_DIR) as fp:
-            engine.save_to_file(ai_response, fp.name)
-            engine.runAndWait()
-            fp.seek(0)
-            audio_buffer.write(fp.read())
-        audio_buffer.seek(0)
+        # WAV em memória, sintetizado por um worker do pool de TTS
+        audio_buffer = io.BytesIO(servico_tts.sintetizar(ai_response))
     except Exception as e:
-        print(f"Erro ao gerar áudio com pyttsx3: {e}")
-        error_message = "Desculpe, tive um problema ao gerar a resposta de áudio."
+        print(f"Erro ao gerar áudio: {e}")
+        error_message = MENSAGEM_ERRO_VOZ
         try:
-            with tempfile.NamedTemporaryFile(delete=True, suffix=".wav", dir=CUSTOM_TEMP_DIR) as fp:
-                engine.save_to_file(error_message, fp.name)
-                engine.runAndWait()
-                fp.seek(0)
-                audio_buffer.write(fp.read())
-            audio_buffer.seek(0)
+            audio_buffer = io.BytesIO(servico_tts.sintetizar(error_message))
         except Exception as inner_e:
             print(f"Erro ao gerar mensagem de erro de áudio de fallback: {inner_e}")
             audio_buffer = io.BytesIO()
         ai_response = error_message
+    tempos['tts'] = time.perf_counter() - inicio
 
     return audio_buffer, ai_response
 
+def audio_em_segmentos(text_input):
+    """Resposta falada em fluxo: o Gemini responde em streaming, cada frase vira um
+    WAV assim que termina e sai enquadrada (servico_tts.segmento) para o voz.js"""
+    resposta = _modelo().generate_content(_prompt_voz(text_input), stream=True)
+    pedacos = (parte.text for parte in resposta)
+    for wav in servico_tts.falar_em_fluxo(pedacos, mensagem_erro=MENSAGEM_ERRO_VOZ):
+        yield servico_tts.segmento(wav)
+
+def _paginas_em_streaming(origem, nome, documento_id):
+    """Gera o HTML de cada página assim que fica pronto; no fim guarda o documento
+    completo (texto e estrutura) no servidor"""
+    relatorio = []
+    texts = []
+    estrutura = []
+    for html_pagina, texto in layout_ocr.ocr_paginas_html(origem, relatorio=relatorio, estrutura=estrutura):
+        texts.append(texto)
+        yield Markup(html_pagina)
+    documentos.guardar("\n\n".join(texts), documento_id)
+    if estrutura:
+        documentos.guardar_estrutura(estrutura, documento_id)
+    print(f"OCR de {nome}: {motor_ocr.resumir_relatorio(relatorio)}")
+
+def _texto_do_formulario():
+    """Texto a reestruturar: pelo ID do documento guardado no servidor ou, para
+    clientes que ainda mandam o texto inteiro, pelo campo ocr_texto"""
+    documento_id = request.form.get('documento_id')
+    if documento_id:
+        return documentos.obter(documento_id)
+    return request.form.get('ocr_texto', '')
+
 @app.route('/')
 def index():
-    return render_template_string(INDEX_HTML)
+    return render_template(INDEX)
 
 @app.route('/ocr', methods=['POST'])
 def ocr():
@@ -464,44 +343,243 @@ def ocr():
         return redirect(url_for('index'))
 
     original_name = secure_filename(uploaded.filename)
-    tmp_dir = 'tmp' # Esta é para OCR, pode manter separada ou integrar na nova, mas é diferente da de áudio
-    os.makedirs(tmp_dir, exist_ok=True)
-    tmp_name = f"tmp_{uuid.uuid4().hex}_{original_name}"
-    tmp_path = os.path.join(tmp_dir, tmp_name)
-    uploaded.save(tmp_path)
+    # Bytes na memória ou caminho do temporário, se o upload passou do limite;
+    # o temporário é apagado no fim da requisição (uploads.RequisicaoUpload)
+    origem = uploads.conteudo(uploaded)
 
-    texts = []
     ext = os.path.splitext(original_name)[1].lower()
 
-    try:
-        if ext == '.pdf':
-            doc = fitz.open(tmp_path)
-            for page in doc:
-                pix = page.get_pixmap(dpi=200, alpha=False)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                txt = pytesseract.image_to_string(img, lang='por+eng')
-                texts.append(txt)
-            doc.close()
-        else:
-            with Image.open(tmp_path) as img:
-                txt = pytesseract.image_to_string(img, lang='por+eng')
-                texts.append(txt)
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
-    full_text = "\n\n".join(texts)
-    return render_template_string(RESULT_HTML, filename=original_name, text=full_text)
+    if ext == '.pdf' and request.form.get('stream'):
+        # Streaming: o navegador recebe cada página assim que o tesseract termina
+        documento_id = documentos.novo_id()
+        pagina = stream_template(RESULT, filename=original_name, documento_id=documento_id,
+                                 paginas=_paginas_em_streaming(origem, original_name, documento_id))
+        return Response(pagina, mimetype='text/html', headers={'X-Accel-Buffering': 'no'})
+
+    estrutura = []
+    if ext == '.pdf':
+        # Páginas processadas em paralelo (texto nativo ou OCR), na ordem original
+        relatorio = []
+        paginas = list(layout_ocr.ocr_paginas_html(origem, relatorio=relatorio, estrutura=estrutura))
+        print(f"OCR de {original_name}: {motor_ocr.resumir_relatorio(relatorio)}")
+    else:
+        paginas = [layout_ocr.ocr_imagem_html(origem, estrutura)]
+
+    # A página mostra o HTML dos blocos; no servidor fica o texto compacto e
+    # marcado que vai para o Gemini, e o formulário leva só o ID
+    documento_id = documentos.guardar("\n\n".join(texto for _, texto in paginas))
+    if estrutura:
+        documentos.guardar_estrutura(estrutura, documento_id)
+    return render_template(RESULT, filename=original_name, documento_id=documento_id,
+                           paginas=[Markup(html_pagina) for html_pagina, _ in paginas])
 
 @app.route('/gerar_html', methods=['POST'])
 def gerar_html():
-    texto_ocr = request.form.get('ocr_texto', '')
+    texto_ocr = _texto_do_formulario()
+    if texto_ocr is None:
+        return "Documento expirado ou inexistente. Envie o arquivo novamente.", 410
     if not texto_ocr.strip():
         return "Texto vazio.", 400
 
-    html_resultado = gerar_html_acessivel_com_gemini(texto_ocr)
+    if request.form.get('stream'):
+        # Streaming: cada elemento do HTML aparece assim que fica pronto, em vez
+        # de a página esperar a resposta inteira do Gemini
+        novo_id = documentos.novo_id()
+        fragmentos = _fragmentos_em_streaming(texto_ocr, request.form.get('documento_id'), novo_id)
+        pagina = stream_template(RESULT, filename="Documento Adaptado", documento_id=novo_id,
+                                 fragmentos=fragmentos)
+        return Response(pagina, mimetype='text/html', headers={'X-Accel-Buffering': 'no'})
+
+    # Só os trechos duvidosos (ou, sem layout, o texto inteiro em blocos paralelos)
+    html_resultado = _reestruturar(texto_ocr, request.form.get('documento_id'))
     
-    return render_template_string(RESULT_HTML, filename="Documento Adaptado", text=html_resultado)
+    return render_template(RESULT, filename="Documento Adaptado", text=html_resultado,
+                           documento_id=documentos.guardar(html_resultado))
+
+@app.route('/gemini/cache')
+def estatisticas_cache_gemini():
+    return jsonify(cache_gemini.estatisticas())
+
+
+@app.route('/lote', methods=['POST'])
+def lote():
+    """Vários PDFs/imagens (ou um .zip deles) de uma vez: devolve um .zip com um HTML por arquivo"""
+    entradas = [(secure_filename(f.filename), uploads.conteudo(f))
+                for f in request.files.getlist('files') if f.filename]
+    try:
+        entradas = lote_ocr.expandir_zips(entradas)
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify(erro=f"Zip inválido: {e}"), 400
+    if not entradas:
+        return jsonify(erro="Nenhum PDF ou imagem enviado."), 400
+
+    dados, resumo = lote_ocr.zip_de_html(entradas)
+    print(f"Lote: {resumo}")
+    return Response(dados, mimetype='application/zip',
+                    headers={'Content-Disposition': 'attachment; filename=lote_acessivel.zip'})
+
+
+# --- Fila de jobs: OCR e Gemini fora da thread da requisição ---
+JOBS_DIR = 'jobs'
+_jobs = None
+_trava_jobs = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+
+
+def _job_ocr(parametros, progresso):
+    return "\n\n".join(motor_ocr.ocr_arquivo(parametros['caminho'], progresso))
+
+
+def _job_gerar_html(parametros, progresso):
+    texto_ocr = documentos.obter(parametros['documento_id'])
+    if texto_ocr is None:
+        raise ValueError("Documento expirado ou inexistente.")
+    return _reestruturar(texto_ocr, parametros['documento_id'], progresso)
+
+
+def _job_audiolivro(parametros, progresso):
+    return audiolivro.montar(parametros['paragrafos'], parametros['velocidade'], progresso)
+
+
+def obter_jobs():
+    """Fila de jobs do processo, criada no primeiro uso. Na importação ela subiria
+    também nos workers do motor_ocr e do servico_tts, que no spawn (Windows,
+    macOS) reimportam este módulo, e cada um disputaria os jobs"""
+    global _jobs
+    with _trava_jobs:
+        if _jobs is None:
+            _jobs = fila_jobs.FilaJobs(os.path.join(JOBS_DIR, 'fila.sqlite3'),
+                                       workers=int(os.environ.get('JOBS_WORKERS', 2)))
+            _jobs.registrar('ocr', _job_ocr)
+            _jobs.registrar('gerar_html', _job_gerar_html)
+            _jobs.registrar('audiolivro', _job_audiolivro)
+    return _jobs
+
+
+@app.route('/jobs/ocr', methods=['POST'])
+def criar_job_ocr():
+    uploaded = request.files.get('file')
+    if not uploaded:
+        return jsonify(erro="Nenhum arquivo enviado."), 400
+
+    original_name = secure_filename(uploaded.filename)
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    caminho = os.path.join(JOBS_DIR, f"upload_{uuid.uuid4().hex}_{original_name}")
+    uploaded.save(caminho)
+
+    job_id = obter_jobs().enviar('ocr', {'caminho': caminho}, arquivos=[caminho])
+    return jsonify(id=job_id, status=url_for('status_job', job_id=job_id)), 202
+
+@app.route('/jobs/gerar_html', methods=['POST'])
+def criar_job_gerar_html():
+    texto_ocr = _texto_do_formulario()
+    if texto_ocr is None:
+        return jsonify(erro="Documento expirado ou inexistente."), 410
+    if not texto_ocr.strip():
+        return jsonify(erro="Texto vazio."), 400
+
+    documento_id = request.form.get('documento_id') or documentos.guardar(texto_ocr)
+    job_id = obter_jobs().enviar('gerar_html', {'documento_id': documento_id})
+    return jsonify(id=job_id, status=url_for('status_job', job_id=job_id)), 202
+
+@app.route('/jobs/<job_id>')
+def status_job(job_id):
+    status = obter_jobs().status(job_id)
+    if status is None:
+        return jsonify(erro="Job não encontrado."), 404
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/cancelar', methods=['POST'])
+def cancelar_job(job_id):
+    if not obter_jobs().cancelar(job_id):
+        return jsonify(erro="Job não encontrado ou já finalizado."), 409
+    return jsonify(obter_jobs().status(job_id))
+
+# --- Audiolivro: síntese por parágrafo, em cache, servida em faixas (Range) ---
+@app.route('/audiolivro', methods=['POST'])
+def criar_audiolivro():
+    texto = _texto_do_formulario()
+    if texto is None:
+        return jsonify(erro="Documento expirado ou inexistente."), 410
+    textos = audiolivro.paragrafos(texto)
+    if not textos:
+        return jsonify(erro="Texto vazio."), 400
+
+    velocidade = audiolivro.velocidade_valida(request.form.get('velocidade'))
+    livro_id = audiolivro.identificador(textos, velocidade)
+    resposta = {'id': livro_id,
+                'audio': url_for('audio_audiolivro', livro_id=livro_id),
+                'indice': url_for('indice_audiolivro', livro_id=livro_id)}
+    if audiolivro.obter_indice(livro_id) is not None:
+        return jsonify(resposta)
+    if not audiolivro.faltando(textos, velocidade):
+        # Todos os parágrafos já estão no cache (ex.: outro documento com o mesmo texto)
+        audiolivro.montar(textos, velocidade)
+        return jsonify(resposta)
+    job_id = obter_jobs().enviar('audiolivro', {'paragrafos': textos, 'velocidade': velocidade})
+    resposta['status'] = url_for('status_job', job_id=job_id)
+    return jsonify(resposta), 202
+
+@app.route('/audiolivro/<livro_id>/indice')
+def indice_audiolivro(livro_id):
+    indice = audiolivro.obter_indice(livro_id)
+    if indice is None:
+        return jsonify(erro="Audiolivro não encontrado."), 404
+    return jsonify(audiolivro.indice_publico(indice))
+
+@app.route('/audiolivro/<livro_id>')
+def audio_audiolivro(livro_id):
+    # O ID é o hash do conteúdo: o navegador pode guardar o arquivo para sempre
+    if livro_id in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{livro_id}"'})
+    indice = audiolivro.obter_indice(livro_id)
+    if indice is None:
+        return "Audiolivro não encontrado.", 404
+
+    total = indice['bytes']
+    # Várias faixas (bytes=0-1,5-9): o RFC 9110 permite ignorar o Range e mandar o arquivo inteiro
+    faixa = request.range if request.range and len(request.range.ranges) == 1 else None
+    intervalo = faixa.range_for_length(total) if faixa else None
+    if faixa and intervalo is None:
+        return Response(status=416, headers={'Content-Range': f'bytes */{total}'})
+    inicio, fim = intervalo or (0, total)
+    resposta = Response(audiolivro.ler(indice, inicio, fim), status=206 if intervalo else 200,
+                        mimetype=indice['mimetype'])
+    resposta.headers['Content-Length'] = str(fim - inicio)
+    resposta.headers['Accept-Ranges'] = 'bytes'
+    if intervalo:
+        resposta.headers['Content-Range'] = faixa.to_content_range_header(total)
+    resposta.set_etag(livro_id)
+    resposta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resposta
+
+def _backend_reconhecimento():
+    """Backend pedido no formulário ('google'/'vosk'), ou o padrão do servidor"""
+    backend = request.form.get('reconhecimento')
+    return backend if backend in reconhecimento_voz.BACKENDS else None
+
+@app.route('/transcrever', methods=['POST'])
+def transcrever():
+    """Só a transcrição, em NDJSON: {"parcial": ...} conforme o reconhecimento
+    avança e {"texto": ...} no fim (o Google só manda o final)"""
+    if 'audio' not in request.files:
+        return jsonify(erro="Nenhum arquivo de áudio recebido."), 400
+    try:
+        pcm = audio_voz.preparar(request.files['audio'].read())
+    except Exception as e:
+        return jsonify(erro=f"Áudio inválido: {e}"), 400
+    backend = _backend_reconhecimento()
+
+    def linhas():
+        try:
+            for texto, final in reconhecimento_voz.em_fluxo(pcm, backend):
+                yield json.dumps({'texto' if final else 'parcial': texto}, ensure_ascii=False) + '\n'
+        except reconhecimento_voz.FalaNaoEntendida:
+            yield json.dumps({'erro': "Não foi possível entender a fala."}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            print(f"\033[31mErro na transcrição: {e}\033[0m")
+            yield json.dumps({'erro': str(e)}, ensure_ascii=False) + '\n'
+
+    return Response(linhas(), mimetype='application/x-ndjson', headers={'X-Accel-Buffering': 'no'})
 
 @app.route('/ask_ai_voice', methods=['POST'])
 def ask_ai_voice():
@@ -511,31 +589,35 @@ def ask_ai_voice():
     audio_file = request.files['audio']
     audio_data = audio_file.read()
 
-    r = sr.Recognizer()
+    tempos = {}
     try:
-        audio_segment = AudioSegment.from_file(io.BytesIO(audio_data))
-        
-        # Usa a pasta temporária customizada especificada no início do script
-        # O parâmetro 'dir' direciona tempfile para usar essa pasta
-        with tempfile.NamedTemporaryFile(delete=True, suffix=".wav", dir=CUSTOM_TEMP_DIR) as temp_wav_file:
-            audio_segment.export(temp_wav_file.name, format="wav", codec="pcm_s16le")
-            temp_wav_file.seek(0)
-            
-            with sr.AudioFile(temp_wav_file.name) as source:
-                audio_listened = r.record(source)
-
-            user_question = r.recognize_google(audio_listened, language='pt-BR')
-            print(f"Pergunta do usuário: {user_question}")
-
-            audio_response_buffer, ai_text_response = ask_gemini_and_get_audio(user_question)
-            print(f"Resposta da IA: {ai_text_response}")
-
-            return send_file(audio_response_buffer, mimetype='audio/wav', as_attachment=False)
-
-    except sr.UnknownValueError:
+        # PCM 16 kHz mono direto da memória, já sem o silêncio das pontas
+        pcm = audio_voz.preparar(audio_data, tempos)
+        print(f"Áudio da pergunta: {len(audio_data) / 1024:.0f} KB enviados, "
+              f"{audio_voz.duracao(pcm):.1f} s de fala ({len(pcm) / 1024:.0f} KB para o reconhecimento)")
+
+        user_question = reconhecimento_voz.transcrever(pcm, _backend_reconhecimento(), tempos)
+        print(f"Pergunta do usuário: {user_question}")
+
+        if request.form.get('stream'):
+            # O primeiro áudio sai depois da primeira frase, não da resposta inteira
+            print(f"Etapas da voz: {audio_voz.resumir_tempos(tempos)}")
+            return Response(audio_em_segmentos(user_question), mimetype='application/octet-stream',
+                            headers={'X-Accel-Buffering': 'no',
+                                     'Server-Timing': audio_voz.server_timing(tempos)})
+
+        audio_response_buffer, ai_text_response = ask_gemini_and_get_audio(user_question, tempos)
+        print(f"Resposta da IA: {ai_text_response}")
+        print(f"Etapas da voz: {audio_voz.resumir_tempos(tempos)}")
+
+        resposta = send_file(audio_response_buffer, mimetype='audio/wav', as_attachment=False)
+        resposta.headers['Server-Timing'] = audio_voz.server_timing(tempos)
+        return resposta
+
+    except reconhecimento_voz.FalaNaoEntendida:
         print("Não foi possível entender o áudio.")
         return "Não foi possível entender sua fala. Poderia repetir?", 400
-    except sr.RequestError as e:
+    except reconhecimento_voz.ReconhecimentoIndisponivel as e:
         print(f"Erro no serviço de reconhecimento de fala; verifique sua conexão com a internet: {e}")
         return f"Erro no serviço de reconhecimento de fala: {e}", 500
     except Exception as e:
@@ -543,4 +625,6 @@ def ask_ai_voice():
         return f"Ocorreu um erro inesperado: {e}", 500
 
 if __name__ == '__main__':
+    obter_jobs()  # retoma já os jobs interrompidos pelo último reinício
+    reconhecimento_voz.aquecer()
     app.run(debug=True)
@@ -0,0 +1,139 @@
+"""Áudio da pergunta por voz: do upload do navegador a PCM 16 kHz mono, em memória.
+
+O MediaRecorder manda WebM/Opus (48 kHz). Antes, o pydub chamava o ffmpeg, que
+gravava um WAV temporário relido pelo speech_recognition: duas cópias em disco
+por pergunta. Aqui o áudio vai direto para PCM de 16 bits, mono, 16 kHz (o que
+o reconhecimento usa), corta o silêncio e sai como bytes para um AudioData.
+
+Decodificadores, na ordem do 'auto' (AUDIO_DECODIFICADOR):
+- WAV (RIFF) é lido pelo módulo wave, sem processo externo;
+- 'pyav': o PyAV decodifica e reamostra dentro do processo;
+- 'ffmpeg': o executável, com entrada e saída por pipe (sem arquivos).
+"""
+import importlib.util
+import io
+import os
+import shutil
+import subprocess
+import time
+import wave
+
+import numpy as np
+
+# ========== CONFIGS ==========
+TAXA = 16000  # o reconhecimento não usa mais que isso; 48 kHz só triplica o envio
+AUDIO_DECODIFICADOR = os.environ.get('AUDIO_DECODIFICADOR', 'auto')
+FFMPEG = os.environ.get('FFMPEG', 'ffmpeg')
+# Silêncio: quadros de 20 ms com energia 35 dB abaixo do mais alto (ou quase
+# digitalmente mudos). Fica MARGEM_MS de folga em volta da fala, então uma pausa
+# no meio da pergunta encolhe para no máximo 2 x MARGEM_MS
+QUADRO_MS = 20
+LIMIAR_RELATIVO_DB = -35
+RMS_MINIMO = 60  # ~ -55 dBFS em 16 bits
+MARGEM_MS = 200
+
+
+# ========== DECODIFICAÇÃO ==========
+def _para_mono(amostras, canais):
+    if canais == 1:
+        return amostras
+    return amostras.reshape(-1, canais).mean(axis=1).astype(np.int16)
+
+
+def _reamostrar(amostras, taxa):
+    """Interpolação linear; a voz tem quase nada acima de 8 kHz, então basta"""
+    if taxa == TAXA or not len(amostras):
+        return amostras
+    tamanho = int(len(amostras) * TAXA / taxa)
+    posicoes = np.arange(tamanho) * (taxa / TAXA)
+    return np.interp(posicoes, np.arange(len(amostras)), amostras).astype(np.int16)
+
+
+def _decodificar_wav(dados):
+    with wave.open(io.BytesIO(dados)) as arquivo:
+        if arquivo.getsampwidth() != 2:
+            raise ValueError("WAV com amostras de 16 bits esperado")
+        amostras = np.frombuffer(arquivo.readframes(arquivo.getnframes()), np.int16)
+        return _reamostrar(_para_mono(amostras, arquivo.getnchannels()), arquivo.getframerate())
+
+
+def _decodificar_pyav(dados):
+    import av
+    partes = []
+    with av.open(io.BytesIO(dados)) as conteiner:
+        reamostrador = av.AudioResampler(format='s16', layout='mono', rate=TAXA)
+        for quadro in conteiner.decode(audio=0):
+            partes.extend(saida.to_ndarray().reshape(-1) for saida in reamostrador.resample(quadro))
+        partes.extend(saida.to_ndarray().reshape(-1) for saida in reamostrador.resample(None))
+    return np.concatenate(partes) if partes else np.zeros(0, np.int16)
+
+
+def _decodificar_ffmpeg(dados):
+    comando = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+               '-f', 's16le', '-ac', '1', '-ar', str(TAXA), 'pipe:1']
+    saida = subprocess.run(comando, input=dados, capture_output=True, check=True)
+    return np.frombuffer(saida.stdout, np.int16)
+
+
+def decodificar(dados):
+    """Amostras int16, mono, TAXA Hz, do áudio enviado (WebM/Opus, Ogg, WAV...)"""
+    if dados[:4] == b'RIFF' and dados[8:12] == b'WAVE':
+        return _decodificar_wav(dados)
+    decodificador = AUDIO_DECODIFICADOR
+    if decodificador == 'auto':
+        decodificador = 'pyav' if importlib.util.find_spec('av') is not None else 'ffmpeg'
+    if decodificador == 'pyav':
+        return _decodificar_pyav(dados)
+    if shutil.which(FFMPEG) is None:
+        raise RuntimeError("Nenhum decodificador de áudio: instale o PyAV (pip install av) ou o ffmpeg")
+    return _decodificar_ffmpeg(dados)
+
+
+# ========== SILÊNCIO ==========
+def aparar_silencio(amostras, taxa=TAXA):
+    """Corta o silêncio do começo e do fim e encurta as pausas longas do meio.
+
+    Se nada passar do limiar, devolve o áudio como veio (o reconhecedor decide).
+    """
+    tamanho_quadro = taxa * QUADRO_MS // 1000
+    quadros = len(amostras) // tamanho_quadro
+    if not quadros:
+        return amostras
+    blocos = amostras[:quadros * tamanho_quadro].reshape(quadros, tamanho_quadro)
+    energia = np.sqrt(np.square(blocos.astype(np.float32)).mean(axis=1))
+    fala = energia >= max(RMS_MINIMO, energia.max() * 10 ** (LIMIAR_RELATIVO_DB / 20))
+    if not fala.any():
+        return amostras
+    margem = MARGEM_MS // QUADRO_MS
+    manter = np.convolve(fala, np.ones(2 * margem + 1), 'same') > 0
+    return blocos[manter].reshape(-1)
+
+
+# ========== PIPELINE ==========
+def preparar(dados, tempos=None):
+    """PCM 16 bits little-endian, mono, TAXA Hz e sem silêncio sobrando, pronto para
+    sr.AudioData(pcm, TAXA, 2). Se `tempos` for um dicionário, recebe os segundos
+    de 'decodificacao' e 'silencio'."""
+    tempos = {} if tempos is None else tempos
+    inicio = time.perf_counter()
+    amostras = decodificar(dados)
+    tempos['decodificacao'] = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    amostras = aparar_silencio(amostras)
+    tempos['silencio'] = time.perf_counter() - inicio
+    return amostras.astype('<i2').tobytes()
+
+
+def duracao(pcm):
+    """Segundos de áudio de um PCM preparado"""
+    return len(pcm) / (2 * TAXA)
+
+
+def resumir_tempos(tempos):
+    """Ex.: 'decodificacao 12 ms, silencio 1 ms, reconhecimento 840 ms'"""
+    return ', '.join(f"{etapa} {segundos * 1000:.0f} ms" for etapa, segundos in tempos.items())
+
+
+def server_timing(tempos):
+    """Valor do cabeçalho Server-Timing (aparece na aba Rede do navegador)"""
+    return ', '.join(f"{etapa};dur={segundos * 1000:.1f}" for etapa, segundos in tempos.items())
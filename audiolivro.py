@@ -0,0 +1,268 @@
+"""Audiolivro de um documento: síntese por parágrafo, em cache, servida em faixas.
+
+A leitura do documento era o speechSynthesis do navegador (ou, no Modelo, um
+engine.say do texto inteiro): nada ficava guardado e cada aluno sintetizava
+de novo o mesmo material. Aqui o texto é quebrado em parágrafos, cada
+parágrafo é sintetizado (e comprimido) num worker do servico_tts e guardado
+no cache pela chave (formato, voz, velocidade, hash do texto). O audiolivro é
+só um índice com a posição de cada parágrafo no arquivo final:
+
+- ouvir de novo, ou outro aluno abrir o mesmo material, não sintetiza nada;
+- editar um parágrafo sintetiza só aquele parágrafo;
+- um pedido com Range (o <audio> do navegador ao pular) lê do cache só os
+  parágrafos que caem na faixa pedida.
+
+Formatos (AUDIOLIVRO_FORMATO):
+- 'mp3': CBR mono, codificado pelo ffmpeg por pipe; quadros MP3 podem ser
+  concatenados, e em CBR o tempo é proporcional ao byte (é assim que o
+  navegador posiciona a busca), então os parágrafos somam exato;
+- 'wav': PCM de 16 bits sem compressão; o cabeçalho é gerado na hora;
+- 'auto': mp3 se houver ffmpeg, senão wav.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import wave
+import zlib
+
+import audio_voz
+import servico_tts
+from cache_sqlite import CacheSQLite
+
+# ========== CONFIGS ==========
+CACHE_CAMINHO = os.environ.get('AUDIOLIVRO_CACHE', os.path.join('cache', 'audiolivros.sqlite3'))
+CACHE_MAX_BYTES = int(os.environ.get('AUDIOLIVRO_CACHE_MAX_MB', 2048)) * 1024 * 1024
+CACHE_TTL = float(os.environ.get('AUDIOLIVRO_CACHE_TTL_DIAS', 90)) * 86400
+AUDIOLIVRO_FORMATO = os.environ.get('AUDIOLIVRO_FORMATO', 'auto')
+BITRATE_MP3 = 48000  # fala mono; 48 kbps é o dobro do necessário para ficar inteligível
+TAXA_MP3 = 22050
+VELOCIDADE_MIN, VELOCIDADE_MAX = 80, 300
+LOTE_LEITURA = 16  # parágrafos buscados no cache por consulta ao servir uma faixa
+TAMANHO_CABECALHO_WAV = 44
+
+MIMETYPES = {'mp3': 'audio/mpeg', 'wav': 'audio/wav'}
+
+_BLOCOS_HTML = re.compile(r'</(?:p|h[1-6]|li|tr|table|div|section|blockquote|pre)>|<br\s*/?>', re.IGNORECASE)
+_SEPARADOR = re.compile(r'\n\s*\n|\f')
+
+_cache = None
+
+
+def obter_cache():
+    global _cache
+    if _cache is None:
+        _cache = CacheSQLite(CACHE_CAMINHO, CACHE_MAX_BYTES, ttl=CACHE_TTL)
+    return _cache
+
+
+def formato_padrao():
+    if AUDIOLIVRO_FORMATO == 'auto':
+        return 'mp3' if shutil.which(audio_voz.FFMPEG) else 'wav'
+    return AUDIOLIVRO_FORMATO
+
+
+def velocidade_valida(valor):
+    """Velocidade (palavras por minuto) de um campo de formulário, dentro dos limites"""
+    try:
+        return min(VELOCIDADE_MAX, max(VELOCIDADE_MIN, int(valor)))
+    except (TypeError, ValueError):
+        return servico_tts.VELOCIDADE
+
+
+# ========== TEXTO ==========
+def paragrafos(texto):
+    """Parágrafos falados do documento: texto do OCR (linhas em branco, form feed)
+    ou HTML do Gemini (fim de <p>, <h2>, <li>...), sem tags nem marcação"""
+    texto = _BLOCOS_HTML.sub('\n\n', texto)
+    return [p for p in map(servico_tts._para_fala, _SEPARADOR.split(texto)) if p]
+
+
+def _hash(texto):
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def chave_paragrafo(texto, voz, velocidade, formato):
+    return f"par:{formato}:{voz}:{velocidade}:{_hash(texto)}"
+
+
+def identificador(textos, velocidade, formato=None, voz=None):
+    """ID do audiolivro: o mesmo texto com a mesma voz e velocidade dá o mesmo ID"""
+    formato = formato or formato_padrao()
+    voz = voz or servico_tts.voz()
+    chaves = '\n'.join(chave_paragrafo(t, voz, velocidade, formato) for t in textos)
+    return _hash(chaves)[:32]
+
+
+# ========== LADO DO WORKER ==========
+def _wav_canonico(wav):
+    """WAV com o cabeçalho simples de 44 bytes (o pyttsx3 às vezes grava blocos extras)"""
+    with wave.open(io.BytesIO(wav)) as entrada:
+        parametros = entrada.getparams()
+        quadros = entrada.readframes(entrada.getnframes())
+    saida = io.BytesIO()
+    with wave.open(saida, 'wb') as arquivo:
+        arquivo.setnchannels(parametros.nchannels)
+        arquivo.setsampwidth(parametros.sampwidth)
+        arquivo.setframerate(parametros.framerate)
+        arquivo.writeframes(quadros)
+    return saida.getvalue()
+
+
+def _mp3(wav):
+    # Sem cabeçalho Xing nem ID3: os parágrafos são concatenados em um arquivo só
+    comando = [audio_voz.FFMPEG, '-hide_banner', '-loglevel', 'error', '-f', 'wav', '-i', 'pipe:0',
+               '-ac', '1', '-ar', str(TAXA_MP3), '-c:a', 'libmp3lame', '-b:a', str(BITRATE_MP3),
+               '-write_xing', '0', '-id3v2_version', '0', '-f', 'mp3', 'pipe:1']
+    return subprocess.run(comando, input=wav, capture_output=True, check=True).stdout
+
+
+def _sintetizar_paragrafo(texto, velocidade, formato):
+    """Tarefa do worker: áudio do parágrafo já no formato do audiolivro"""
+    wav = _wav_canonico(servico_tts._sintetizar(texto, velocidade, servico_tts.VOLUME))
+    return _mp3(wav) if formato == 'mp3' else wav
+
+
+# ========== MONTAGEM ==========
+def _duracao(dados, formato):
+    if formato == 'mp3':
+        return len(dados) * 8 / BITRATE_MP3
+    return servico_tts.duracao(dados)
+
+
+def _indice(textos, chaves, formato, velocidade, voz):
+    """Posição de cada parágrafo no arquivo final, a partir do que está no cache"""
+    cache = obter_cache()
+    deslocamento = TAMANHO_CABECALHO_WAV if formato == 'wav' else 0
+    tempo = 0.0
+    itens = []
+    formato_wav = None
+    for i in range(0, len(chaves), LOTE_LEITURA):
+        valores = cache.obter_varios(set(chaves[i:i + LOTE_LEITURA]))
+        for texto, k in zip(textos[i:i + LOTE_LEITURA], chaves[i:i + LOTE_LEITURA]):
+            dados = valores.get(k)
+            if dados is None:
+                # Despejado do cache (livro grande perto do CACHE_MAX_BYTES) entre a
+                # síntese e o índice: sintetiza de novo só este parágrafo
+                dados = servico_tts.submeter(_sintetizar_paragrafo, texto, velocidade,
+                                             formato).result(servico_tts.TIMEOUT)
+                cache.guardar(k, dados)
+            segundos = _duracao(dados, formato)
+            if formato == 'wav':
+                if formato_wav is None:
+                    with wave.open(io.BytesIO(dados)) as arquivo:
+                        formato_wav = [arquivo.getnchannels(), arquivo.getsampwidth(), arquivo.getframerate()]
+                dados = dados[TAMANHO_CABECALHO_WAV:]
+            itens.append({'chave': k, 'inicio_bytes': deslocamento, 'bytes': len(dados),
+                          'inicio': round(tempo, 3), 'segundos': round(segundos, 3),
+                          'texto': texto})
+            deslocamento += len(dados)
+            tempo += segundos
+    return {'formato': formato, 'mimetype': MIMETYPES[formato], 'voz': voz, 'velocidade': velocidade,
+            'wav': formato_wav, 'bytes': deslocamento, 'segundos': round(tempo, 3), 'paragrafos': itens}
+
+
+def faltando(textos, velocidade, formato=None, voz=None):
+    """Quantos parágrafos (distintos) ainda precisam ser sintetizados"""
+    formato = formato or formato_padrao()
+    voz = voz or servico_tts.voz()
+    chaves = {chave_paragrafo(t, voz, velocidade, formato) for t in textos}
+    return len(chaves - obter_cache().existentes(chaves))
+
+
+def montar(textos, velocidade, progresso=None, formato=None):
+    """Sintetiza no pool os parágrafos que não estão no cache, guarda o índice e
+    devolve o ID do audiolivro. `progresso(feitos, total)` conta os sintetizados."""
+    formato = formato or formato_padrao()
+    voz = servico_tts.voz()
+    livro_id = identificador(textos, velocidade, formato, voz)
+    cache = obter_cache()
+    chaves = [chave_paragrafo(t, voz, velocidade, formato) for t in textos]
+    presentes = cache.existentes(set(chaves))
+    pendentes = {k: t for k, t in zip(chaves, textos) if k not in presentes}
+
+    # Todos vão para a fila do pool de uma vez; os workers pegam conforme ficam livres
+    futuros = {k: servico_tts.submeter(_sintetizar_paragrafo, t, velocidade, formato)
+               for k, t in pendentes.items()}
+    try:
+        for feitos, (k, futuro) in enumerate(futuros.items(), start=1):
+            cache.guardar(k, futuro.result(servico_tts.TIMEOUT))
+            if progresso:
+                progresso(feitos, len(futuros))
+    except BaseException:
+        for futuro in futuros.values():
+            futuro.cancel()
+        raise
+
+    indice = _indice(textos, chaves, formato, velocidade, voz)
+    cache.guardar(f"livro:{livro_id}", zlib.compress(json.dumps(indice, ensure_ascii=False).encode('utf-8'), 6))
+    print(f"Audiolivro {livro_id}: {len(textos)} parágrafos, {len(pendentes)} sintetizados, "
+          f"{indice['segundos'] / 60:.1f} min, {indice['bytes'] / 1024:.0f} KB ({formato})")
+    return livro_id
+
+
+def obter_indice(livro_id):
+    """Índice do audiolivro, ou None se ele não existe (ou saiu do cache)"""
+    dados = obter_cache().obter(f"livro:{livro_id}")
+    return json.loads(zlib.decompress(dados)) if dados is not None else None
+
+
+def indice_publico(indice):
+    """O índice sem as chaves internas, para o navegador posicionar a leitura"""
+    return {
+        'formato': indice['formato'],
+        'segundos': indice['segundos'],
+        'bytes': indice['bytes'],
+        'paragrafos': [{campo: p[campo] for campo in ('inicio', 'segundos', 'inicio_bytes', 'bytes', 'texto')}
+                       for p in indice['paragrafos']],
+    }
+
+
+# ========== LEITURA EM FAIXAS ==========
+def _cabecalho_wav(indice):
+    canais, largura, taxa = indice['wav']
+    tamanho = indice['bytes'] - TAMANHO_CABECALHO_WAV
+    saida = io.BytesIO()
+    with wave.open(saida, 'wb') as arquivo:
+        arquivo.setnchannels(canais)
+        arquivo.setsampwidth(largura)
+        arquivo.setframerate(taxa)
+        arquivo.setnframes(tamanho // (canais * largura))
+        arquivo.writeframesraw(b'')
+    cabecalho = bytearray(saida.getvalue())
+    # wave escreve o tamanho dos quadros que recebeu (nenhum); aqui vão os do arquivo inteiro
+    cabecalho[4:8] = (indice['bytes'] - 8).to_bytes(4, 'little')
+    cabecalho[40:44] = tamanho.to_bytes(4, 'little')
+    return bytes(cabecalho)
+
+
+def _paragrafo_do_cache(indice, item, valores):
+    dados = valores.get(item['chave'])
+    if dados is None:
+        # Despejado do cache depois do índice: sintetiza de novo só este parágrafo
+        dados = servico_tts.submeter(_sintetizar_paragrafo, item['texto'], indice['velocidade'],
+                                     indice['formato']).result(servico_tts.TIMEOUT)
+        obter_cache().guardar(item['chave'], dados)
+    if indice['formato'] == 'wav':
+        dados = dados[TAMANHO_CABECALHO_WAV:]
+    # O índice manda: se a nova síntese mudou de tamanho, as posições continuam valendo
+    return dados[:item['bytes']].ljust(item['bytes'], b'\0')
+
+
+def ler(indice, inicio, fim):
+    """Gera os bytes [inicio, fim) do arquivo do audiolivro, buscando no cache só os
+    parágrafos que a faixa toca"""
+    if indice['formato'] == 'wav' and inicio < TAMANHO_CABECALHO_WAV:
+        yield _cabecalho_wav(indice)[inicio:fim]
+    itens = [p for p in indice['paragrafos']
+             if p['inicio_bytes'] < fim and p['inicio_bytes'] + p['bytes'] > inicio]
+    for i in range(0, len(itens), LOTE_LEITURA):
+        lote = itens[i:i + LOTE_LEITURA]
+        valores = obter_cache().obter_varios({p['chave'] for p in lote})
+        for item in lote:
+            dados = _paragrafo_do_cache(indice, item, valores)
+            comeco = max(inicio - item['inicio_bytes'], 0)
+            yield dados[comeco:fim - item['inicio_bytes']]
@@ -0,0 +1,119 @@
+"""Áudio da pergunta por voz: decodificação em memória e corte de silêncio.
+
+Antes: pydub + ffmpeg exportavam um WAV temporário (48 kHz, como veio do
+navegador) que o speech_recognition relia do disco e mandava inteiro para o
+reconhecimento. Agora (audio_voz.preparar): PCM 16 kHz mono em memória, sem
+o silêncio das pontas e com as pausas longas encurtadas.
+
+Sem --arquivo, usa uma "pergunta" sintética em WAV 48 kHz estéreo: tons com
+ruído separados por pausas, com silêncio no começo e no fim, como numa
+gravação em que a pessoa demora a falar e a soltar o botão. Com --arquivo
+(ex.: um .webm gravado pelo voz.js) o decodificador precisa do PyAV ou do
+ffmpeg. O caminho antigo só é medido se o pydub estiver instalado.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_audio_voz [--arquivo pergunta.webm] [--repeticoes 20]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+import audio_voz
+
+TAXA_NAVEGADOR = 48000
+
+
+def pergunta_sintetica(silencio_inicio=1.5, silencio_fim=2.0, trechos=(1.2, 0.8, 1.5), pausa=1.0):
+    """WAV 48 kHz estéreo: fala (tons modulados + ruído) entre silêncios de fundo"""
+    gerador = np.random.default_rng(7)
+
+    def silencio(segundos):
+        return gerador.normal(0, 20, int(segundos * TAXA_NAVEGADOR))
+
+    def fala(segundos):
+        t = np.arange(int(segundos * TAXA_NAVEGADOR)) / TAXA_NAVEGADOR
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2  # sílabas
+        voz = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1400)))
+        return 6000 * envelope * voz + gerador.normal(0, 300, len(t))
+
+    partes = [silencio(silencio_inicio)]
+    for i, segundos in enumerate(trechos):
+        if i:
+            partes.append(silencio(pausa))
+        partes.append(fala(segundos))
+    partes.append(silencio(silencio_fim))
+    mono = np.clip(np.concatenate(partes), -32768, 32767).astype('<i2')
+    saida = io.BytesIO()
+    with wave.open(saida, 'wb') as arquivo:
+        arquivo.setnchannels(2)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(TAXA_NAVEGADOR)
+        arquivo.writeframes(np.repeat(mono, 2).tobytes())
+    return saida.getvalue()
+
+
+def caminho_antigo(dados):
+    """pydub -> WAV temporário -> releitura; devolve os bytes de PCM que iam para o reconhecimento"""
+    from pydub import AudioSegment
+    segmento = AudioSegment.from_file(io.BytesIO(dados))
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temporario:
+        nome = temporario.name
+    try:
+        segmento.export(nome, format='wav', codec='pcm_s16le')
+        with wave.open(nome) as arquivo:
+            # o sr.AudioFile junta os canais e mantém a taxa original
+            canais = arquivo.getnchannels()
+            amostras = np.frombuffer(arquivo.readframes(arquivo.getnframes()), np.int16)
+        return amostras.reshape(-1, canais).mean(axis=1).astype('<i2').tobytes(), segmento.frame_rate
+    finally:
+        os.remove(nome)
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arquivo", help="áudio gravado (webm/ogg/wav); padrão: pergunta sintética")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.arquivo:
+        with open(args.arquivo, 'rb') as f:
+            dados = f.read()
+    else:
+        dados = pergunta_sintetica()
+    print(f"upload: {len(dados) / 1024:.0f} KB")
+
+    try:
+        segundos, (pcm_antigo, taxa_antiga) = medir(lambda: caminho_antigo(dados), args.repeticoes)
+        duracao_antiga = len(pcm_antigo) / (2 * taxa_antiga)
+        print(f"antes   {segundos * 1000:7.1f} ms  {duracao_antiga:5.2f} s de áudio a {taxa_antiga} Hz "
+              f"= {len(pcm_antigo) / 1024:6.0f} KB de PCM")
+    except ImportError:
+        pcm_antigo = None
+        print("antes   (pydub não instalado; caminho antigo não medido)")
+
+    tempos = {}
+    segundos, pcm = medir(lambda: audio_voz.preparar(dados, tempos), args.repeticoes)
+    print(f"agora   {segundos * 1000:7.1f} ms  {audio_voz.duracao(pcm):5.2f} s de áudio a {audio_voz.TAXA} Hz "
+          f"= {len(pcm) / 1024:6.0f} KB de PCM")
+    print(f"        etapas (última repetição): {audio_voz.resumir_tempos(tempos)}")
+    if pcm_antigo:
+        print(f"carga do reconhecimento: {len(pcm) / len(pcm_antigo):.0%} da anterior")
+    else:
+        bruto = len(audio_voz.decodificar(dados)) * 2
+        print(f"corte de silêncio: {len(pcm) / bruto:.0%} do áudio decodificado")
+
+
+if __name__ == "__main__":
+    main()
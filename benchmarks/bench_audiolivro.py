@@ -0,0 +1,74 @@
+"""Audiolivro: custo de síntese da primeira escuta, da repetição e de uma edição.
+
+Antes: cada escuta sintetizava o documento inteiro de novo (um WAV só, como o
+engine.say do Modelo). Agora (audiolivro.montar): parágrafos em cache, só o
+que falta vai para o pool de TTS. Mede também uma busca no meio do arquivo:
+quanto a faixa pedida (Range) lê do cache. Usa o sintetizador falso
+(benchmarks.tts_falso) e um cache temporário.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_audiolivro --paginas 10 --workers 2
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import audiolivro
+import servico_tts
+from benchmarks import corpus, tts_falso
+
+
+def escuta(textos, velocidade):
+    """Segundos até o audiolivro ficar pronto e quantos parágrafos foram sintetizados"""
+    faltavam = audiolivro.faltando(textos, velocidade)
+    inicio = time.perf_counter()
+    livro_id = audiolivro.montar(textos, velocidade)
+    return time.perf_counter() - inicio, faltavam, livro_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--faixa-kb", type=int, default=256, help="tamanho do pedido com Range")
+    args = parser.parse_args()
+
+    texto = "\f".join(corpus.texto_pagina(i) for i in range(args.paginas))
+    textos = audiolivro.paragrafos(texto)
+    velocidade = servico_tts.VELOCIDADE
+    servico_tts.obter_pool(args.workers, tts_falso.sintetizar)
+    servico_tts.sintetizar("aquecimento")
+
+    inicio = time.perf_counter()
+    servico_tts.sintetizar(servico_tts._para_fala(texto))
+    print(f"antes, cada escuta: {time.perf_counter() - inicio:.2f} s (documento inteiro, um worker)")
+    print(f"{len(textos)} parágrafos, {len(set(textos))} distintos")
+    print()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        audiolivro.CACHE_CAMINHO = os.path.join(pasta, "audiolivros.sqlite3")
+        editado = list(textos)
+        editado[len(editado) // 2] += " Parágrafo revisado pelo professor."
+        print(f"{'audiolivro':<22}{'tempo':>9}{'sintetizados':>14}")
+        for rotulo, entrada in (("primeira escuta", textos), ("escuta repetida", textos),
+                                ("um parágrafo editado", editado)):
+            segundos, sintetizados, livro_id = escuta(entrada, velocidade)
+            print(f"{rotulo:<22}{segundos:8.2f} s{sintetizados:>14}")
+
+        indice = audiolivro.obter_indice(livro_id)
+        meio = indice['bytes'] // 2
+        fim = min(indice['bytes'], meio + args.faixa_kb * 1024)
+        lidos = [p for p in indice['paragrafos'] if p['inicio_bytes'] < fim and p['inicio_bytes'] + p['bytes'] > meio]
+        inicio = time.perf_counter()
+        dados = b''.join(audiolivro.ler(indice, meio, fim))
+        print()
+        print(f"busca no meio: {len(dados) / 1024:.0f} KB em {(time.perf_counter() - inicio) * 1000:.1f} ms, "
+              f"{len(lidos)} de {len(indice['paragrafos'])} parágrafos lidos do cache "
+              f"(arquivo: {indice['bytes'] / 1024 / 1024:.1f} MB, {indice['segundos'] / 60:.1f} min, "
+              f"{indice['formato']})")
+    servico_tts.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Latência por página: pixmap -> PIL -> pytesseract x tesseract dentro do processo.
+
+Renderiza as páginas de um PDF escaneado e roda o OCR de cada uma no próprio
+processo (sem pool), para isolar o custo da entrega da imagem ao tesseract:
+
+  antes        Image.frombytes(pix.samples) + pytesseract (PNG temporário + executável)
+  pytesseract  Image.frombuffer sobre o buffer do pixmap + pytesseract (PPM temporário)
+  tesserocr    API C com um motor por processo (só se o tesserocr estiver instalado)
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_backend_ocr --paginas 10
+"""
+import argparse
+import statistics
+import time
+
+import fitz
+import pytesseract
+from PIL import Image
+
+import motor_ocr
+from benchmarks import corpus
+
+
+def antes(pix, lang):
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    return pytesseract.image_to_string(img, lang=lang)
+
+
+def com_backend(backend):
+    def reconhecer(pix, lang):
+        motor_ocr.OCR_BACKEND = backend
+        return motor_ocr._reconhecer_pixmap(pix, lang)
+    return reconhecer
+
+
+def medir(reconhecer, pixmaps):
+    tempos = []
+    for pix in pixmaps:
+        inicio = time.perf_counter()
+        reconhecer(pix, motor_ocr.LANG_PADRAO)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=10)
+    parser.add_argument("--dpi", type=int, default=motor_ocr.DPI_PADRAO)
+    args = parser.parse_args()
+
+    with fitz.open(stream=corpus.gerar_pdf_escaneado(args.paginas), filetype="pdf") as doc:
+        pixmaps = [page.get_pixmap(dpi=args.dpi, alpha=False) for page in doc]
+    megapixels = pixmaps[0].width * pixmaps[0].height / 1e6
+    print(f"{len(pixmaps)} páginas de {pixmaps[0].width}x{pixmaps[0].height} ({megapixels:.1f} MP)\n")
+
+    # Só a entrega da imagem, sem o tesseract
+    for nome, converter in (
+            ("frombytes", lambda p: Image.frombytes("RGB", [p.width, p.height], p.samples)),
+            ("frombuffer", lambda p: Image.frombuffer("RGB", (p.width, p.height), p.samples_mv,
+                                                      "raw", "RGB", p.stride, 1))):
+        inicio = time.perf_counter()
+        for pix in pixmaps:
+            converter(pix)
+        print(f"{nome:<12} {(time.perf_counter() - inicio) / len(pixmaps) * 1000:8.2f} ms/página")
+    print()
+
+    backends = [("antes", antes), ("pytesseract", com_backend("pytesseract"))]
+    try:
+        import tesserocr  # noqa: F401
+        backends.append(("tesserocr", com_backend("tesserocr")))
+    except ImportError:
+        print("tesserocr não instalado: backend em processo fora da comparação\n")
+
+    print(f"{'backend':<12} {'1ª página':>10} {'mediana':>10} {'p95':>10}  (ms)")
+    for nome, reconhecer in backends:
+        tempos = medir(reconhecer, pixmaps)
+        resto = sorted(tempos[1:]) or tempos
+        p95 = resto[min(len(resto) - 1, int(len(resto) * 0.95))]
+        print(f"{nome:<12} {tempos[0] * 1000:10.1f} {statistics.median(resto) * 1000:10.1f} {p95 * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
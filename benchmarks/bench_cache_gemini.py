@@ -0,0 +1,45 @@
+"""Cache de respostas do Gemini: primeira reestruturação x repetição do mesmo material.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_cache_gemini --paginas 40
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cache_gemini
+import gemini_blocos
+from benchmarks import corpus
+from benchmarks.gemini_falso import ModeloFalso
+
+TEMPLATE = 'Reestruture em HTML acessível.\n\nTexto OCR:\n"""{texto_ocr}"""'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=40)
+    args = parser.parse_args()
+
+    texto = "".join(corpus.texto_pagina(i) + "\n\f" for i in range(args.paginas))
+    # O mesmo material enviado de novo, com o espaçamento do OCR um pouco diferente
+    reenviado = texto.replace("\n\n", "\n \n\n")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        cache_gemini.CACHE_CAMINHO = os.path.join(pasta, "gemini.sqlite3")
+        modelo = ModeloFalso()
+        gerar = cache_gemini.memoizar(
+            lambda bloco: modelo.generate_content(TEMPLATE.format(texto_ocr=bloco)).text,
+            modelo.model_name, TEMPLATE)
+
+        for rotulo, entrada in (("primeira vez", texto), ("mesmo texto", texto), ("espaçamento diferente", reenviado)):
+            chamadas = modelo.chamadas
+            inicio = time.perf_counter()
+            gemini_blocos.gerar_html_em_blocos(entrada, gerar)
+            print(f"{rotulo:<22} {time.perf_counter() - inicio:8.3f} s  "
+                  f"{modelo.chamadas - chamadas} chamadas ao modelo")
+        print(cache_gemini.estatisticas())
+
+
+if __name__ == "__main__":
+    main()
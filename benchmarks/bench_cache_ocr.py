@@ -0,0 +1,53 @@
+"""Cache de OCR: upload frio, reenvio idêntico e PDF com uma página alterada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_cache_ocr --paginas 16
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+import motor_ocr
+from benchmarks import corpus
+
+
+def alterar_uma_pagina(dados, indice):
+    """Copia o PDF acrescentando uma anotação de texto em uma única página"""
+    doc = fitz.open(stream=dados, filetype="pdf")
+    doc[indice].insert_text((60, 820), "Errata: revisão 2", fontsize=9)
+    novo = doc.tobytes()
+    doc.close()
+    return novo
+
+
+def cronometrar(caminho):
+    inicio = time.perf_counter()
+    motor_ocr.ocr_pdf(caminho)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        motor_ocr.CACHE_CAMINHO = os.path.join(pasta, "ocr.sqlite3")
+        dados = corpus.gerar_pdf_escaneado(args.paginas)
+        original = corpus.salvar(dados, os.path.join(pasta, "original.pdf"))
+        alterado = corpus.salvar(alterar_uma_pagina(dados, args.paginas // 2),
+                                 os.path.join(pasta, "alterado.pdf"))
+
+        motor_ocr.obter_pool()
+        print(f"upload frio:              {cronometrar(original):8.3f} s")
+        print(f"reenvio idêntico:         {cronometrar(original) * 1000:8.1f} ms")
+        print(f"1 de {args.paginas} páginas alterada: {cronometrar(alterado):8.3f} s")
+        print(f"tamanho do cache:         {motor_ocr.obter_cache().tamanho_total()} bytes")
+        motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Teste de carga da camada cliente_llm contra um servidor de LLM falso local.
+
+Várias threads (como as do Flask) chamam o modelo ao mesmo tempo. O servidor
+(benchmarks.servidor_llm_falso) aceita poucas requisições simultâneas (429
+acima disso), falha algumas com 503 e deixa outras travadas. Compara:
+
+- direto: uma conexão nova por chamada, sem limite, sem timeout, sem nova
+  tentativa (como as rotas chamavam o modelo);
+- direto + keep-alive: só o reúso de conexão;
+- cliente_llm: keep-alive, semáforo do tamanho da cota, token bucket, timeout
+  e novas tentativas com jitter.
+
+Latências (p50/p99) só das chamadas que deram certo; falhas contadas à parte.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_cliente_llm --clientes 16 --chamadas 8 [--capacidade 4]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cliente_llm
+from benchmarks import corpus
+from benchmarks.servidor_llm_falso import ModeloHTTP, ServidorFalso
+
+
+def percentil(valores, p):
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def carga(modelo, prompts, clientes):
+    latencias, falhas = [], []
+
+    def chamada(prompt):
+        inicio = time.perf_counter()
+        try:
+            modelo.generate_content(prompt)
+        except Exception as e:
+            falhas.append(type(e).__name__)
+        else:
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        list(pool.map(chamada, prompts))
+    return latencias, falhas, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=16, help="threads chamando ao mesmo tempo")
+    parser.add_argument("--chamadas", type=int, default=8, help="chamadas por cliente")
+    parser.add_argument("--capacidade", type=int, default=4, help="requisições simultâneas aceitas")
+    parser.add_argument("--timeout", type=float, default=3.0)
+    parser.add_argument("--travada", type=float, default=20.0, help="segundos de uma resposta travada")
+    args = parser.parse_args()
+
+    prompts = [corpus.texto_pagina(i, 2) for i in range(args.clientes * args.chamadas)]
+    cenarios = (
+        ('direto', lambda endereco: ModeloHTTP(endereco, reusar=False)),
+        ('direto + keep-alive', lambda endereco: ModeloHTTP(endereco)),
+        ('cliente_llm', lambda endereco: cliente_llm.ClienteLLM(
+            ModeloHTTP(endereco), max_em_voo=args.capacidade, timeout=args.timeout,
+            limitador=cliente_llm.LimitadorTaxa(6000, rajada=args.capacidade))),
+    )
+    print(f"{len(prompts)} chamadas de {args.clientes} clientes; servidor aceita {args.capacidade} por vez")
+    print(f"{'cenário':<22}{'ok':>5}{'falhas':>8}{'p50':>8}{'p99':>8}{'total':>8}"
+          f"{'429':>6}{'conexões':>10}")
+    for nome, criar in cenarios:
+        with ServidorFalso(capacidade=args.capacidade, travada=args.travada) as servidor:
+            modelo = criar(servidor.endereco)
+            latencias, falhas, total = carga(modelo, prompts, args.clientes)
+            c = servidor.contagem
+        print(f"{nome:<22}{len(latencias):>5}{len(falhas):>8}{percentil(latencias, 50):7.2f}s"
+              f"{percentil(latencias, 99):7.2f}s{total:7.1f}s{c['429']:>6}{c['conexoes']:>10}")
+        if isinstance(modelo, cliente_llm.ClienteLLM):
+            e = modelo.estatisticas()
+            print(f"{'':<22}novas tentativas: {e['novas_tentativas']}, "
+                  f"espera média por vaga: {e['espera_fila'] / max(1, e['chamadas']):.2f} s")
+        if falhas:
+            print(f"{'':<22}falhas: " + ', '.join(f"{n} x{falhas.count(n)}" for n in sorted(set(falhas))))
+    print(f"(média das latências ok do último cenário: {statistics.mean(latencias):.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
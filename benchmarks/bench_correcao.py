@@ -0,0 +1,150 @@
+"""Segunda leitura e correção seletivas: tempo de OCR e tokens do Gemini por documento.
+
+OCR (layout_ocr.layout_pixels, em processo, páginas do corpus degradado):
+- sem segunda leitura;
+- seletiva: só as regiões abaixo de OCR_CONFIANCA_MINIMA passam de novo;
+- tudo: todas as regiões passam pela segunda leitura (o custo de endurecer o
+  OCR da página inteira).
+
+Gemini (modelo falso, sem rede): documento inteiro em blocos (gemini_blocos)
+contra só os trechos duvidosos (correcao_seletiva). O acerto do OCR só vale
+com o tesseract real e os traineddata de por+eng.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_correcao --paginas 6 [--dpi 200]
+"""
+import argparse
+import time
+
+import fitz  # PyMuPDF
+
+import correcao_seletiva
+import gemini_blocos
+import layout_ocr
+import motor_ocr
+import preprocessamento
+from benchmarks import corpus, gemini_falso
+from benchmarks.bench_dpi_adaptativo import acerto
+
+_PROMPT = 'Corrija o texto do OCR:\n"""{}"""'
+
+
+def ocr(matrizes, modo):
+    """Páginas estruturadas e segundos gastos, com a segunda leitura no `modo` dado"""
+    limiar = layout_ocr.CONFIANCA_MINIMA
+    if modo == 'tudo':
+        layout_ocr.CONFIANCA_MINIMA = 101.0  # nenhuma região passa na primeira leitura
+    paginas = []
+    tempos = {}
+    inicio = time.perf_counter()
+    try:
+        for numero, pixels in enumerate(matrizes, start=1):
+            blocos, largura, altura = layout_ocr.layout_pixels(
+                pixels, etapas=preprocessamento.ETAPAS, tempos=tempos, reocr=modo != 'sem')
+            for ordem, bloco in enumerate(blocos):
+                bloco['ordem'] = ordem
+            paginas.append({'pagina': numero, 'largura': largura, 'altura': altura, 'blocos': blocos})
+    finally:
+        layout_ocr.CONFIANCA_MINIMA = limiar
+    return paginas, time.perf_counter() - inicio, tempos
+
+
+def acerto_medio(paginas, gabaritos):
+    notas = [acerto(layout_ocr.texto_das_paginas([pagina]), gabarito)
+             for pagina, gabarito in zip(paginas, gabaritos)]
+    return sum(notas) / len(notas)
+
+
+def confianca_media(paginas):
+    blocos = [b for pagina in paginas for b in pagina['blocos']]
+    return sum(b['confianca'] for b in blocos) / len(blocos) if blocos else 0.0
+
+
+def gemini(paginas, seletiva):
+    modelo = gemini_falso.ModeloFalso()
+
+    def gerar(texto):
+        return modelo.generate_content(_PROMPT.format(texto)).text
+
+    inicio = time.perf_counter()
+    if seletiva:
+        correcao_seletiva.gerar_html(paginas, gerar)
+    else:
+        gemini_blocos.gerar_html_em_blocos(layout_ocr.paginas_para_prompt(paginas), gerar)
+    return modelo.chamadas, modelo.tokens_entrada, time.perf_counter() - inicio
+
+
+# Respostas com os marcadores dentro de um elemento: cada trecho tem que sair com HTML fechado
+_MARCADORES_ANINHADOS = [
+    ('<div>[[0]]<p>a</p>[[1]]<ul><li>b</li></ul></div>',
+     {0: '<div><p>a</p></div>', 1: '<ul><li>b</li></ul>'}),
+    ('<ul><li>[[0]] um</li><li>[[1]] dois</li></ul>',
+     {0: '<li>um</li>', 1: '<li>dois</li>'}),
+]
+
+
+def conferir_separar():
+    erros = 0
+    for resposta, esperado in _MARCADORES_ANINHADOS:
+        obtido = correcao_seletiva.separar(resposta)
+        if obtido != esperado:
+            erros += 1
+            print(f"\033[31mseparar({resposta!r})\n  esperado: {esperado!r}\n  obtido:   {obtido!r}\033[0m")
+    print(f"separar: {len(_MARCADORES_ANINHADOS)} respostas com marcadores aninhados, {erros} divergência(s)")
+
+
+def conferir_lotes(max_caracteres=80):
+    """Trecho maior que o que sobra no lote vai inteiro para o próximo; maior que
+    o lote inteiro vai em pedaços com o marcador repetido. Nada se perde no separar."""
+    corpos = ['um ' * 10, 'dois ' * 12, '\n\n'.join(['tres ' * 10] * 5)]
+    textos = [f"[[{numero}]] {corpo}" for numero, corpo in enumerate(corpos)]
+    lotes = correcao_seletiva.lotes(textos, max_caracteres)
+    separados = correcao_seletiva.separar('\n\n'.join(lotes))
+    erros = [f"lote com {len(lote)} caracteres ou sem marcador: {lote!r}" for lote in lotes
+             if len(lote) > max_caracteres or not lote.startswith('[[')]
+    erros += [f"trecho {numero} incompleto: {separados.get(numero)!r}" for numero, corpo in enumerate(corpos)
+              if ''.join(separados.get(numero, '').split()) != ''.join(corpo.split())]
+    if [lote.split(']]')[0] for lote in lotes[:2]] != ['[[0', '[[1']:
+        erros.append(f"trecho 1 dividido entre lotes: {lotes[:2]!r}")
+    for erro in erros:
+        print(f"\033[31m{erro}\033[0m")
+    print(f"lotes: {len(textos)} trechos em {len(lotes)} lotes de até {max_caracteres} caracteres, "
+          f"{len(erros)} divergência(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=6)
+    parser.add_argument("--dpi", type=int, default=motor_ocr.DPI_PADRAO)
+    args = parser.parse_args()
+
+    conferir_separar()
+    conferir_lotes()
+    dados, gabaritos = corpus.gerar_pdf_degradado(args.paginas)
+    doc = fitz.open(stream=dados, filetype='pdf')
+    matrizes = [motor_ocr._matriz(motor_ocr._renderizar(page, args.dpi, False)[0]).copy() for page in doc]
+
+    print(f"limiares: segunda leitura < {layout_ocr.CONFIANCA_MINIMA:g}, "
+          f"Gemini < {correcao_seletiva.CONFIANCA_MINIMA:g}")
+    print("OCR           tempo  confiança  acerto  blocos p/ Gemini")
+    resultados = {}
+    for modo in ('sem', 'seletiva', 'tudo'):
+        paginas, segundos, tempos = ocr(matrizes, modo)
+        resultados[modo] = paginas
+        duvidosos = len(correcao_seletiva.selecionar(paginas))
+        total = sum(len(p['blocos']) for p in paginas)
+        print(f"{modo:<10}{segundos:8.2f} s {confianca_media(paginas):9.1f} "
+              f"{acerto_medio(paginas, gabaritos):7.1%} {duvidosos:>8} de {total}"
+              + (f"  (segunda leitura {tempos['reocr']:.2f} s)" if 'reocr' in tempos else ''))
+
+    print()
+    print("Gemini        chamadas  tokens de entrada    tempo")
+    inteiro = gemini(resultados['seletiva'], seletiva=False)
+    seletivo = gemini(resultados['seletiva'], seletiva=True)
+    for nome, (chamadas, tokens, segundos) in (('documento', inteiro), ('seletivo', seletivo)):
+        print(f"{nome:<14}{chamadas:>8} {tokens:>18} {segundos:8.2f} s")
+    print(f"tokens: {seletivo[1] / inteiro[1]:.0%} do documento inteiro" if inteiro[1] else '')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Documento guardado no servidor x texto inteiro no campo oculto do formulário.
+
+Mede o tamanho da página de resultado e do POST para /gerar_html nos dois modos,
+além do espaço ocupado pelo texto comprimido no servidor.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_documentos --paginas 300
+"""
+import argparse
+import html
+import os
+import tempfile
+import time
+from urllib.parse import urlencode
+
+import documentos
+from benchmarks import corpus
+
+
+def kb(n):
+    return f"{n / 1024:10.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=300)
+    args = parser.parse_args()
+
+    texto = "\n\n".join(corpus.texto_pagina(i) + "\f" for i in range(args.paginas))
+    with tempfile.TemporaryDirectory() as pasta:
+        documentos.CAMINHO = os.path.join(pasta, "documentos.sqlite3")
+        inicio = time.perf_counter()
+        documento_id = documentos.guardar(texto)
+        guardar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        assert documentos.obter(documento_id) == texto
+        obter = time.perf_counter() - inicio
+        comprimido = documentos._obter_store().tamanho_total()
+
+    campo_antigo = len(f'<input type="hidden" name="ocr_texto" value="{html.escape(texto)}">'.encode())
+    campo_novo = len(f'<input type="hidden" name="documento_id" value="{documento_id}">'.encode())
+    exibido = len(html.escape(texto).encode())  # o texto visível continua na página
+    post_antigo = len(urlencode({"ocr_texto": texto}).encode())
+    post_novo = len(urlencode({"documento_id": documento_id}).encode())
+
+    print(f"texto do OCR:            {kb(len(texto.encode()))}")
+    print(f"página (texto + campo):  {kb(exibido + campo_antigo)} -> {kb(exibido + campo_novo)}")
+    print(f"POST para /gerar_html:   {kb(post_antigo)} -> {kb(post_novo)}")
+    print(f"guardado no servidor:    {kb(comprimido)} (zlib)")
+    print(f"guardar / obter:         {guardar * 1000:8.2f} ms / {obter * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
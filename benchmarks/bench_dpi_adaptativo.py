@@ -0,0 +1,73 @@
+"""DPI fixo em RGB x DPI adaptativo em tons de cinza: tempo, memória e acerto.
+
+Usa páginas escaneadas com corpos de letra de 7 a 28 pt (corpus.gerar_pdf_tamanhos).
+O acerto é a semelhança (difflib) entre a saída do OCR e o texto original de
+cada página, depois de normalizar os espaços. Rode com o tesseract real e os
+traineddata de por+eng; com um executável de teste os números de acerto não
+significam nada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_dpi_adaptativo
+"""
+import argparse
+import difflib
+import time
+
+import fitz
+
+import motor_ocr
+from benchmarks import corpus
+
+TAMANHOS = (7, 9, 11, 14, 20, 28)
+
+
+def acerto(saida, gabarito):
+    return difflib.SequenceMatcher(None, " ".join(saida.split()), " ".join(gabarito.split())).ratio()
+
+
+def renderizar_modo(page, modo):
+    if modo == "fixo RGB":  # comportamento anterior
+        return page.get_pixmap(dpi=motor_ocr.DPI_PADRAO, alpha=False), motor_ocr.DPI_PADRAO
+    return motor_ocr._renderizar(page, motor_ocr.DPI_PADRAO, adaptativo=(modo == "adaptativo"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lang", default=motor_ocr.LANG_PADRAO)
+    args = parser.parse_args()
+
+    dados, gabaritos = corpus.gerar_pdf_tamanhos(TAMANHOS)
+    modos = ("fixo RGB", "fixo cinza", "adaptativo")
+    linhas = {}
+    totais = {}
+    for modo in modos:
+        # Documento novo por modo: o MuPDF guarda as imagens já decodificadas
+        # e o modo seguinte sairia favorecido
+        with fitz.open(stream=dados, filetype="pdf") as doc:
+            for page, tamanho, gabarito in zip(doc, TAMANHOS, gabaritos):
+                inicio = time.perf_counter()
+                pix, dpi = renderizar_modo(page, modo)
+                meio = time.perf_counter()
+                saida = motor_ocr._reconhecer_pixmap(pix, args.lang)
+                fim = time.perf_counter()
+                mb = len(pix.samples_mv) / 1024 / 1024
+                nota = acerto(saida, gabarito)
+                linhas.setdefault(tamanho, []).append(
+                    f"{tamanho:>4}pt  {modo:<11} {dpi:>4} {mb:6.1f} {(meio - inicio) * 1000:7.0f}ms"
+                    f" {(fim - meio) * 1000:7.0f}ms {nota:7.1%}")
+                soma = totais.setdefault(modo, [0.0, 0.0, 0.0])
+                soma[0] += fim - inicio
+                soma[1] += mb
+                soma[2] += nota
+
+    print(f"{'corpo':>5}  {'modo':<11} {'DPI':>4} {'MB':>6} {'render':>8} {'OCR':>8} {'acerto':>7}")
+    for tamanho in TAMANHOS:
+        print("\n".join(linhas[tamanho]) + "\n")
+
+    print(f"{'modo':<11} {'tempo total':>12} {'MB médio':>9} {'acerto médio':>13}")
+    for modo, (tempo, mb, nota) in totais.items():
+        print(f"{modo:<11} {tempo:11.2f}s {mb / len(TAMANHOS):9.1f} {nota / len(TAMANHOS):13.1%}")
+
+
+if __name__ == "__main__":
+    main()
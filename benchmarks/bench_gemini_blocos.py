@@ -0,0 +1,57 @@
+"""Reestruturação com Gemini em blocos concorrentes, medida com um modelo falso.
+
+Compara a chamada única (prompt com o documento inteiro) com o envio em blocos
+para vários níveis de concorrência: latência total, tempo até o primeiro
+fragmento e quanto do documento sobrevive ao limite de saída do modelo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_gemini_blocos --paginas 80
+"""
+import argparse
+import time
+
+import gemini_blocos
+from benchmarks import corpus
+from benchmarks.gemini_falso import ModeloFalso
+
+
+def prompt(texto):
+    return f'Reestruture em HTML acessível.\n\nTexto OCR:\n"""{texto}"""'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=80)
+    parser.add_argument("--latencia", type=float, default=0.4, help="segundos até o 1º token")
+    parser.add_argument("--por-token", type=float, default=0.002, help="segundos por token gerado")
+    args = parser.parse_args()
+
+    texto = "".join(corpus.texto_pagina(i) + "\n\f" for i in range(args.paginas))
+    esperado = len(ModeloFalso(max_tokens_saida=10**9)._saida(prompt(texto)))
+
+    modelo = ModeloFalso(args.latencia, args.por_token)
+    inicio = time.perf_counter()
+    saida = modelo.generate_content(prompt(texto)).text
+    unica = time.perf_counter() - inicio
+    print(f"documento: {len(texto)} caracteres, "
+          f"{len(gemini_blocos.dividir_em_blocos(texto))} blocos")
+    print(f"{'modo':<14} {'total (s)':>10} {'1º frag (s)':>12} {'saída':>7} {'em voo':>7}")
+    print(f"{'chamada única':<14} {unica:>10.2f} {unica:>12.2f} {len(saida) / esperado:>7.0%} {1:>7}")
+
+    for simultaneos in (1, 2, 4, 8):
+        modelo = ModeloFalso(args.latencia, args.por_token)
+        gerar_bloco = lambda bloco: modelo.generate_content(prompt(bloco)).text
+        inicio = time.perf_counter()
+        primeiro = None
+        fragmentos = []
+        for fragmento in gemini_blocos.gerar_fragmentos(texto, gerar_bloco, max_simultaneos=simultaneos):
+            primeiro = primeiro or time.perf_counter() - inicio
+            fragmentos.append(fragmento)
+        total = time.perf_counter() - inicio
+        tamanho = len("\n".join(fragmentos))
+        print(f"{f'{simultaneos} em paralelo':<14} {total:>10.2f} {primeiro:>12.2f} "
+              f"{min(1, tamanho / esperado):>7.0%} {modelo.max_em_voo:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""OCR com layout: tamanho do prompt do Gemini e tempo, contra o texto corrido do OCR.
+
+Compara o texto do motor_ocr (o que ia para o Gemini antes) com o texto
+marcado do layout_ocr ('# ' título, '- ' item, '| ' tabela): caracteres,
+palavras (aproximação de tokens) e quantos blocos o gemini_blocos manda.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_layout --paginas 8 [--escaneado] [--workers 4]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import gemini_blocos
+import layout_ocr
+import motor_ocr
+from benchmarks import corpus
+
+
+def medir(nome, segundos, texto):
+    blocos = len(gemini_blocos.dividir_em_blocos(texto))
+    print(f"{nome:<14}{segundos:8.2f} s {len(texto):>10} {len(texto.split()):>9} {blocos:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=8)
+    parser.add_argument("--escaneado", action="store_true", help="páginas só com imagem (passa pelo tesseract)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    gerar = corpus.gerar_pdf_escaneado if args.escaneado else corpus.gerar_pdf_texto
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = corpus.salvar(gerar(args.paginas), os.path.join(pasta, "corpus.pdf"))
+        motor_ocr.obter_pool(args.workers)
+
+        inicio = time.perf_counter()
+        corrido = "\f".join(motor_ocr.ocr_pdf(caminho, workers=args.workers, usar_cache=False))
+        tempo_corrido = time.perf_counter() - inicio
+
+        relatorio = []
+        inicio = time.perf_counter()
+        paginas = layout_ocr.layout_pdf(caminho, workers=args.workers, usar_cache=False, relatorio=relatorio)
+        tempo_layout = time.perf_counter() - inicio
+        marcado = layout_ocr.paginas_para_prompt(paginas)
+
+        tipos = {}
+        for pagina in paginas:
+            for bloco in pagina['blocos']:
+                tipos[bloco['tipo']] = tipos.get(bloco['tipo'], 0) + 1
+
+        print("texto            tempo caracteres  palavras  blocos")
+        medir("OCR corrido", tempo_corrido, corrido)
+        medir("layout", tempo_layout, marcado)
+        print()
+        print(motor_ocr.resumir_relatorio(relatorio))
+        print("blocos do layout: " + ", ".join(f"{n} {tipo}" for tipo, n in sorted(tipos.items())))
+        print(f"prompt: {len(marcado) / len(corrido):.0%} dos caracteres do texto corrido")
+    motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""OCR de uma pasta: documento por documento (ocr_pdf) contra o fluxo único do ocr_lote.
+
+Pastas reais têm muitos arquivos de 1 a 3 páginas; processados um a um, cada
+documento só ocupa tantos workers quanto tem páginas e o pool fica ocioso
+entre um arquivo e outro.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_lote --arquivos 24 --workers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import motor_ocr
+from benchmarks import corpus
+
+
+def por_documento(entradas, workers, dpi):
+    paginas = 0
+    for _, caminho in entradas:
+        paginas += len(motor_ocr.ocr_pdf(caminho, dpi=dpi, workers=workers, usar_cache=False))
+    return paginas
+
+
+def em_lote(entradas, workers, dpi):
+    paginas = 0
+    for _, textos, _ in motor_ocr.ocr_lote(entradas, dpi=dpi, workers=workers, usar_cache=False):
+        paginas += len(textos or [])
+    return paginas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arquivos", type=int, default=24)
+    parser.add_argument("--max-paginas", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dpi", type=int, default=motor_ocr.DPI_PADRAO)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as pasta:
+        entradas = []
+        for i in range(args.arquivos):
+            nome = f"doc{i:03d}.pdf"
+            dados = corpus.gerar_pdf_escaneado(rnd.randint(1, args.max_paginas))
+            entradas.append((nome, corpus.salvar(dados, os.path.join(pasta, nome))))
+
+        motor_ocr.encerrar_pool()
+        pool = motor_ocr.obter_pool(args.workers)
+        list(pool.map(abs, range(args.workers)))  # aquece o pool
+
+        print(f"{'modo':>14} {'páginas':>8} {'segundos':>10} {'pág/s':>8}")
+        for modo, funcao in (("por documento", por_documento), ("lote", em_lote)):
+            inicio = time.perf_counter()
+            paginas = funcao(entradas, args.workers, args.dpi)
+            segundos = time.perf_counter() - inicio
+            print(f"{modo:>14} {paginas:>8} {segundos:>10.2f} {paginas / segundos:>8.2f}")
+    motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Conversor local de matemática (matematica_fala): corpus de referência e vazão.
+
+Confere cada exemplo de benchmarks/corpus_matematica (os do prompt antigo do
+Gemini e outras notações, sozinhos e no meio da prosa) e sai com erro se algum
+divergir. Depois mede:
+
+- microssegundos por expressão, sem o cache do converter();
+- converter_texto() sobre as páginas do corpus, com o cache frio e quente;
+- para comparar, uma chamada ao modelo falso pedindo a mesma descrição.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_matematica_fala --repeticoes 2000 --paginas 40
+"""
+import argparse
+import sys
+import time
+
+import matematica_fala
+import prompt_gemini
+from benchmarks import corpus
+from benchmarks.corpus_matematica import EXEMPLOS, TEXTOS
+from benchmarks.gemini_falso import ModeloFalso
+
+
+def conferir():
+    divergencias = 0
+    for funcao, casos in ((matematica_fala.descrever, EXEMPLOS), (matematica_fala.converter_texto, TEXTOS)):
+        for entrada, esperado in casos:
+            try:
+                obtido = funcao(entrada)
+            except matematica_fala.ExpressaoInvalida as e:
+                obtido = f"ExpressaoInvalida: {e}"
+            if obtido != esperado:
+                divergencias += 1
+                print(f"\033[31m{entrada!r}\n  esperado: {esperado!r}\n  obtido:   {obtido!r}\033[0m")
+    print(f"referência: {len(EXEMPLOS)} expressões e {len(TEXTOS)} parágrafos, {divergencias} divergência(s)")
+    return divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=2000, help="passadas sobre as expressões")
+    parser.add_argument("--paginas", type=int, default=40)
+    parser.add_argument("--latencia", type=float, default=0.4, help="segundos até o 1º token")
+    parser.add_argument("--por-token", type=float, default=0.002, help="segundos por token gerado")
+    args = parser.parse_args()
+
+    if conferir():
+        sys.exit(1)
+
+    expressoes = [entrada for entrada, _ in EXEMPLOS]
+    sem_cache = matematica_fala.converter.__wrapped__
+    inicio = time.perf_counter()
+    for _ in range(args.repeticoes):
+        for expressao in expressoes:
+            sem_cache(expressao)
+    total = time.perf_counter() - inicio
+    conversoes = args.repeticoes * len(expressoes)
+    print(f"converter sem cache: {total / conversoes * 1e6:.1f} µs por expressão "
+          f"({conversoes / total:,.0f} expressões/s)")
+
+    texto = '\n\n'.join(corpus.texto_pagina(i) for i in range(args.paginas))
+    for rodada in ('frio', 'quente'):
+        if rodada == 'frio':
+            matematica_fala.converter.cache_clear()
+        inicio = time.perf_counter()
+        convertido = matematica_fala.converter_texto(texto)
+        total = time.perf_counter() - inicio
+        print(f"converter_texto, cache {rodada}: {total * 1000:.1f} ms para {args.paginas} páginas "
+              f"({len(texto) / total / 1e6:.2f} M caracteres/s, "
+              f"{convertido.count(chr(92) + '(')} expressões convertidas)")
+
+    modelo = ModeloFalso(args.latencia, args.por_token)
+    expressao = expressoes[0]
+    inicio = time.perf_counter()
+    modelo.generate_content(prompt_gemini.TEXTO_HTML.format(texto_ocr=f"[equação] {expressao}"))
+    print(f"modelo falso, uma expressão: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Escalabilidade do motor de OCR paralelo: páginas/segundo por número de workers.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_motor_ocr --paginas 32
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import motor_ocr
+from benchmarks import corpus
+
+
+def medir(caminho, workers, dpi):
+    motor_ocr.encerrar_pool()
+    # Aquece o pool para não medir o custo de criar os processos
+    pool = motor_ocr.obter_pool(workers)
+    list(pool.map(abs, range(workers)))
+    inicio = time.perf_counter()
+    textos = motor_ocr.ocr_pdf(caminho, dpi=dpi, workers=workers)
+    return len(textos), time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=32)
+    parser.add_argument("--dpi", type=int, default=motor_ocr.DPI_PADRAO)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = corpus.salvar(corpus.gerar_pdf_escaneado(args.paginas),
+                                os.path.join(pasta, "escaneado.pdf"))
+        contagens = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+        base = None
+        print(f"{'workers':>8} {'segundos':>10} {'pág/s':>8} {'speedup':>8} {'eficiência':>11}")
+        for workers in contagens:
+            paginas, segundos = medir(caminho, workers, args.dpi)
+            taxa = paginas / segundos
+            base = base or taxa
+            print(f"{workers:>8} {segundos:>10.2f} {taxa:>8.2f} {taxa / base:>7.2f}x "
+                  f"{taxa / base / workers:>10.0%}")
+    motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Pré-processamento antes do OCR: segundos por página e acerto, com e sem cada etapa.
+
+Usa páginas escaneadas tortas, com sombra, granulado e borda preta
+(corpus.gerar_pdf_degradado). O acerto é a semelhança (difflib) entre a saída
+do OCR e o texto original da página. Rode com o tesseract real e os
+traineddata de por+eng; com um executável de teste os números de acerto não
+significam nada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_preprocessamento --paginas 6
+"""
+import argparse
+
+import motor_ocr
+import preprocessamento
+from benchmarks import corpus
+from benchmarks.bench_dpi_adaptativo import acerto
+
+
+def rodar(dados, gabaritos, etapas, lang):
+    relatorio = []
+    saidas = motor_ocr.ocr_pdf(dados, lang=lang, workers=1, usar_cache=False, texto_nativo=False,
+                               relatorio=relatorio, dpi_adaptativo=False, etapas=etapas)
+    tempos = {}
+    for item in relatorio:
+        for etapa, segundos in item['tempos'].items():
+            tempos[etapa] = tempos.get(etapa, 0.0) + segundos
+    notas = [acerto(saida, gabarito) for saida, gabarito in zip(saidas, gabaritos)]
+    return tempos, sum(notas) / len(notas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=6)
+    parser.add_argument("--lang", default=motor_ocr.LANG_PADRAO)
+    args = parser.parse_args()
+
+    dados, gabaritos = corpus.gerar_pdf_degradado(args.paginas)
+    modos = [("sem", ())] + [(etapa, (etapa,)) for etapa in preprocessamento.ORDEM]
+    modos.append(("todas", preprocessamento.ORDEM))
+    motor_ocr.obter_pool(1)
+
+    print(f"{'etapas':<12} {'pré s/pág':>10} {'OCR s/pág':>10} {'total s/pág':>12} {'acerto':>8}")
+    for nome, etapas in modos:
+        tempos, nota = rodar(dados, gabaritos, etapas, args.lang)
+        tesseract = tempos.pop('tesseract', 0.0) / args.paginas
+        pre = sum(tempos.values()) / args.paginas
+        print(f"{nome:<12} {pre:>10.3f} {tesseract:>10.3f} {pre + tesseract:>12.3f} {nota:>8.1%}")
+        if tempos:
+            print(f"{'':<12} {preprocessamento.resumir_tempos(tempos)}")
+    motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
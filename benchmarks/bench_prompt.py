@@ -0,0 +1,141 @@
+"""Tamanho do prompt do Gemini: o template antigo contra o prompt_gemini.
+
+O conjunto de teste imita a saída do tesseract sem layout: linhas quebradas
+em ~60 colunas com hifenização, espaços duplicados e linhas vazias a mais.
+Cada cenário reestrutura o documento em blocos (gemini_blocos) com o mesmo
+modelo falso, que cobra um tempo por token de entrada além do de saída:
+
+- antes: o bloco de instruções antigo (cópia abaixo) em toda chamada, com o
+  texto só com os espaços normalizados, em blocos de 12 mil caracteres;
+- depois: instruções enxutas (cobradas como entrada mesmo fora do prompt, já
+  que ficam abaixo do mínimo do context caching), texto normalizado e sem
+  hifenização, blocos no tamanho do orçamento de tokens.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_prompt --paginas 1,5,40
+"""
+import argparse
+import random
+import textwrap
+import time
+
+import gemini_blocos
+import prompt_gemini
+from benchmarks import corpus
+from benchmarks.gemini_falso import ModeloFalso, contar_tokens
+
+PROMPT_ANTIGO = """
+    Você é uma IA que transforma textos escaneados via OCR em documentos HTML acessíveis.
+    Suas tarefas incluem:
+    - Corrigir erros de OCR
+    - Detectar e formatar títulos, listas, tabelas e seções
+    - Converter equações para LaTeX (exibidas com MathJax)
+    - Estruturar o conteúdo com marcação HTML limpa
+    - Tornar o conteúdo ideal para leitores de tela
+    Você atuará como um conversor de expressões matemáticas para uma versão descritiva, em linguagem natural, ideal para leitores de tela e acessibilidade web.
+    O conteúdo a seguir é extraído por OCR a partir de documentos didáticos contendo expressões matemáticas (como derivadas, limites, integrais, funções, matrizes, planilhas etc).
+    Sua tarefa é:
+    1. Corrigir qualquer erro ortográfico ou de OCR;
+    2. Converter expressões matemáticas para texto descritivo, seguindo os exemplos abaixo;
+    3. Manter o conteúdo formatado com marcação HTML simples e/ou MathJax (`\\( ... \\)` para inline e `$$ ... $$` para blocos);
+    4. Retornar o resultado em **HTML completo**, pronto para ser exibido em navegadores com suporte a leitores automáticos.
+    ### Exemplo de Conversões:
+    `f(x) = x^2 + 1` → `A função f de x é igual a x ao quadrado mais um. Escrito como \\( f(x) = x^2 + 1 \\)`
+    `lim x→0 f(x)` → `O limite de f de x quando x tende a zero. Escrito como
+    `∫x^2 dx` → `A integral de x ao quadrado em relação a x. Escrito como
+    `2,34` → `dois vírgula três quatro`
+    `Matriz [[1, 2], [3, 4]]` → `Matriz de duas linhas e duas colunas com os elementos: primeira linha um e dois, segunda linha três e quatro`
+    `f'(x)` → `Derivada da função f em relação a x. Escrito como \\( f'(x) \\)`
+    `|x|` → `Valor absoluto de x. Escrito como \\( |x| \\)`
+    `Δx` → `Variação de x. Escrito como \\( \\Delta x \\)`
+    ### Importante:
+    - Sempre que possível, forneça as duas formas: descritiva e matemática.
+- Mantenha títulos, subtítulos e parágrafos intactos, substituindo apenas os trechos matemáticos ou ambíguos.
+- Conserve os separadores visuais e use HTML para listas, ênfases e headings.
+- Retorne o resultado em HTML **completo** entre `<html>...</html>`.
+
+    O texto pode vir pré-estruturado pelo OCR: '# ' marca títulos, '- ' ou '1. ' itens de lista,
+    '| a | b |' linhas de tabela e '[equação] ' expressões matemáticas. Use essa estrutura em vez de tentar adivinhá-la.
+
+    Gere o corpo HTML (sem <html> ou <head>), apenas o conteúdo principal com marcação semântica:
+
+
+    Texto OCR:
+    \"\"\"{texto_ocr}\"\"\"
+    """
+
+
+def linhas_tesseract(paragrafo, rnd, largura=60):
+    """Quebra o parágrafo como numa página impressa: palavras longas no fim da
+    linha são hifenizadas e alguns espaços saem duplicados"""
+    linhas = []
+    for linha in textwrap.wrap(paragrafo, largura, break_long_words=False):
+        if linhas and rnd.random() < 0.3:
+            # A primeira palavra da linha começou na anterior
+            palavra, _, resto = linha.partition(' ')
+            if len(palavra) > 6 and palavra.isalpha() and palavra.islower():
+                corte = len(palavra) // 2
+                linhas[-1] += f" {palavra[:corte]}-"
+                linha = palavra[corte:] + (' ' + resto if resto else '')
+        linhas.append(linha.replace(' ', '  ') if rnd.random() < 0.2 else linha)
+    return linhas
+
+
+def pagina_tesseract(indice):
+    rnd = random.Random(indice)
+    paragrafos = corpus.texto_pagina(indice).split('\n\n')
+    return '\n\n\n'.join('\n'.join(linhas_tesseract(p, rnd)) + ' ' for p in paragrafos)
+
+
+def reestruturar(texto, montar_prompt, max_caracteres, modelo):
+    maior = 0
+
+    def gerar_bloco(bloco):
+        nonlocal maior
+        prompt = montar_prompt(bloco)
+        maior = max(maior, contar_tokens(prompt))
+        return modelo.generate_content(prompt).text
+
+    inicio = time.perf_counter()
+    gemini_blocos.gerar_html_em_blocos(texto, gerar_bloco, max_simultaneos=1, max_caracteres=max_caracteres)
+    return time.perf_counter() - inicio, maior
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", default="1,5,40", help="tamanhos do conjunto de teste, em páginas")
+    parser.add_argument("--latencia", type=float, default=0.4, help="segundos até o 1º token")
+    parser.add_argument("--por-token", type=float, default=0.002, help="segundos por token gerado")
+    parser.add_argument("--por-token-entrada", type=float, default=0.0003,
+                        help="segundos por token de entrada")
+    args = parser.parse_args()
+
+    instrucoes = prompt_gemini.INSTRUCOES_HTML
+    cenarios = (
+        ('antes', lambda bloco: PROMPT_ANTIGO.format(texto_ocr=bloco), gemini_blocos.MAX_CARACTERES_BLOCO),
+        # system_instruction também é cobrada como entrada: vai junto na conta
+        ('depois',
+         lambda bloco: instrucoes + '\n' + prompt_gemini.montar(prompt_gemini.TEXTO_HTML, bloco, instrucoes),
+         prompt_gemini.caracteres_por_bloco(prompt_gemini.PROMPT_HTML)),
+    )
+    print(f"instruções: antes {contar_tokens(PROMPT_ANTIGO)} tokens, "
+          f"depois {contar_tokens(prompt_gemini.PROMPT_HTML)} tokens por chamada; "
+          f"orçamento {prompt_gemini.ORCAMENTO_TOKENS} tokens estimados por requisição")
+    print(f"{'páginas':>7}  {'cenário':<8}{'chamadas':>9}{'tokens entrada':>16}{'maior req.':>12}"
+          f"{'tempo (s)':>11}")
+    for paginas in (int(n) for n in args.paginas.split(',')):
+        texto = '\f'.join(pagina_tesseract(i) for i in range(paginas))
+        resultados = {}
+        for nome, montar_prompt, max_caracteres in cenarios:
+            modelo = ModeloFalso(args.latencia, args.por_token, segundos_por_token_entrada=args.por_token_entrada)
+            tempo, maior = reestruturar(texto, montar_prompt, max_caracteres, modelo)
+            resultados[nome] = (modelo.tokens_entrada, tempo)
+            print(f"{paginas:>7}  {nome:<8}{modelo.chamadas:>9}{modelo.tokens_entrada:>16}{maior:>12}{tempo:>11.2f}")
+        (tokens_antes, tempo_antes), (tokens_depois, tempo_depois) = resultados['antes'], resultados['depois']
+        print(f"{'':>7}  redução: {1 - tokens_depois / tokens_antes:.0%} dos tokens de entrada, "
+              f"{1 - tempo_depois / tempo_antes:.0%} do tempo "
+              f"(texto: {len(texto)} -> {len(prompt_gemini.normalizar(texto))} caracteres)")
+
+
+if __name__ == "__main__":
+    main()
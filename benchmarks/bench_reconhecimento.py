@@ -0,0 +1,108 @@
+"""Reconhecimento da pergunta por voz: Google (rede) contra modelo local (vosk).
+
+Mede, a partir do upload: fator de tempo real (RTF = segundos de
+reconhecimento / segundos de áudio), tempo até o primeiro texto parcial e a
+latência de ponta a ponta (audio_voz.preparar + reconhecimento_voz.transcrever).
+
+Os backends padrão são falsos, sem rede nem modelo:
+- google: envia o FLAC (~metade do PCM) na banda de subida dada, espera a ida
+  e volta e o processamento do serviço; só devolve o texto final;
+- local: gasta CPU proporcional ao áudio (RTF dado, ~0,2-0,4 para o modelo
+  pequeno do vosk num notebook) e gera um parcial a cada bloco.
+Com o pacote vosk e um modelo em VOSK_MODELO, o vosk real entra na tabela.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_reconhecimento [--arquivo pergunta.webm] [--rtf-local 0.3]
+"""
+import argparse
+import time
+
+import audio_voz
+import reconhecimento_voz
+from benchmarks.bench_audio_voz import pergunta_sintetica
+
+_PALAVRAS = "qual é a derivada de x ao quadrado mais três x".split()
+
+
+def google_falso(rtt, banda_mbps, processamento=0.15):
+    """Serviço web: upload + ida e volta + processamento proporcional ao áudio"""
+    def reconhecer(pcm):
+        envio = (len(pcm) / 2) * 8 / (banda_mbps * 1e6)  # FLAC comprime ~2x a fala
+        time.sleep(envio + rtt + processamento * audio_voz.duracao(pcm))
+        yield ' '.join(_PALAVRAS), True
+    return reconhecer
+
+
+def local_falso(rtf):
+    """Modelo local: CPU gasta bloco a bloco, como o vosk, com um parcial por bloco"""
+    def reconhecer(pcm):
+        tamanho = audio_voz.TAXA * 2 * reconhecimento_voz.BLOCO_MS // 1000
+        blocos = max(1, -(-len(pcm) // tamanho))
+        for i in range(blocos):
+            fim = time.process_time() + rtf * reconhecimento_voz.BLOCO_MS / 1000
+            while time.process_time() < fim:
+                pass
+            palavras = _PALAVRAS[:len(_PALAVRAS) * (i + 1) // blocos]
+            if palavras and i < blocos - 1:
+                yield ' '.join(palavras), False
+        yield ' '.join(_PALAVRAS), True
+    return reconhecer
+
+
+def medir(dados, backend, repeticoes):
+    rtf = primeiro = ponta = 0.0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        pcm = audio_voz.preparar(dados)
+        comeco_reconhecimento = time.perf_counter()
+        primeiro_texto = None
+        for texto, final in reconhecimento_voz.em_fluxo(pcm, backend):
+            if primeiro_texto is None:
+                primeiro_texto = time.perf_counter() - inicio
+            if final:
+                break
+        fim = time.perf_counter()
+        rtf += (fim - comeco_reconhecimento) / audio_voz.duracao(pcm)
+        primeiro += primeiro_texto
+        ponta += fim - inicio
+    return rtf / repeticoes, primeiro / repeticoes, ponta / repeticoes, texto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arquivo", help="áudio gravado (webm/ogg/wav); padrão: pergunta sintética")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--rtf-local", type=float, default=0.3)
+    args = parser.parse_args()
+
+    if args.arquivo:
+        with open(args.arquivo, 'rb') as f:
+            dados = f.read()
+    else:
+        dados = pergunta_sintetica()
+    print(f"fala: {audio_voz.duracao(audio_voz.preparar(dados)):.2f} s (depois do corte de silêncio)")
+
+    backends = [
+        ('google, rede boa', google_falso(rtt=0.08, banda_mbps=5)),
+        ('google, rede lenta', google_falso(rtt=0.8, banda_mbps=0.5)),
+        ('local (falso)', local_falso(args.rtf_local)),
+    ]
+    if reconhecimento_voz.vosk_disponivel():
+        inicio = time.perf_counter()
+        reconhecimento_voz.carregar_vosk()
+        print(f"vosk: modelo carregado uma vez, {time.perf_counter() - inicio:.1f} s (fora da tabela)")
+        backends.append(('vosk', 'vosk'))
+    else:
+        print("vosk: pacote ou modelo ausente (VOSK_MODELO); só os backends falsos")
+
+    print()
+    print(f"{'backend':<20}{'RTF':>6}{'1º texto':>11}{'ponta a ponta':>15}")
+    for nome, backend in backends:
+        rtf, primeiro, ponta, texto = medir(dados, backend, args.repeticoes)
+        print(f"{nome:<20}{rtf:6.2f}{primeiro * 1000:8.0f} ms{ponta * 1000:12.0f} ms")
+    if args.arquivo:
+        print(f"última transcrição: {texto}")
+
+
+if __name__ == "__main__":
+    main()
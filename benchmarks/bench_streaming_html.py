@@ -0,0 +1,70 @@
+"""Reestruturação com streaming: tempo até o primeiro fragmento na página.
+
+Compara o /gerar_html bloqueante (a página só sai com o HTML inteiro) com o
+streaming (gemini_blocos.gerar_fragmentos_em_fluxo: o primeiro bloco vem do
+modelo com stream=True e cada elemento completo vai saneado para a página),
+com o mesmo modelo falso. Mostra também o custo do saneamento
+(html_seguro) sobre o HTML já pronto.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_streaming_html --paginas 40
+"""
+import argparse
+import time
+
+import gemini_blocos
+import html_seguro
+from benchmarks import corpus
+from benchmarks.gemini_falso import ModeloFalso
+
+
+def prompt(texto):
+    return f'Reestruture em HTML acessível.\n\nTexto OCR:\n"""{texto}"""'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=40)
+    parser.add_argument("--latencia", type=float, default=0.4, help="segundos até o 1º token")
+    parser.add_argument("--por-token", type=float, default=0.002, help="segundos por token gerado")
+    parser.add_argument("--simultaneos", type=int, default=gemini_blocos.MAX_SIMULTANEOS)
+    args = parser.parse_args()
+
+    texto = "".join(corpus.texto_pagina(i) + "\n\f" for i in range(args.paginas))
+    print(f"documento: {len(texto)} caracteres, "
+          f"{len(gemini_blocos.dividir_em_blocos(texto))} blocos, {args.simultaneos} em paralelo")
+    print(f"{'modo':<12} {'1º frag (s)':>12} {'total (s)':>10} {'fragmentos':>11}")
+
+    modelo = ModeloFalso(args.latencia, args.por_token)
+    gerar_bloco = lambda bloco: modelo.generate_content(prompt(bloco)).text
+    inicio = time.perf_counter()
+    html = gemini_blocos.gerar_html_em_blocos(texto, gerar_bloco, max_simultaneos=args.simultaneos)
+    total = time.perf_counter() - inicio
+    print(f"{'bloqueante':<12} {total:>12.2f} {total:>10.2f} {1:>11}")
+
+    modelo = ModeloFalso(args.latencia, args.por_token)
+    gerar_bloco = lambda bloco: modelo.generate_content(prompt(bloco)).text
+
+    def gerar_bloco_fluxo(bloco):
+        for pedaco in modelo.generate_content(prompt(bloco), stream=True):
+            yield pedaco.text
+
+    inicio = time.perf_counter()
+    primeiro = None
+    fragmentos = []
+    for fragmento in gemini_blocos.gerar_fragmentos_em_fluxo(texto, gerar_bloco_fluxo, gerar_bloco,
+                                                             max_simultaneos=args.simultaneos):
+        primeiro = primeiro or time.perf_counter() - inicio
+        fragmentos.append(fragmento)
+    total = time.perf_counter() - inicio
+    print(f"{'streaming':<12} {primeiro:>12.2f} {total:>10.2f} {len(fragmentos):>11}")
+    if "\n".join(fragmentos) != html:
+        print("aviso: o HTML em streaming difere do bloqueante")
+
+    inicio = time.perf_counter()
+    html_seguro.sanear(html)
+    print(f"saneamento: {(time.perf_counter() - inicio) * 1000:.1f} ms para {len(html)} caracteres")
+
+
+if __name__ == "__main__":
+    main()
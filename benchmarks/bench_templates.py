@@ -0,0 +1,72 @@
+"""Template recompilado a cada requisição x compilado uma vez com CSS/JS em /static.
+
+"Antes" é o RESULT_HTML do app3 com o CSS e o JS de volta dentro da página,
+renderizado com render_template_string como era feito. "Depois" é o template
+pré-compilado com os arquivos estáticos servidos à parte (ETag + max-age).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_templates --repeticoes 300
+"""
+import argparse
+import os
+import re
+import time
+
+from flask import render_template, render_template_string
+
+import app3
+from benchmarks import corpus
+
+
+def _inline(template, app):
+    """Reconstrói a página antiga: o conteúdo dos estáticos volta para <style>/<script>"""
+    def ler(nome):
+        with open(os.path.join(app.static_folder, nome), encoding='utf-8') as f:
+            return f.read()
+    template = re.sub(r'<link rel="stylesheet" href="\{\{ estatico\(\'([\w.]+)\'\) \}\}">',
+                      lambda m: f"<style>\n{ler(m.group(1))}</style>", template)
+    return re.sub(r'<script src="\{\{ estatico\(\'([\w.]+)\'\) \}\}"></script>',
+                  lambda m: f"<script>\n{ler(m.group(1))}</script>", template)
+
+
+def medir(renderizar, repeticoes):
+    with app3.app.test_request_context('/ocr', method='POST'):
+        renderizar()  # aquece
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            pagina = renderizar()
+        return (time.perf_counter() - inicio) / repeticoes, len(pagina.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=300)
+    parser.add_argument("--paginas", type=int, default=5, help="páginas de texto no resultado")
+    args = parser.parse_args()
+
+    texto = "\n\n".join(corpus.texto_pagina(i) for i in range(args.paginas))
+    contexto = dict(filename="livro.pdf", text=texto, documento_id="0" * 32)
+    antigo = _inline(app3.RESULT_HTML, app3.app)
+
+    t_antes, b_antes = medir(lambda: render_template_string(antigo, **contexto), args.repeticoes)
+    t_depois, b_depois = medir(lambda: render_template(app3.RESULT, **contexto), args.repeticoes)
+
+    cliente = app3.app.test_client()
+    estaticos = 0
+    for nome in ("temas.css", "leitor.js"):
+        resposta = cliente.get(f"/static/{nome}")
+        estaticos += len(resposta.data)
+        revalidada = cliente.get(f"/static/{nome}", headers={"If-None-Match": resposta.headers["ETag"]})
+        print(f"/static/{nome}: {resposta.headers['Cache-Control']}, revalidação -> {revalidada.status_code}")
+        resposta.close()
+        revalidada.close()
+
+    print(f"\n{'':24}{'antes':>12}{'depois':>12}")
+    print(f"{'renderização (ms)':24}{t_antes * 1000:12.3f}{t_depois * 1000:12.3f}")
+    print(f"{'página (bytes)':24}{b_antes:12d}{b_depois:12d}")
+    print(f"{'1ª visita (bytes)':24}{b_antes:12d}{b_depois + estaticos:12d}")
+    print(f"{'visitas seguintes':24}{b_antes:12d}{b_depois:12d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Caminho rápido de texto nativo: vazão em um PDF misto (nativo + escaneado).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_texto_nativo --paginas 24 --escaneadas 0.25
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import motor_ocr
+from benchmarks import corpus
+
+
+def rodar(caminho, texto_nativo):
+    relatorio = []
+    inicio = time.perf_counter()
+    motor_ocr.ocr_pdf(caminho, usar_cache=False, texto_nativo=texto_nativo, relatorio=relatorio)
+    return time.perf_counter() - inicio, relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", type=int, default=24)
+    parser.add_argument("--escaneadas", type=float, default=0.25,
+                        help="fração de páginas só com imagem")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = corpus.salvar(corpus.gerar_pdf_misto(args.paginas, proporcao_escaneada=args.escaneadas),
+                                os.path.join(pasta, "misto.pdf"))
+        motor_ocr.obter_pool()
+        so_ocr, _ = rodar(caminho, texto_nativo=False)
+        rapido, relatorio = rodar(caminho, texto_nativo=True)
+
+        print("página  via     caracteres")
+        for item in relatorio:
+            print(f"{item['pagina']:>6}  {item['via']:<7} {item['caracteres']:>10}")
+        print()
+        print(motor_ocr.resumir_relatorio(relatorio))
+        print(f"só OCR:          {so_ocr:8.2f} s  ({args.paginas / so_ocr:7.2f} pág/s)")
+        print(f"com texto nativo:{rapido:8.2f} s  ({args.paginas / rapido:7.2f} pág/s)")
+        print(f"speedup:         {so_ocr / rapido:8.1f}x")
+    motor_ocr.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Síntese de voz concorrente: segundos de áudio por segundo de relógio.
+
+Simula várias requisições de voz chegando juntas (threads, como no Flask) e
+compara o motor único protegido por trava (o antigo `engine` global do app6)
+com o pool do servico_tts em vários tamanhos. Por padrão usa o sintetizador
+falso (benchmarks.tts_falso); --real usa o backend configurado (TTS_BACKEND).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_tts --pedidos 16 --clientes 8 [--real]
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import servico_tts
+from benchmarks import corpus, tts_falso
+
+
+def medir(sintetizar, frases, clientes):
+    latencias = []
+
+    def pedido(frase):
+        inicio = time.perf_counter()
+        wav = sintetizar(frase)
+        latencias.append(time.perf_counter() - inicio)
+        return servico_tts.duracao(wav)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(clientes) as clientes_pool:
+        audio = sum(clientes_pool.map(pedido, frases))
+    total = time.perf_counter() - inicio
+    latencias.sort()
+    return audio, total, statistics.median(latencias), latencias[int(0.95 * (len(latencias) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=16)
+    parser.add_argument("--clientes", type=int, default=8, help="requisições simultâneas")
+    parser.add_argument("--real", action="store_true", help="usa o motor de TTS de verdade")
+    args = parser.parse_args()
+
+    # Respostas curtas do assistente: dois ou três períodos do corpus
+    periodos = [p for i in range(args.pedidos) for p in corpus.texto_pagina(i).split('. ') if p]
+    frases = ['. '.join(periodos[i * 3:i * 3 + 3]) + '.' for i in range(args.pedidos)]
+    backend = None if args.real else tts_falso.sintetizar
+
+    print(f"{'modo':<16} {'áudio (s)':>10} {'relógio (s)':>12} {'áudio/s':>8} {'p50 (s)':>8} {'p95 (s)':>8}")
+    if not args.real:
+        trava = threading.Lock()
+
+        def motor_global(frase):
+            with trava:
+                return tts_falso.sintetizar(frase, servico_tts.VELOCIDADE, servico_tts.VOLUME)
+
+        audio, total, p50, p95 = medir(motor_global, frases, args.clientes)
+        print(f"{'motor global':<16} {audio:>10.1f} {total:>12.2f} {audio / total:>8.1f} {p50:>8.2f} {p95:>8.2f}")
+
+    for workers in (1, 2, 4):
+        servico_tts.obter_pool(workers, backend)
+        servico_tts.sintetizar("aquecimento")  # carrega o motor antes de medir
+        audio, total, p50, p95 = medir(servico_tts.sintetizar, frases, args.clientes)
+        print(f"{f'pool {workers} workers':<16} {audio:>10.1f} {total:>12.2f} {audio / total:>8.1f} "
+              f"{p50:>8.2f} {p95:>8.2f}")
+    servico_tts.encerrar_pool()
+
+
+if __name__ == "__main__":
+    main()
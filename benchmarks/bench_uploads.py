@@ -0,0 +1,138 @@
+"""Uploads simultâneos: pico de memória e de disco, com e sem temporário em tmp/.
+
+Cada modo roda num processo separado (o pico de RSS só cresce) com N clientes
+enviando o mesmo PDF ao /ocr do app3 ao mesmo tempo:
+
+  antes    upload salvo em tmp/tmp_<uuid>_<nome> e reaberto pelo caminho
+  memória  upload aberto direto da memória (bytes + memória compartilhada)
+  disco    todo upload acima de 0 bytes vai para um temporário (pior caso do limite)
+
+O cache de OCR fica desligado para cada requisição fazer o trabalho completo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_uploads --clientes 8 --paginas 6
+"""
+import argparse
+import io
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+MODOS = ("antes", "memória", "disco")
+
+
+def _tamanho_pasta(pasta):
+    total = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nome))
+            except OSError:
+                pass
+    return total
+
+
+def rodar_modo(modo, clientes, paginas):
+    os.environ['OCR_CACHE'] = ''
+    pasta_tmp = tempfile.mkdtemp(prefix='bench_uploads_')
+    os.environ['UPLOAD_TMP'] = pasta_tmp
+    import flask
+    import pytesseract
+    import motor_ocr
+    import uploads
+    import app3
+    from benchmarks import corpus
+
+    motor_ocr.CACHE_CAMINHO = ''
+    if not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
+        pytesseract.pytesseract.tesseract_cmd = 'tesseract'  # o app3 traz o caminho do Windows
+    uploads.PASTA_TEMPORARIOS = pasta_tmp
+    if modo == "disco":
+        uploads.LIMITE_MEMORIA = 0
+    rota = '/ocr'
+    if modo == "antes":
+        # A rota antiga: Request padrão do Flask e cópia do upload em tmp/
+        app3.app.request_class = flask.Request
+        pasta_antiga = os.path.join(pasta_tmp, 'tmp')
+
+        @app3.app.route('/ocr_antigo', methods=['POST'])
+        def ocr_antigo():
+            uploaded = flask.request.files['file']
+            os.makedirs(pasta_antiga, exist_ok=True)
+            tmp_path = os.path.join(pasta_antiga, f"tmp_{uuid.uuid4().hex}_{uploaded.filename}")
+            uploaded.save(tmp_path)
+            try:
+                return "\n\n".join(motor_ocr.ocr_pdf(tmp_path))
+            finally:
+                os.remove(tmp_path)
+        rota = '/ocr_antigo'
+
+    pdf = corpus.gerar_pdf_escaneado(paginas)
+    motor_ocr.obter_pool()
+    pico_disco = 0
+    rodando = True
+    falhas = []
+
+    def vigiar_disco():
+        nonlocal pico_disco
+        while rodando:
+            pico_disco = max(pico_disco, _tamanho_pasta(pasta_tmp))
+            time.sleep(0.005)
+
+    def cliente():
+        resposta = app3.app.test_client().post(
+            rota, data={'file': (io.BytesIO(pdf), 'livro.pdf')}, content_type='multipart/form-data')
+        resposta.get_data()
+        resposta.close()
+        if resposta.status_code != 200:
+            falhas.append(resposta.status_code)
+
+    vigia = threading.Thread(target=vigiar_disco)
+    vigia.start()
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    segundos = time.perf_counter() - inicio
+    rodando = False
+    vigia.join()
+    motor_ocr.encerrar_pool()
+    if falhas:
+        raise SystemExit(f"{modo}: {len(falhas)} requisições falharam ({falhas[0]})")
+    sobrou = _tamanho_pasta(pasta_tmp)
+    shutil.rmtree(pasta_tmp)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rss_workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"{modo:<8} {segundos:8.2f}s {rss:10.0f} {rss_workers:12.0f} {pico_disco / 1024 / 1024:11.1f}"
+          f" {sobrou:9d}  (PDF de {len(pdf) / 1024 / 1024:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--paginas", type=int, default=6)
+    parser.add_argument("--modo", choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        rodar_modo(args.modo, args.clientes, args.paginas)
+        return
+    print(f"{'modo':<8} {'tempo':>9} {'RSS (MB)':>10} {'workers (MB)':>12} {'disco (MB)':>11} {'sobrou':>9}")
+    for modo in MODOS:
+        saida = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.bench_uploads",
+                                "--modo", modo, "--clientes", str(args.clientes),
+                                "--paginas", str(args.paginas)],
+                               check=True, stdout=subprocess.PIPE, text=True).stdout
+        print(saida.strip().splitlines()[-1])  # a linha do resultado, sem os logs do app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Resposta por voz: tempo até o primeiro áudio, resposta inteira contra frase a frase.
+
+Antes: espera o texto inteiro do Gemini, sintetiza tudo num WAV só e envia.
+Agora (servico_tts.falar_em_fluxo): o Gemini responde em streaming e cada frase
+vai para o pool de TTS assim que termina. Usa o modelo falso
+(benchmarks.gemini_falso) e o sintetizador falso (benchmarks.tts_falso).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_voz --paragrafos 12 --workers 2
+"""
+import argparse
+import time
+
+import servico_tts
+from benchmarks import corpus, tts_falso
+from benchmarks.gemini_falso import ModeloFalso
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragrafos", type=int, default=12, help="tamanho da resposta")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--latencia", type=float, default=0.4, help="segundos até o 1º token")
+    parser.add_argument("--por-token", type=float, default=0.01, help="segundos por token gerado")
+    args = parser.parse_args()
+
+    resposta = corpus.texto_pagina(0, args.paragrafos)
+    prompt = f'Responda por voz.\n"""{resposta}"""'
+    servico_tts.obter_pool(args.workers, tts_falso.sintetizar)
+    servico_tts.sintetizar("aquecimento")
+
+    modelo = ModeloFalso(args.latencia, args.por_token, expansao=1.0)
+    inicio = time.perf_counter()
+    texto = modelo.generate_content(prompt).text
+    texto_pronto = time.perf_counter() - inicio
+    wav = servico_tts.sintetizar(servico_tts._para_fala(texto))
+    antes = time.perf_counter() - inicio
+    audio = servico_tts.duracao(wav)
+
+    inicio = time.perf_counter()
+    primeiro = None
+    segmentos = 0
+    for wav in servico_tts.falar_em_fluxo(parte.text for parte in modelo.generate_content(prompt, stream=True)):
+        primeiro = primeiro or time.perf_counter() - inicio
+        segmentos += 1
+    agora = time.perf_counter() - inicio
+    servico_tts.encerrar_pool()
+
+    print(f"resposta: {len(texto)} caracteres, {audio:.1f} s de áudio, {segmentos} frases")
+    print(f"{'modo':<14} {'1º áudio (s)':>13} {'último (s)':>11}")
+    print(f"{'inteira':<14} {antes:>13.2f} {antes:>11.2f}   (texto pronto em {texto_pronto:.2f} s)")
+    print(f"{'frase a frase':<14} {primeiro:>13.2f} {agora:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
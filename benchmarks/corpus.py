@@ -0,0 +1,137 @@
+"""Corpus sintético para os benchmarks (gerado de forma determinística com PyMuPDF)"""
+import io
+import random
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+PARAGRAFOS = [
+    "Capítulo 1 - Funções e Limites",
+    "A função f de x é definida por f(x) = x^2 + 1 para todo x real. "
+    "Observe que o gráfico é uma parábola com concavidade voltada para cima.",
+    "O limite de f(x) quando x tende a zero é igual a um. Em notação, lim x→0 f(x) = 1.",
+    "Exercício 2. Calcule a integral ∫x^2 dx e verifique o resultado derivando a primitiva.",
+    "A variação Δx representa a diferença entre dois valores de x, e |x| indica o valor absoluto.",
+    "Tabela 1: valores de x e f(x) para x = 0, 1, 2, 3, com f(x) = 1, 2, 5, 10.",
+    "Segundo o enunciado, a derivada f'(x) = 2x descreve a taxa de variação instantânea.",
+    "Resumo: revise os conceitos de domínio, imagem, continuidade e derivada antes da prova.",
+]
+
+
+def texto_pagina(indice, paragrafos=6):
+    """Texto reprodutível de uma página (mesmo índice, mesmo texto)"""
+    rnd = random.Random(indice)
+    return "\n\n".join(rnd.choice(PARAGRAFOS) for _ in range(paragrafos))
+
+
+def _escrever_pagina(doc, indice, tamanho_fonte):
+    page = doc.new_page(width=595, height=842)  # A4 em pontos
+    area = fitz.Rect(50, 50, 545, 792)
+    page.insert_textbox(area, texto_pagina(indice), fontsize=tamanho_fonte, fontname="helv")
+    return page
+
+
+def gerar_pdf_texto(paginas=8, tamanho_fonte=11):
+    """PDF "nativo digital": cada página tem camada de texto"""
+    doc = fitz.open()
+    for i in range(paginas):
+        _escrever_pagina(doc, i, tamanho_fonte)
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def gerar_pdf_escaneado(paginas=8, tamanho_fonte=11, dpi=150):
+    """PDF de páginas escaneadas: só imagem, sem camada de texto"""
+    origem = fitz.open()
+    doc = fitz.open()
+    for i in range(paginas):
+        pix = _escrever_pagina(origem, i, tamanho_fonte).get_pixmap(dpi=dpi, alpha=False)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=pix.tobytes("jpg"))
+    dados = doc.tobytes()
+    doc.close()
+    origem.close()
+    return dados
+
+
+def gerar_pdf_tamanhos(tamanhos=(7, 9, 11, 14, 20, 28), dpi=300):
+    """Páginas escaneadas, cada uma num corpo de letra (nota de rodapé a slide).
+
+    Devolve (pdf, textos): o texto de cada página serve de gabarito para medir o
+    acerto do OCR. Letras grandes levam menos parágrafos para caber na página.
+    """
+    origem = fitz.open()
+    doc = fitz.open()
+    textos = []
+    for i, tamanho in enumerate(tamanhos):
+        for paragrafos in range(6, 0, -1):
+            texto = texto_pagina(i, paragrafos)
+            pagina = origem.new_page(width=595, height=842)
+            if pagina.insert_textbox(fitz.Rect(50, 50, 545, 792), texto, fontsize=tamanho,
+                                     fontname="helv") >= 0:
+                break
+            origem.delete_page(-1)
+        pix = pagina.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=pix.tobytes("jpg"))
+        textos.append(texto)
+    dados = doc.tobytes()
+    doc.close()
+    origem.close()
+    return dados, textos
+
+
+def gerar_pdf_misto(paginas=8, tamanho_fonte=11, proporcao_escaneada=0.5):
+    """Mistura páginas nativas e escaneadas, intercaladas de forma reprodutível"""
+    rnd = random.Random(paginas)
+    texto = fitz.open(stream=gerar_pdf_texto(paginas, tamanho_fonte), filetype="pdf")
+    escaneado = fitz.open(stream=gerar_pdf_escaneado(paginas, tamanho_fonte), filetype="pdf")
+    doc = fitz.open()
+    for i in range(paginas):
+        fonte = escaneado if rnd.random() < proporcao_escaneada else texto
+        doc.insert_pdf(fonte, from_page=i, to_page=i)
+    dados = doc.tobytes()
+    for d in (doc, texto, escaneado):
+        d.close()
+    return dados
+
+
+def gerar_pdf_degradado(paginas=6, tamanho_fonte=11, dpi=200, inclinacao_max=3.0):
+    """Páginas escaneadas "de verdade": tortas, com sombra, granulado e borda preta.
+
+    Devolve (pdf, textos), como gerar_pdf_tamanhos.
+    """
+    rnd = random.Random(paginas)
+    gerador = np.random.default_rng(paginas)
+    origem = fitz.open()
+    doc = fitz.open()
+    textos = []
+    for i in range(paginas):
+        pix = _escrever_pagina(origem, i, tamanho_fonte).get_pixmap(
+            dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+        img = img.rotate(rnd.uniform(-inclinacao_max, inclinacao_max), resample=Image.BILINEAR,
+                         fillcolor=255)
+        pixels = np.asarray(img).astype(np.float32)
+        # Sombra da lombada: escurece gradualmente da esquerda para a direita
+        pixels *= np.linspace(0.7, 1.0, pixels.shape[1], dtype=np.float32)[None, :]
+        pixels[gerador.random(pixels.shape) < 0.002] = 0  # granulado
+        pixels[:, :int(0.02 * pixels.shape[1])] = 20  # borda preta do scanner
+        pixels = np.clip(pixels + gerador.normal(0, 8, pixels.shape), 0, 255).astype(np.uint8)
+        saida = io.BytesIO()
+        Image.fromarray(pixels).save(saida, "JPEG", quality=80)
+        page = doc.new_page(width=595, height=842)
+        page.insert_image(page.rect, stream=saida.getvalue())
+        textos.append(texto_pagina(i))
+    dados = doc.tobytes()
+    doc.close()
+    origem.close()
+    return dados, textos
+
+
+def salvar(dados, caminho):
+    with open(caminho, "wb") as f:
+        f.write(dados)
+    return caminho
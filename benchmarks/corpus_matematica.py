@@ -0,0 +1,111 @@
+"""Corpus de referência do matematica_fala: entrada -> saída esperada.
+
+EXEMPLOS começa pelos exemplos de conversão que ficavam no prompt do Gemini
+(o que o modelo fazia e agora sai das regras) e segue com outras notações
+comuns do material didático. TEXTOS cobre a conversão dentro da prosa com os
+parágrafos do corpus dos benchmarks, e depois o que tem cara de matemática mas
+deve ficar igual (linhas de tabela, barras e apóstrofos da prosa). O
+bench_matematica_fala confere tudo antes de medir.
+"""
+from benchmarks.corpus import PARAGRAFOS
+
+# (expressão, matematica_fala.descrever(expressão))
+EXEMPLOS = [
+    # Os do prompt antigo
+    ('f(x) = x^2 + 1',
+     r'A função f de x é igual a x ao quadrado mais um. Escrito como \( f(x) = x^2 + 1 \)'),
+    ('lim x→0 f(x)',
+     r'O limite de f de x quando x tende a zero. Escrito como \( \lim_{x \to 0} f(x) \)'),
+    ('∫x^2 dx',
+     r'A integral de x ao quadrado em relação a x. Escrito como \( \int x^2 \, dx \)'),
+    ('2,34',
+     'dois vírgula três quatro'),
+    ('Matriz [[1, 2], [3, 4]]',
+     'Matriz de duas linhas e duas colunas com os elementos: primeira linha um e dois, segunda '
+     r'linha três e quatro. Escrito como \( \begin{bmatrix} 1 & 2 \\ 3 & 4 \end{bmatrix} \)'),
+    ("f'(x)",
+     r"Derivada da função f em relação a x. Escrito como \( f'(x) \)"),
+    ('|x|',
+     r'Valor absoluto de x. Escrito como \( |x| \)'),
+    ('Δx',
+     r'Variação de x. Escrito como \( \Delta x \)'),
+    # Outras notações
+    ('lim x→0 f(x) = 1',
+     r'O limite de f de x quando x tende a zero é igual a um. Escrito como \( \lim_{x \to 0} f(x) = 1 \)'),
+    ("f'(x) = 2x",
+     r"A derivada da função f em relação a x é igual a dois x. Escrito como \( f'(x) = 2x \)"),
+    ('x = 0, 1, 2, 3',
+     r'x é igual a zero, um, dois e três. Escrito como \( x = 0, 1, 2, 3 \)'),
+    ("f''(x) = 2",
+     r"A derivada segunda da função f em relação a x é igual a dois. Escrito como \( f''(x) = 2 \)"),
+    ('sen(x)/x',
+     r'Seno de x dividido por x. Escrito como \( \frac{\operatorname{sen}(x)}{x} \)'),
+    ('(x + 1)^2',
+     r'Abre parênteses x mais um fecha parênteses ao quadrado. Escrito como \( (x + 1)^2 \)'),
+    ('(x + 1)/2',
+     r'Fração de numerador x mais um e denominador dois. Escrito como \( \frac{x + 1}{2} \)'),
+    ('√(x + 1)',
+     r'Raiz quadrada de abre parênteses x mais um fecha parênteses. Escrito como \( \sqrt{x + 1} \)'),
+    ('∫_0^1 x dx',
+     r'A integral de zero a um de x em relação a x. Escrito como \( \int_{0}^{1} x \, dx \)'),
+    ('lim x→∞ 1/x = 0',
+     r'O limite de um dividido por x quando x tende a infinito é igual a zero. Escrito como \( '
+     r'\lim_{x \to \infty} \frac{1}{x} = 0 \)'),
+    ('x_1 + x_2',
+     r'x índice um mais x índice dois. Escrito como \( x_1 + x_2 \)'),
+    ('e^{x + 1}',
+     r'e elevado a abre parênteses x mais um fecha parênteses. Escrito como \( e^{x + 1} \)'),
+    ('2x^3 - 5x + 1 = 0',
+     r'Dois x ao cubo menos cinco x mais um é igual a zero. Escrito como \( 2x^3 - 5x + 1 = 0 \)'),
+    ('|x - 1| < ε',
+     'Valor absoluto de abre parênteses x menos um fecha parênteses é menor que épsilon. '
+     r'Escrito como \( |x - 1| < \varepsilon \)'),
+    ('a ≤ b',
+     r'a é menor ou igual a b. Escrito como \( a \leq b \)'),
+    ('n!',
+     r'n fatorial. Escrito como \( n! \)'),
+    ('πr^2',
+     r'Pi r ao quadrado. Escrito como \( \pi r^2 \)'),
+    ('cos(2x)',
+     r'Cosseno de dois x. Escrito como \( \cos(2x) \)'),
+    ('1200',
+     'mil e duzentos'),
+    ('3,14',
+     'três vírgula um quatro'),
+]
+
+# (parágrafo, matematica_fala.converter_texto(parágrafo))
+TEXTOS = [
+    (PARAGRAFOS[0],
+     'Capítulo 1 - Funções e Limites'),
+    (PARAGRAFOS[1],
+     r'A função f de x é definida por \( f(x) = x^2 + 1 \) (f de x é igual a x ao quadrado mais '
+     'um) para todo x real. Observe que o gráfico é uma parábola com concavidade voltada para '
+     'cima.'),
+    (PARAGRAFOS[2],
+     r'O limite de f(x) quando x tende a zero é igual a um. Em notação, \( \lim_{x \to 0} f(x) = '
+     r'1 \) (o limite de f de x quando x tende a zero é igual a um).'),
+    (PARAGRAFOS[3],
+     r'Exercício 2. Calcule a integral \( \int x^2 \, dx \) (a integral de x ao quadrado em '
+     'relação a x) e verifique o resultado derivando a primitiva.'),
+    (PARAGRAFOS[4],
+     r'A variação \( \Delta x \) (variação de x) representa a diferença entre dois valores de x, '
+     r'e \( |x| \) (valor absoluto de x) indica o valor absoluto.'),
+    (PARAGRAFOS[5],
+     r'Tabela 1: valores de x e f(x) para \( x = 0, 1, 2, 3 \) (x é igual a zero, um, dois e '
+     r'três), com \( f(x) = 1, 2, 5, 10 \) (f de x é igual a um, dois, cinco e dez).'),
+    (PARAGRAFOS[6],
+     r"Segundo o enunciado, a derivada \( f'(x) = 2x \) (derivada da função f em relação a x é "
+     "igual a dois x) descreve a taxa de variação instantânea."),
+    (PARAGRAFOS[7],
+     'Resumo: revise os conceitos de domínio, imagem, continuidade e derivada antes da prova.'),
+    # Linhas de tabela do layout_ocr (células de uma letra não viram |b|) e prosa
+    ('| a | b |\n| --- | --- |\n| x | f(x) |\n| 0 | 1 |',
+     '| a | b |\n| --- | --- |\n| x | f(x) |\n| 0 | 1 |'),
+    ('Marque a | b | c conforme o caso.',
+     'Marque a | b | c conforme o caso.'),
+    ("Um copo d'água por dia, e exemplos em C++ no apêndice.",
+     "Um copo d'água por dia, e exemplos em C++ no apêndice."),
+    ('Resolva |x| + 1 = 3.',
+     r'Resolva \( |x| + 1 = 3 \) (valor absoluto de x mais um é igual a três).'),
+]
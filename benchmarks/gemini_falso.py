@@ -0,0 +1,88 @@
+"""GenerativeModel falso para medir latência e vazão sem rede nem custo.
+
+Imita o formato de resposta do google.generativeai: `generate_content(prompt)`
+devolve um objeto com `.text`; com `stream=True`, um iterável de pedaços com
+`.text`. A latência segue o comportamento típico de um LLM: um tempo até o
+primeiro token (mais, se pedido, um custo por token de entrada) e um custo por
+token gerado, e a saída é cortada no limite de tokens do modelo.
+"""
+import html
+import re
+import threading
+import time
+
+
+class _Resposta:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Contagem:
+    def __init__(self, total_tokens):
+        self.total_tokens = total_tokens
+
+
+def contar_tokens(texto):
+    """Aproximação usada pelos benchmarks: ~4 caracteres por token"""
+    return max(1, len(texto) // 4)
+
+
+class ModeloFalso:
+    def __init__(self, latencia_inicial=0.4, segundos_por_token=0.002,
+                 max_tokens_saida=8192, expansao=1.6, model_name='models/gemini-falso',
+                 segundos_por_token_entrada=0.0):
+        self.model_name = model_name
+        self.latencia_inicial = latencia_inicial
+        self.segundos_por_token = segundos_por_token
+        self.max_tokens_saida = max_tokens_saida
+        self.expansao = expansao
+        self.segundos_por_token_entrada = segundos_por_token_entrada
+        self.chamadas = 0
+        self.tokens_entrada = 0
+        self.em_voo = 0
+        self.max_em_voo = 0
+        self._trava = threading.Lock()
+
+    def _texto_ocr(self, prompt):
+        # O texto do OCR vem por último no prompt, entre aspas triplas
+        partes = re.split(r'"""', prompt)
+        return partes[-2] if len(partes) >= 3 else prompt
+
+    def _saida(self, prompt):
+        paragrafos = [p.strip() for p in self._texto_ocr(prompt).split('\n\n') if p.strip()]
+        # O HTML descritivo costuma sair maior que o texto de entrada
+        saida = '\n'.join(
+            f"<p>{html.escape(p)}</p><p class=\"sr-only\">{html.escape(p[:int(len(p) * (self.expansao - 1))])}</p>"
+            for p in paragrafos)
+        return saida[:self.max_tokens_saida * 4]
+
+    def count_tokens(self, conteudo):
+        return _Contagem(contar_tokens(conteudo if isinstance(conteudo, str) else str(conteudo)))
+
+    def generate_content(self, prompt, stream=False, **_):
+        with self._trava:
+            self.chamadas += 1
+            self.tokens_entrada += contar_tokens(prompt)
+            self.em_voo += 1
+            self.max_em_voo = max(self.max_em_voo, self.em_voo)
+        saida = self._saida(prompt)
+        inicial = self.latencia_inicial + contar_tokens(prompt) * self.segundos_por_token_entrada
+        if stream:
+            return self._em_pedacos(saida, inicial)
+        try:
+            time.sleep(inicial + contar_tokens(saida) * self.segundos_por_token)
+        finally:
+            with self._trava:
+                self.em_voo -= 1
+        return _Resposta(saida)
+
+    def _em_pedacos(self, saida, inicial, tamanho=400):
+        try:
+            time.sleep(inicial)
+            for i in range(0, len(saida), tamanho):
+                pedaco = saida[i:i + tamanho]
+                time.sleep(contar_tokens(pedaco) * self.segundos_por_token)
+                yield _Resposta(pedaco)
+        finally:
+            with self._trava:
+                self.em_voo -= 1
@@ -0,0 +1,163 @@
+"""Servidor HTTP local que imita a API de um LLM sob carga, e um cliente para ele.
+
+O servidor (ServidorFalso) responde POST /gerar com latência de LLM (tempo até
+o primeiro token + custo por token, com cauda log-normal) e se comporta como
+uma cota real:
+
+- acima de `capacidade` requisições simultâneas, responde 429 na hora;
+- uma fração `taxa_503` das requisições falha com 503;
+- uma fração `taxa_travada` fica `travada` segundos sem responder (o caso que
+  só um timeout resolve).
+
+ModeloHTTP tem a interface do GenerativeModel (generate_content -> .text) e
+fala com o servidor por HTTP/1.1; com `reusar=True` cada thread mantém a sua
+conexão aberta (keep-alive), senão abre uma por chamada.
+"""
+import http.client
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.gemini_falso import _Resposta, contar_tokens
+
+
+class ErroHTTP(Exception):
+    """Erro de status do servidor; `code` como nas exceções do google.api_core"""
+
+    def __init__(self, code, mensagem=''):
+        super().__init__(f"HTTP {code} {mensagem}".strip())
+        self.code = code
+
+
+class ServidorFalso:
+    def __init__(self, capacidade=4, latencia_inicial=0.3, segundos_por_token=0.001,
+                 taxa_503=0.03, taxa_travada=0.01, travada=20.0, semente=1):
+        self.capacidade = capacidade
+        self.latencia_inicial = latencia_inicial
+        self.segundos_por_token = segundos_por_token
+        self.taxa_503 = taxa_503
+        self.taxa_travada = taxa_travada
+        self.travada = travada
+        self.contagem = {'requisicoes': 0, '429': 0, '503': 0, 'travadas': 0, 'conexoes': 0, 'max_em_voo': 0}
+        self._em_voo = 0
+        self._trava = threading.Lock()
+        self._aleatorio = random.Random(semente)
+        self._parar = threading.Event()
+        self._http = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._http.daemon_threads = True
+        self.endereco = self._http.server_address
+
+    def _sortear(self):
+        with self._trava:
+            return self._aleatorio.random(), self._aleatorio.lognormvariate(0, 0.35)
+
+    def _processar(self, prompt):
+        sorteio, cauda = self._sortear()
+        if sorteio < self.taxa_503:
+            with self._trava:
+                self.contagem['503'] += 1
+            return 503, {'erro': 'sobrecarga'}
+        if sorteio < self.taxa_503 + self.taxa_travada:
+            with self._trava:
+                self.contagem['travadas'] += 1
+            self._parar.wait(self.travada)
+        saida = prompt[:2000]
+        self._parar.wait((self.latencia_inicial + contar_tokens(saida) * self.segundos_por_token) * cauda)
+        return 200, {'text': saida}
+
+    def _handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def setup(self):
+                super().setup()
+                with servidor._trava:
+                    servidor.contagem['conexoes'] += 1
+
+            def log_message(self, *_):
+                pass
+
+            def _responder(self, status, corpo):
+                dados = json.dumps(corpo).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(dados)))
+                self.end_headers()
+                try:
+                    self.wfile.write(dados)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # o cliente desistiu (timeout) antes da resposta
+
+            def do_POST(self):
+                prompt = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['prompt']
+                with servidor._trava:
+                    servidor.contagem['requisicoes'] += 1
+                    if servidor._em_voo >= servidor.capacidade:
+                        servidor.contagem['429'] += 1
+                        cheio = True
+                    else:
+                        servidor._em_voo += 1
+                        servidor.contagem['max_em_voo'] = max(servidor.contagem['max_em_voo'], servidor._em_voo)
+                        cheio = False
+                if cheio:
+                    return self._responder(429, {'erro': 'cota excedida'})
+                try:
+                    status, corpo = servidor._processar(prompt)
+                finally:
+                    # A vaga é liberada antes de a resposta sair, como numa cota de verdade
+                    with servidor._trava:
+                        servidor._em_voo -= 1
+                self._responder(status, corpo)
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._http.shutdown()
+        self._http.server_close()
+
+
+class ModeloHTTP:
+    def __init__(self, endereco, reusar=True, model_name='models/gemini-falso-http'):
+        self.endereco = endereco
+        self.reusar = reusar
+        self.model_name = model_name
+        self._local = threading.local()
+
+    def _conexao(self, timeout):
+        con = getattr(self._local, 'con', None) if self.reusar else None
+        if con is None:
+            con = http.client.HTTPConnection(*self.endereco, timeout=timeout)
+            if self.reusar:
+                self._local.con = con
+        con.timeout = timeout
+        if con.sock is not None:
+            con.sock.settimeout(timeout)
+        return con
+
+    def generate_content(self, prompt, stream=False, request_options=None, **_):
+        timeout = (request_options or {}).get('timeout')
+        con = self._conexao(timeout)
+        try:
+            con.request('POST', '/gerar', json.dumps({'prompt': prompt}),
+                        {'Content-Type': 'application/json'})
+            resposta = con.getresponse()
+            corpo = json.loads(resposta.read())
+        except Exception:
+            # Conexão num estado desconhecido (ex.: timeout no meio da resposta)
+            con.close()
+            self._local.con = None
+            raise
+        finally:
+            if not self.reusar:
+                con.close()
+        if resposta.status != 200:
+            raise ErroHTTP(resposta.status, corpo.get('erro', ''))
+        return _Resposta(corpo['text'])
@@ -0,0 +1,28 @@
+"""Sintetizador de voz falso para medir o servico_tts sem motor de TTS instalado.
+
+Gera um WAV de silêncio com a duração que a fala teria (palavras por minuto)
+e gasta CPU proporcional a ela, como um motor que sintetiza FATOR_TEMPO_REAL
+vezes mais rápido que o tempo real. O custo é CPU de verdade (segura o GIL),
+então só processos separados rodam sínteses em paralelo.
+"""
+import io
+import time
+import wave
+
+TAXA = 22050
+FATOR_TEMPO_REAL = 20  # ~ pyttsx3/SAPI; o espeak passa de 50
+
+
+def sintetizar(texto, velocidade, volume):
+    segundos = len(texto.split()) / (velocidade / 60)
+    # Tempo de CPU, não de relógio: com menos núcleos que workers não há ganho
+    fim = time.process_time() + segundos / FATOR_TEMPO_REAL
+    while time.process_time() < fim:
+        pass
+    saida = io.BytesIO()
+    with wave.open(saida, 'wb') as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(TAXA)
+        arquivo.writeframes(bytes(2 * int(segundos * TAXA)))
+    return saida.getvalue()
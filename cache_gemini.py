@@ -0,0 +1,87 @@
+import functools
+import hashlib
+import os
+
+from cache_sqlite import CacheSQLite
+from gemini_blocos import normalizar_espacos
+
+# ========== CONFIGS ==========
+# Respostas do Gemini guardadas em disco (GEMINI_CACHE vazio desativa)
+CACHE_CAMINHO = os.environ.get('GEMINI_CACHE', os.path.join('cache', 'gemini.sqlite3'))
+CACHE_MAX_BYTES = int(os.environ.get('GEMINI_CACHE_MAX_MB', 256)) * 1024 * 1024
+CACHE_TTL = float(os.environ.get('GEMINI_CACHE_TTL_HORAS', 24 * 30)) * 3600
+
+_cache = None
+
+
+def obter_cache():
+    global _cache
+    if _cache is None:
+        _cache = CacheSQLite(CACHE_CAMINHO, CACHE_MAX_BYTES, ttl=CACHE_TTL)
+    return _cache
+
+
+def versao_prompt(template):
+    """Hash curto do template: mudar o prompt invalida as respostas antigas"""
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+
+def chave(texto, nome_modelo, template, versao=''):
+    # Espaços e linhas vazias a mais (comuns no OCR) não mudam a chave. `versao`
+    # identifica o que reescreve o texto antes do envio (prompt_gemini.VERSAO_TEXTO)
+    conteudo = hashlib.sha256(normalizar_espacos(texto).encode('utf-8')).hexdigest()
+    return f"gemini:{nome_modelo}:{versao_prompt(template)}:{versao}:{conteudo}"
+
+
+def memoizar(gerar, nome_modelo, template, versao=''):
+    """Envolve `gerar(texto) -> html` consultando o cache antes de chamar o modelo"""
+
+    @functools.wraps(gerar)
+    def gerar_com_cache(texto):
+        if not CACHE_CAMINHO:
+            return gerar(texto)
+        cache = obter_cache()
+        k = chave(texto, nome_modelo, template, versao)
+        html = cache.obter(k)
+        if html is not None:
+            return html.decode('utf-8')
+        html = gerar(texto)
+        if html and html.strip():
+            cache.guardar(k, html.encode('utf-8'))
+        return html
+
+    return gerar_com_cache
+
+
+def memoizar_fluxo(gerar_fluxo, nome_modelo, template, versao=''):
+    """Como memoizar, para `gerar_fluxo(texto) -> pedaços de html` (streaming).
+
+    Mesma chave do memoizar: o que uma rota guardou a outra aproveita. No
+    acerto o HTML inteiro sai num pedaço só; na falta, os pedaços saem assim
+    que o modelo os manda e a resposta só é guardada se chegar até o fim.
+    """
+
+    @functools.wraps(gerar_fluxo)
+    def gerar_com_cache(texto):
+        if not CACHE_CAMINHO:
+            yield from gerar_fluxo(texto)
+            return
+        cache = obter_cache()
+        k = chave(texto, nome_modelo, template, versao)
+        html = cache.obter(k)
+        if html is not None:
+            yield html.decode('utf-8')
+            return
+        pedacos = []
+        for pedaco in gerar_fluxo(texto):
+            pedacos.append(pedaco)
+            yield pedaco
+        html = ''.join(pedacos)
+        if html.strip():
+            cache.guardar(k, html.encode('utf-8'))
+
+    return gerar_com_cache
+
+
+def estatisticas():
+    return obter_cache().estatisticas() if CACHE_CAMINHO else {}
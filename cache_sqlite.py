@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class CacheSQLite:
+    """Cache persistente em disco (SQLite) com despejo LRU limitado pelo tamanho total.
+
+    Pode ser aberto ao mesmo tempo por várias threads e processos: cada thread
+    usa a sua própria conexão e o banco roda em modo WAL. Com `ttl` (segundos),
+    itens mais antigos que isso são tratados como ausentes e removidos.
+
+    O total de bytes fica numa tabela `meta` de uma linha, mantida por
+    triggers na mesma transação de cada escrita (de qualquer processo): o
+    despejo não precisa somar a tabela inteira a cada guardar().
+    """
+
+    def __init__(self, caminho, max_bytes, ttl=None):
+        self.caminho = caminho
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._trava = threading.Lock()
+        self._local = threading.local()
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        with self._conexao() as con:
+            # Tudo numa transação: o total inicial e os triggers valem a partir do mesmo ponto
+            con.execute("BEGIN IMMEDIATE")
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS itens (
+                    chave TEXT PRIMARY KEY,
+                    valor BLOB NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    acesso REAL NOT NULL,
+                    criado REAL NOT NULL DEFAULT 0
+                )""")
+            colunas = [linha[1] for linha in con.execute("PRAGMA table_info(itens)")]
+            if 'criado' not in colunas:  # bancos criados antes do TTL
+                con.execute("ALTER TABLE itens ADD COLUMN criado REAL NOT NULL DEFAULT 0")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_itens_acesso ON itens (acesso)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_itens_criado ON itens (criado)")
+            con.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                        "total INTEGER NOT NULL)")
+            # Bancos de antes da meta: soma uma vez só
+            con.execute("INSERT OR IGNORE INTO meta (id, total) "
+                        "SELECT 0, COALESCE(SUM(tamanho), 0) FROM itens")
+            con.execute("""
+                CREATE TRIGGER IF NOT EXISTS itens_inserido AFTER INSERT ON itens BEGIN
+                    UPDATE meta SET total = total + NEW.tamanho WHERE id = 0;
+                END""")
+            con.execute("""
+                CREATE TRIGGER IF NOT EXISTS itens_removido AFTER DELETE ON itens BEGIN
+                    UPDATE meta SET total = total - OLD.tamanho WHERE id = 0;
+                END""")
+            con.execute("""
+                CREATE TRIGGER IF NOT EXISTS itens_alterado AFTER UPDATE OF tamanho ON itens BEGIN
+                    UPDATE meta SET total = total + NEW.tamanho - OLD.tamanho WHERE id = 0;
+                END""")
+
+    def _conexao(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def obter(self, chave):
+        """Retorna o valor (bytes) da chave ou None, marcando o item como recém-usado"""
+        return self.obter_varios([chave]).get(chave)
+
+    def obter_varios(self, chaves):
+        """Busca várias chaves numa única consulta; devolve {chave: valor} só dos acertos"""
+        chaves = list(chaves)
+        if not chaves:
+            return {}
+        encontrados = {}
+        agora = time.time()
+        validade = agora - self.ttl if self.ttl else 0
+        with self._conexao() as con:
+            # Lotes abaixo do limite de parâmetros do SQLite
+            for i in range(0, len(chaves), 500):
+                lote = chaves[i:i + 500]
+                marcadores = ','.join('?' * len(lote))
+                if self.ttl:
+                    con.execute(
+                        f"DELETE FROM itens WHERE chave IN ({marcadores}) AND criado < ?",
+                        [*lote, validade])
+                linhas = con.execute(
+                    f"SELECT chave, valor FROM itens WHERE chave IN ({marcadores})", lote)
+                encontrados.update(linhas.fetchall())
+                con.execute(
+                    f"UPDATE itens SET acesso = ? WHERE chave IN ({marcadores})",
+                    [agora, *lote])
+        with self._trava:
+            self.acertos += len(encontrados)
+            self.falhas += len(chaves) - len(encontrados)
+        return encontrados
+
+    def existentes(self, chaves):
+        """Conjunto das chaves presentes (e dentro do TTL), sem ler os valores; também
+        as marca como recém-usadas"""
+        chaves = list(chaves)
+        presentes = set()
+        agora = time.time()
+        validade = agora - self.ttl if self.ttl else 0
+        with self._conexao() as con:
+            for i in range(0, len(chaves), 500):
+                lote = chaves[i:i + 500]
+                marcadores = ','.join('?' * len(lote))
+                presentes.update(linha[0] for linha in con.execute(
+                    f"SELECT chave FROM itens WHERE chave IN ({marcadores}) AND criado >= ?",
+                    [*lote, validade]))
+                con.execute(
+                    f"UPDATE itens SET acesso = ? WHERE chave IN ({marcadores})",
+                    [agora, *lote])
+        return presentes
+
+    def guardar(self, chave, valor):
+        """Grava (ou substitui) o valor e despeja os itens menos usados se passar do limite"""
+        agora = time.time()
+        with self._conexao() as con:
+            # Upsert em vez de INSERT OR REPLACE: o REPLACE apaga a linha antiga sem
+            # disparar o trigger de remoção e o total ficaria errado
+            con.execute(
+                "INSERT INTO itens (chave, valor, tamanho, acesso, criado) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor, tamanho = excluded.tamanho,"
+                " acesso = excluded.acesso, criado = excluded.criado",
+                (chave, valor, len(valor), agora, agora))
+            self._despejar(con)
+
+    def remover(self, chave):
+        with self._conexao() as con:
+            con.execute("DELETE FROM itens WHERE chave = ?", (chave,))
+
+    def tamanho_total(self):
+        return self._conexao().execute("SELECT total FROM meta WHERE id = 0").fetchone()[0]
+
+    def estatisticas(self):
+        """Acertos e falhas deste processo, mais o ocupado no disco"""
+        itens = self._conexao().execute("SELECT COUNT(*) FROM itens").fetchone()[0]
+        tamanho = self.tamanho_total()
+        consultas = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            'itens': itens,
+            'bytes': tamanho,
+        }
+
+    def _despejar(self, con):
+        if self.ttl:
+            con.execute("DELETE FROM itens WHERE criado < ?", (time.time() - self.ttl,))
+        excesso = con.execute("SELECT total FROM meta WHERE id = 0").fetchone()[0] - self.max_bytes
+        if excesso <= 0:
+            return
+        removidas = []
+        for chave, tamanho in con.execute("SELECT chave, tamanho FROM itens ORDER BY acesso"):
+            removidas.append((chave,))
+            excesso -= tamanho
+            if excesso <= 0:
+                break
+        con.executemany("DELETE FROM itens WHERE chave = ?", removidas)
@@ -0,0 +1,186 @@
+"""Camada única de acesso ao Gemini: concorrência, taxa, timeout e novas tentativas.
+
+Toda chamada ao modelo do processo passa por um ClienteLLM, que tem a mesma
+interface do GenerativeModel (generate_content, com ou sem stream) e pode
+substituí-lo direto. Antes, cada rota chamava o modelo por conta própria:
+sem limite de chamadas simultâneas entre as threads do Flask, sem timeout e
+sem nova tentativa; só a reestruturação em blocos passava pelo limitador de
+taxa, e a voz nem isso.
+
+- BoundedSemaphore: no máximo MAX_EM_VOO chamadas em voo no processo; as
+  demais esperam a vez (até ESPERA_MAXIMA) em vez de estourar a cota;
+- LimitadorTaxa (token bucket): no máximo REQUISICOES_POR_MINUTO, com rajada;
+  cada nova tentativa também gasta uma ficha;
+- timeout por requisição (request_options do SDK);
+- novas tentativas só para erros transitórios (429, 5xx, timeout, conexão),
+  com espera exponencial e jitter completo. Num 429 a espera acontece com a
+  vaga ocupada: se a cota real está menor que MAX_EM_VOO (ex.: uma requisição
+  que estourou o timeout ainda roda no servidor), as chamadas em voo diminuem
+  em vez de outras threads ocuparem o lugar e levarem 429 também.
+
+O GenerativeModel guarda um só cliente (e conexão) por processo; manter um
+único ClienteLLM compartilhado pelas rotas é o que garante o reúso.
+"""
+import os
+import random
+import threading
+import time
+
+# ========== CONFIGS ==========
+MAX_EM_VOO = int(os.environ.get('GEMINI_MAX_EM_VOO', 8))
+REQUISICOES_POR_MINUTO = float(os.environ.get('GEMINI_RPM', 60))
+TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 120))
+TENTATIVAS = int(os.environ.get('GEMINI_TENTATIVAS', 4))
+ESPERA_BASE = 1.0
+ESPERA_MAX = 30.0
+# Quanto uma chamada aguarda uma vaga no semáforo antes de desistir
+ESPERA_MAXIMA = float(os.environ.get('GEMINI_ESPERA_MAXIMA', 300))
+
+# Nomes das exceções transitórias do google.api_core (sem importar o pacote)
+_TRANSITORIAS = {'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'InternalServerError',
+                 'DeadlineExceeded', 'GatewayTimeout', 'BadGateway', 'Aborted', 'RetryError'}
+_CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+
+class LimitadorTaxa:
+    """Token bucket: no máximo `por_minuto` chamadas por minuto, com rajada de `rajada`"""
+
+    def __init__(self, por_minuto, rajada=None):
+        self.taxa = por_minuto / 60.0
+        self.capacidade = rajada or max(1, int(self.taxa * 10))
+        self._fichas = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def adquirir(self):
+        """Bloqueia até haver uma ficha disponível"""
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            time.sleep(espera)
+
+
+def _cota(erro):
+    return getattr(erro, 'code', None) == 429 or type(erro).__name__ in ('ResourceExhausted', 'TooManyRequests')
+
+
+def transitorio(erro):
+    """Vale tentar de novo? (cota, sobrecarga, timeout, conexão caída)"""
+    if isinstance(erro, (TimeoutError, ConnectionError)):
+        return True
+    codigo = getattr(erro, 'code', None)
+    if isinstance(codigo, int) and codigo in _CODIGOS_TRANSITORIOS:
+        return True
+    return type(erro).__name__ in _TRANSITORIAS
+
+
+class ClienteLLM:
+    """Envolve um GenerativeModel (ou qualquer objeto com generate_content).
+
+    Atributos que não são da camada (model_name, count_tokens...) vão direto
+    para o modelo.
+    """
+
+    def __init__(self, modelo, max_em_voo=MAX_EM_VOO, limitador=None, timeout=TIMEOUT,
+                 tentativas=TENTATIVAS, espera_base=ESPERA_BASE, espera_max=ESPERA_MAX):
+        self.modelo = modelo
+        self.limitador = limitador or LimitadorTaxa(REQUISICOES_POR_MINUTO)
+        self.timeout = timeout
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self._vagas = threading.BoundedSemaphore(max_em_voo)
+        self._trava = threading.Lock()
+        self._contagem = {'chamadas': 0, 'novas_tentativas': 0, 'falhas': 0, 'espera_fila': 0.0}
+
+    def __getattr__(self, nome):
+        return getattr(self.modelo, nome)
+
+    def derivado(self, modelo):
+        """Cliente para outro modelo (ex.: com instruções de sistema) que divide as
+        vagas, a taxa e a contagem com este: o limite continua sendo do processo"""
+        novo = object.__new__(ClienteLLM)
+        novo.__dict__.update(self.__dict__, modelo=modelo)
+        return novo
+
+    def _contar(self, campo, valor=1):
+        with self._trava:
+            self._contagem[campo] += valor
+
+    def _entrar(self):
+        self.limitador.adquirir()
+        inicio = time.monotonic()
+        if not self._vagas.acquire(timeout=ESPERA_MAXIMA):
+            raise TimeoutError(f"Nenhuma vaga para chamar o modelo em {ESPERA_MAXIMA:.0f} s")
+        self._contar('espera_fila', time.monotonic() - inicio)
+
+    def _esperar(self, tentativa, erro):
+        # Jitter completo: as threads que falharam juntas não voltam juntas
+        espera = random.uniform(0, min(self.espera_max, self.espera_base * 2 ** tentativa))
+        self._contar('novas_tentativas')
+        print(f"\033[31mGemini: {type(erro).__name__} ({erro}); "
+              f"tentativa {tentativa + 2} de {self.tentativas} em {espera:.1f} s\033[0m")
+        time.sleep(espera)
+
+    def _chamar(self, funcao):
+        """Roda `funcao()` dentro do semáforo, tentando de novo nos erros transitórios"""
+        self._contar('chamadas')
+        for tentativa in range(self.tentativas):
+            self._entrar()
+            try:
+                return funcao()
+            except Exception as e:
+                if not transitorio(e) or tentativa == self.tentativas - 1:
+                    self._contar('falhas')
+                    raise
+                erro = e
+                if _cota(e):
+                    self._esperar(tentativa, e)
+                    continue
+            finally:
+                self._vagas.release()
+            self._esperar(tentativa, erro)
+
+    def generate_content(self, prompt, stream=False, **opcoes):
+        opcoes.setdefault('request_options', {'timeout': self.timeout})
+        if stream:
+            return self._fluxo(prompt, opcoes)
+        return self._chamar(lambda: self.modelo.generate_content(prompt, **opcoes))
+
+    def _fluxo(self, prompt, opcoes):
+        """Streaming: só dá para tentar de novo até o primeiro pedaço sair; a vaga
+        no semáforo fica ocupada até o último"""
+        self._contar('chamadas')
+        for tentativa in range(self.tentativas):
+            self._entrar()
+            try:
+                pedacos = iter(self.modelo.generate_content(prompt, stream=True, **opcoes))
+                primeiro = next(pedacos, None)
+                break
+            except Exception as e:
+                if not transitorio(e) or tentativa == self.tentativas - 1:
+                    self._vagas.release()
+                    self._contar('falhas')
+                    raise
+                if _cota(e):
+                    self._esperar(tentativa, e)
+                    self._vagas.release()
+                else:
+                    self._vagas.release()
+                    self._esperar(tentativa, e)
+        try:
+            if primeiro is not None:
+                yield primeiro
+            yield from pedacos
+        finally:
+            self._vagas.release()
+
+    def estatisticas(self):
+        with self._trava:
+            return dict(self._contagem)
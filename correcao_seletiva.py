@@ -0,0 +1,168 @@
+"""Correção seletiva: só os trechos duvidosos do OCR vão para o Gemini.
+
+Com o layout (layout_ocr), a estrutura da página já sai pronta e a maior parte
+do texto vem com confiança alta (ou da camada de texto do PDF, confiança 100).
+Em vez do documento inteiro, o Gemini recebe só:
+
+- blocos com confiança média abaixo de CONFIANCA_MINIMA;
+- equações que o matematica_fala não reconhece (as outras já saem descritas
+  do layout_ocr, sem chamada).
+
+Cada bloco vai numerado ([[n]]) e a resposta volta com os mesmos marcadores;
+o resto da página é o HTML do próprio layout_ocr. Um bloco que não volta na
+resposta fica com o HTML local. Um trecho maior que uma requisição vai em
+pedaços, cada um com o marcador dele.
+"""
+import os
+import re
+
+import gemini_blocos
+import html_seguro
+import layout_ocr
+import matematica_fala
+
+# ========== CONFIGS ==========
+# GEMINI_CORRECAO_SELETIVA=0 volta a mandar o documento inteiro
+SELETIVA = os.environ.get('GEMINI_CORRECAO_SELETIVA', '1') != '0'
+# Mais alto que o limiar da segunda leitura do OCR: o que ficou entre os dois
+# ainda costuma ter uma ou outra palavra trocada
+CONFIANCA_MINIMA = float(os.environ.get('GEMINI_CONFIANCA_MINIMA', 85))
+
+# O modelo às vezes põe o marcador dentro da tag de abertura: <p>[[3]] texto</p>
+_MARCADOR = re.compile(r'(<[a-z][a-z0-9]*[^>]*>\s*)?\[\[(\d+)\]\]\s*', re.IGNORECASE)
+# Começo de cada trecho dentro de um lote
+_INICIO_TRECHO = re.compile(r'^\[\[(\d+)\]\] ', re.MULTILINE)
+
+
+def precisa_correcao(bloco):
+    if bloco['tipo'] == 'equacao':
+        return not matematica_fala.reconhece(' '.join(bloco['linhas']))
+    return bloco.get('confianca', 100.0) < CONFIANCA_MINIMA
+
+
+def selecionar(paginas):
+    """(índice da página, bloco) de cada bloco que vai para o Gemini, na ordem do documento"""
+    return [(indice, bloco) for indice, pagina in enumerate(paginas)
+            for bloco in pagina['blocos'] if precisa_correcao(bloco)]
+
+
+def trechos(selecionados):
+    """Texto marcado de cada bloco selecionado, com o número na frente"""
+    return [f"[[{numero}]] {layout_ocr.blocos_para_prompt([bloco])}"
+            for numero, (_, bloco) in enumerate(selecionados)]
+
+
+def separar(resposta):
+    """{número: html} a partir da resposta com os marcadores [[n]].
+
+    O modelo às vezes põe os marcadores dentro de um elemento
+    (<div>[[0]]...[[1]]...</div>, <ul><li>[[0]] um</li>...): cada pedaço é
+    saneado de novo, para fechar as tags que ficaram abertas e tirar os
+    fechamentos sem par antes de entrar na página.
+    """
+    marcas = list(_MARCADOR.finditer(resposta))
+    corrigidos = {}
+    for atual, proxima in zip(marcas, marcas[1:] + [None]):
+        fim = proxima.start() if proxima else len(resposta)
+        fragmento = ((atual.group(1) or '') + resposta[atual.end():fim]).strip()
+        if fragmento:
+            # Marcador repetido: o trecho veio em pedaços, que ficam juntos
+            numero = int(atual.group(2))
+            corrigidos[numero] = corrigidos[numero] + '\n' + fragmento if numero in corrigidos else fragmento
+    return {numero: html_seguro.sanear(fragmento) for numero, fragmento in corrigidos.items()}
+
+
+# ========== DOCUMENTO ==========
+def lotes(textos, max_caracteres):
+    """Trechos marcados agrupados em requisições de até `max_caracteres`.
+
+    Um trecho que não cabe no que sobra de um lote vai inteiro para o próximo.
+    Só o que passa do limite sozinho é quebrado, e cada pedaço leva o marcador
+    de novo: sem ele, a continuação voltaria sem número e se perderia no separar.
+    """
+    unidades = []
+    for texto in textos:
+        if len(texto) <= max_caracteres:
+            unidades.append(texto)
+            continue
+        marcador, corpo = texto.split(' ', 1)
+        unidades += [f"{marcador} {pedaco}"
+                     for pedaco in gemini_blocos._quebrar(corpo, max_caracteres - len(marcador) - 1)]
+    return gemini_blocos._agrupar(unidades, max_caracteres, '\n\n')
+
+
+def _resolvidos_por_lote(lotes, total):
+    """Quantos trechos já voltaram depois de cada lote. Um trecho quebrado entre
+    dois lotes só fica completo quando o próximo não começa mais por ele."""
+    resolvidos, ultimo = [], -1
+    for k, lote in enumerate(lotes):
+        numeros = [int(n) for n in _INICIO_TRECHO.findall(lote)]
+        ultimo = max(numeros + [ultimo])
+        if k == len(lotes) - 1:
+            resolvidos.append(total)
+        else:
+            continua = int(_INICIO_TRECHO.match(lotes[k + 1]).group(1)) == ultimo
+            resolvidos.append(ultimo if continua else ultimo + 1)
+    return resolvidos
+
+
+def paginas_html(paginas, gerar_bloco, max_simultaneos=gemini_blocos.MAX_SIMULTANEOS,
+                 max_caracteres=gemini_blocos.MAX_CARACTERES_BLOCO, progresso=None,
+                 estatisticas=None):
+    """HTML de cada página com os blocos duvidosos corrigidos pelo modelo, na ordem.
+
+    `gerar_bloco(texto) -> resposta` é chamado só para os trechos selecionados,
+    agrupados em requisições de até `max_caracteres`. Cada página sai assim que
+    as requisições com os trechos dela voltam; as que não têm nada a corrigir
+    (antes do primeiro trecho) saem na hora. Se `estatisticas` for um
+    dicionário, recebe o que foi enviado contra o tamanho do documento inteiro.
+    """
+    selecionados = selecionar(paginas)
+    requisicoes = lotes(trechos(selecionados), max_caracteres) if selecionados else []
+    if estatisticas is not None:
+        estatisticas.update(
+            blocos=sum(len(pagina['blocos']) for pagina in paginas),
+            enviados=len(selecionados),
+            caracteres=len(layout_ocr.paginas_para_prompt(paginas)),
+            caracteres_enviados=sum(len(lote) for lote in requisicoes),
+            requisicoes=len(requisicoes),
+        )
+    # Página i só sai quando os trechos até necessarios[i] voltaram
+    necessarios = [0] * len(paginas)
+    for numero, (indice, _) in enumerate(selecionados):
+        necessarios[indice] = numero + 1
+    corrigidos = {}
+    substituir = [{} for _ in paginas]
+    proxima = 0
+
+    def prontas(resolvidos):
+        nonlocal proxima
+        while proxima < len(paginas) and necessarios[proxima] <= resolvidos:
+            yield layout_ocr.pagina_para_html(paginas[proxima], substituir[proxima])
+            proxima += 1
+
+    yield from prontas(0)
+    respostas = gemini_blocos.enviar_blocos(requisicoes, gerar_bloco, max_simultaneos, progresso)
+    for resposta, resolvidos in zip(respostas, _resolvidos_por_lote(requisicoes, len(selecionados))):
+        corrigidos.update(separar(resposta))
+        for numero, (indice, bloco) in enumerate(selecionados[:resolvidos]):
+            if numero in corrigidos:
+                substituir[indice][bloco['ordem']] = corrigidos[numero]
+        yield from prontas(resolvidos)
+    yield from prontas(len(selecionados))
+    if estatisticas is not None:
+        estatisticas['corrigidos'] = sum(len(s) for s in substituir)
+
+
+def gerar_html(paginas, gerar_bloco, **opcoes):
+    """HTML do documento inteiro (paginas_html costurado)"""
+    return '\n'.join(paginas_html(paginas, gerar_bloco, **opcoes))
+
+
+def resumir(estatisticas):
+    """Ex.: 'Gemini: 4 de 52 blocos, 1200 de 20500 caracteres (6%) em 1 requisição'"""
+    e = estatisticas
+    fracao = e['caracteres_enviados'] / e['caracteres'] if e['caracteres'] else 0
+    return (f"Gemini: {e['enviados']} de {e['blocos']} blocos, {e['caracteres_enviados']} de "
+            f"{e['caracteres']} caracteres ({fracao:.0%}) em {e['requisicoes']} "
+            f"requisiç{'ão' if e['requisicoes'] == 1 else 'ões'}")
@@ -0,0 +1,50 @@
+import json
+import os
+import uuid
+import zlib
+
+from cache_sqlite import CacheSQLite
+
+# ========== CONFIGS ==========
+# Textos do OCR ficam no servidor; a página e o formulário só levam o ID
+CAMINHO = os.environ.get('DOCUMENTOS_DB', os.path.join('cache', 'documentos.sqlite3'))
+MAX_BYTES = int(os.environ.get('DOCUMENTOS_MAX_MB', 512)) * 1024 * 1024
+VALIDADE = float(os.environ.get('DOCUMENTOS_VALIDADE_HORAS', 24)) * 3600
+
+_store = None
+
+
+def _obter_store():
+    global _store
+    if _store is None:
+        _store = CacheSQLite(CAMINHO, MAX_BYTES, ttl=VALIDADE)
+    return _store
+
+
+def novo_id():
+    return uuid.uuid4().hex
+
+
+def guardar(texto, documento_id=None):
+    """Guarda o texto comprimido e devolve o ID do documento"""
+    documento_id = documento_id or novo_id()
+    _obter_store().guardar(f"doc:{documento_id}", zlib.compress(texto.encode('utf-8'), 6))
+    return documento_id
+
+
+def obter(documento_id):
+    """Texto do documento, ou None se o ID não existe ou já expirou"""
+    dados = _obter_store().obter(f"doc:{documento_id}")
+    return zlib.decompress(dados).decode('utf-8') if dados is not None else None
+
+
+def guardar_estrutura(paginas, documento_id):
+    """Guarda ao lado do texto as páginas estruturadas do layout_ocr (JSON comprimido)"""
+    dados = json.dumps(paginas, ensure_ascii=False).encode('utf-8')
+    _obter_store().guardar(f"layout:{documento_id}", zlib.compress(dados, 6))
+
+
+def obter_estrutura(documento_id):
+    """Páginas estruturadas do documento, ou None se ele não tem (ou já expirou)"""
+    dados = _obter_store().obter(f"layout:{documento_id}")
+    return json.loads(zlib.decompress(dados)) if dados is not None else None
@@ -0,0 +1,27 @@
+import hashlib
+import os
+
+from flask import url_for
+
+# Um ano: a URL de cada arquivo muda junto com o conteúdo (?v=<hash>), então o
+# navegador pode guardar sem revalidar
+MAX_AGE = 365 * 24 * 3600
+
+
+def configurar(app):
+    """Cache longo para /static e a função `estatico(nome)` nos templates.
+
+    O Flask já responde /static com ETag e 304; aqui só entra o max-age longo e
+    a URL versionada pelo hash do arquivo. Em modo debug o hash é recalculado a
+    cada página para as edições aparecerem sem limpar o cache.
+    """
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = MAX_AGE
+    versoes = {}
+
+    def estatico(nome):
+        if nome not in versoes or app.debug:
+            with open(os.path.join(app.static_folder, nome), 'rb') as f:
+                versoes[nome] = hashlib.sha256(f.read()).hexdigest()[:12]
+        return url_for('static', filename=nome, v=versoes[nome])
+
+    app.add_template_global(estatico)
@@ -0,0 +1,243 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Estados possíveis de um job
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+CANCELADO = 'cancelado'
+FINAIS = (CONCLUIDO, ERRO, CANCELADO)
+
+
+class JobCancelado(Exception):
+    """Levantada dentro do job quando o usuário pede o cancelamento"""
+
+
+class FilaJobs:
+    """Fila de jobs local: estado em SQLite e execução num pool de threads.
+
+    O trabalho pesado já roda fora do GIL (pool de processos do OCR, chamadas de
+    rede ao Gemini), então threads bastam para orquestrar. Cada tipo de job tem
+    uma função `funcao(parametros, progresso)` que devolve o resultado (texto) e
+    chama `progresso(feitos, total)` ao longo do caminho.
+
+    Vários processos podem usar o mesmo banco (o filho do reloader do Flask,
+    mais de um worker): cada um renova a cada `batimento` segundos o
+    `atualizado` dos jobs que está executando, e só volta para a fila um job
+    EXECUTANDO sem batimento há mais de `abandono` segundos (o processo dono
+    morreu).
+    """
+
+    def __init__(self, caminho, workers=2, max_tentativas=3, espera_base=2.0, batimento=10.0,
+                 abandono=None):
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+        self.espera_base = espera_base
+        self.batimento = batimento
+        self.abandono = abandono or batimento * 6
+        self._funcoes = {}
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._executando = set()  # IDs que este processo está executando
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with self._conexao() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    parametros TEXT NOT NULL,
+                    arquivos TEXT NOT NULL,
+                    feitos INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    cancelar INTEGER NOT NULL DEFAULT 0,
+                    resultado TEXT,
+                    erro TEXT,
+                    criado REAL NOT NULL,
+                    atualizado REAL NOT NULL
+                )""")
+        # Jobs interrompidos por um reinício do servidor voltam para a fila;
+        # os que outro processo vivo está executando continuam com ele
+        self._retomar_abandonados()
+        threading.Thread(target=self._batimentos, name='job-batimento', daemon=True).start()
+
+    def _conexao(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    def _atualizar(self, job_id, **campos):
+        campos['atualizado'] = time.time()
+        colunas = ', '.join(f"{nome} = ?" for nome in campos)
+        with self._conexao() as con:
+            con.execute(f"UPDATE jobs SET {colunas} WHERE id = ?", [*campos.values(), job_id])
+
+    # ========== API ==========
+    def registrar(self, tipo, funcao):
+        """Associa a função ao tipo de job e retoma os pendentes desse tipo"""
+        self._funcoes[tipo] = funcao
+        pendentes = self._conexao().execute(
+            "SELECT id FROM jobs WHERE tipo = ? AND estado = ? ORDER BY criado",
+            (tipo, PENDENTE)).fetchall()
+        for linha in pendentes:
+            self._pool.submit(self._executar, linha['id'])
+
+    def enviar(self, tipo, parametros, arquivos=()):
+        """Cria o job e devolve o ID imediatamente.
+
+        `arquivos` são caminhos apagados quando o job termina (com sucesso ou não).
+        """
+        if tipo not in self._funcoes:
+            raise ValueError(f"Tipo de job desconhecido: {tipo}")
+        job_id = uuid.uuid4().hex
+        agora = time.time()
+        with self._conexao() as con:
+            con.execute(
+                "INSERT INTO jobs (id, tipo, estado, parametros, arquivos, criado, atualizado)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, tipo, PENDENTE, json.dumps(parametros), json.dumps(list(arquivos)),
+                 agora, agora))
+        self._pool.submit(self._executar, job_id)
+        return job_id
+
+    def status(self, job_id, com_resultado=True):
+        """Dicionário com estado e progresso do job (None se não existir)"""
+        linha = self._conexao().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if linha is None:
+            return None
+        status = {
+            'id': linha['id'],
+            'tipo': linha['tipo'],
+            'estado': linha['estado'],
+            'feitos': linha['feitos'],
+            'total': linha['total'],
+            'tentativas': linha['tentativas'],
+            'erro': linha['erro'],
+        }
+        if com_resultado and linha['estado'] == CONCLUIDO:
+            status['resultado'] = linha['resultado']
+        return status
+
+    def cancelar(self, job_id):
+        """Pede o cancelamento; devolve False se o job não existe ou já terminou"""
+        with self._conexao() as con:
+            # Ainda não começou (ou aguarda nova tentativa): encerra já
+            parado = con.execute(
+                "UPDATE jobs SET estado = ?, cancelar = 1, atualizado = ? WHERE id = ? AND estado = ?",
+                (CANCELADO, time.time(), job_id, PENDENTE)).rowcount
+            # Em execução: o próprio job para no próximo aviso de progresso
+            marcado = con.execute(
+                "UPDATE jobs SET cancelar = 1, atualizado = ? WHERE id = ? AND estado = ?",
+                (time.time(), job_id, EXECUTANDO)).rowcount
+        if parado:
+            self._finalizar(job_id, CANCELADO)
+        return bool(parado or marcado)
+
+    def encerrar(self):
+        self._parar.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # ========== BATIMENTOS ==========
+    def _batimentos(self):
+        while not self._parar.wait(self.batimento):
+            try:
+                with self._trava:
+                    executando = list(self._executando)
+                agora = time.time()
+                with self._conexao() as con:
+                    con.executemany("UPDATE jobs SET atualizado = ? WHERE id = ? AND estado = ?",
+                                    [(agora, job_id, EXECUTANDO) for job_id in executando])
+                self._retomar_abandonados()
+            except sqlite3.Error as e:
+                print(f"\033[31mErro no batimento da fila de jobs: {e}\033[0m")
+
+    def _retomar_abandonados(self):
+        """Volta para a fila os jobs EXECUTANDO sem batimento recente"""
+        limite = time.time() - self.abandono
+        retomados = []
+        with self._conexao() as con:
+            for linha in con.execute("SELECT id, tipo FROM jobs WHERE estado = ? AND atualizado < ?",
+                                     (EXECUTANDO, limite)).fetchall():
+                # Outro processo pode ter retomado o mesmo job entre o SELECT e aqui
+                if con.execute("UPDATE jobs SET estado = ?, atualizado = ?"
+                               " WHERE id = ? AND estado = ? AND atualizado < ?",
+                               (PENDENTE, time.time(), linha['id'], EXECUTANDO, limite)).rowcount:
+                    retomados.append(linha)
+        for linha in retomados:
+            print(f"Job {linha['id']} sem batimento há mais de {self.abandono:g} s; voltou para a fila")
+            # Tipos ainda não registrados são submetidos pelo registrar()
+            if linha['tipo'] in self._funcoes:
+                self._pool.submit(self._executar, linha['id'])
+
+    # ========== EXECUÇÃO ==========
+    def _executar(self, job_id):
+        with self._conexao() as con:
+            # Só um worker pega o job: a troca de estado é atômica
+            tomado = con.execute(
+                "UPDATE jobs SET estado = ?, tentativas = tentativas + 1, atualizado = ?"
+                " WHERE id = ? AND estado = ? AND cancelar = 0",
+                (EXECUTANDO, time.time(), job_id, PENDENTE)).rowcount
+        if not tomado:
+            return
+        with self._trava:
+            self._executando.add(job_id)
+        try:
+            self._executar_tomado(job_id)
+        finally:
+            with self._trava:
+                self._executando.discard(job_id)
+
+    def _executar_tomado(self, job_id):
+        linha = self._conexao().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        def progresso(feitos, total):
+            cancelar = self._conexao().execute(
+                "SELECT cancelar FROM jobs WHERE id = ?", (job_id,)).fetchone()['cancelar']
+            if cancelar:
+                raise JobCancelado(job_id)
+            self._atualizar(job_id, feitos=feitos, total=total)
+
+        try:
+            resultado = self._funcoes[linha['tipo']](json.loads(linha['parametros']), progresso)
+        except JobCancelado:
+            self._finalizar(job_id, CANCELADO)
+        except Exception as e:
+            print(f"Erro no job {job_id} (tentativa {linha['tentativas']}): {e}")
+            if linha['tentativas'] >= self.max_tentativas:
+                self._finalizar(job_id, ERRO, erro=str(e))
+            else:
+                # Nova tentativa com espera exponencial e jitter
+                espera = self.espera_base * 2 ** (linha['tentativas'] - 1) * random.uniform(0.5, 1.5)
+                with self._conexao() as con:
+                    reagendado = con.execute(
+                        "UPDATE jobs SET estado = ?, erro = ?, atualizado = ? WHERE id = ? AND cancelar = 0",
+                        (PENDENTE, str(e), time.time(), job_id)).rowcount
+                if not reagendado:
+                    self._finalizar(job_id, CANCELADO)
+                    return
+                timer = threading.Timer(espera, self._pool.submit, (self._executar, job_id))
+                timer.daemon = True
+                timer.start()
+        else:
+            self._finalizar(job_id, CONCLUIDO, resultado=resultado, erro=None)
+
+    def _finalizar(self, job_id, estado, **campos):
+        self._atualizar(job_id, estado=estado, **campos)
+        linha = self._conexao().execute("SELECT arquivos FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        for caminho in json.loads(linha['arquivos']):
+            if os.path.exists(caminho):
+                os.remove(caminho)
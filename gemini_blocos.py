@@ -0,0 +1,159 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import html_seguro
+
+# ========== CONFIGS ==========
+# ~12 mil caracteres de OCR cabem com folga no limite de saída do modelo depois de
+# virarem HTML (a marcação e as descrições matemáticas aumentam o texto)
+MAX_CARACTERES_BLOCO = int(os.environ.get('GEMINI_MAX_CARACTERES_BLOCO', 12000))
+MAX_SIMULTANEOS = int(os.environ.get('GEMINI_MAX_SIMULTANEOS', 4))
+
+# Linhas curtas que abrem uma seção: "Capítulo 2", "3.1 Derivadas", "EXERCÍCIOS"
+_TITULO = re.compile(
+    r'^(?:(?:cap[ií]tulo|se[cç][aã]o|parte|unidade|m[oó]dulo|aula|exerc[ií]cios?)\b'
+    r'|\d+(?:\.\d+)*\.?\s+[A-ZÀ-Ý])',
+    re.IGNORECASE)
+
+
+# ========== DIVISÃO EM BLOCOS ==========
+def _eh_titulo(linha):
+    linha = linha.strip()
+    if not linha or len(linha) > 80 or linha.endswith(('.', ',', ';')):
+        return False
+    letras = [c for c in linha if c.isalpha()]
+    return bool(_TITULO.match(linha)) or (len(letras) >= 4 and all(c.isupper() for c in letras))
+
+
+def _secoes(pagina):
+    """Quebra a página antes de cada linha com cara de título"""
+    secoes, atual = [], []
+    for linha in pagina.split('\n'):
+        if _eh_titulo(linha) and any(l.strip() for l in atual):
+            secoes.append('\n'.join(atual))
+            atual = []
+        atual.append(linha)
+    secoes.append('\n'.join(atual))
+    return [s for s in secoes if s.strip()]
+
+
+def _quebrar(texto, max_caracteres):
+    """Último recurso para seções enormes: parágrafos, depois linhas, depois corte seco"""
+    for separador in ('\n\n', '\n'):
+        partes = texto.split(separador)
+        if len(partes) > 1:
+            return _agrupar(partes, max_caracteres, separador)
+    return [texto[i:i + max_caracteres] for i in range(0, len(texto), max_caracteres)]
+
+
+def _agrupar(unidades, max_caracteres, separador):
+    blocos, atual, tamanho = [], [], 0
+    for unidade in unidades:
+        if len(unidade) > max_caracteres:
+            pedacos = _quebrar(unidade, max_caracteres)
+        else:
+            pedacos = [unidade]
+        for pedaco in pedacos:
+            if atual and tamanho + len(separador) + len(pedaco) > max_caracteres:
+                blocos.append(separador.join(atual))
+                atual, tamanho = [], 0
+            atual.append(pedaco)
+            tamanho += len(pedaco) + (len(separador) if tamanho else 0)
+    if atual:
+        blocos.append(separador.join(atual))
+    return blocos
+
+
+def normalizar_espacos(texto):
+    """Limpeza do formatar_texto do Modelo sem perder a estrutura.
+
+    Espaços repetidos viram um só, linhas vazias seguidas viram uma (separa
+    parágrafos) e as quebras de página (form feed) são mantidas.
+    """
+    paginas = []
+    for pagina in texto.split('\f'):
+        linhas = '\n'.join(' '.join(linha.split()) for linha in pagina.split('\n'))
+        paginas.append(re.sub(r'\n{3,}', '\n\n', linhas).strip('\n'))
+    return '\f'.join(paginas)
+
+
+def dividir_em_blocos(texto, max_caracteres=MAX_CARACTERES_BLOCO):
+    """Divide o texto do OCR em blocos de até `max_caracteres`.
+
+    Os cortes acontecem preferencialmente entre páginas (form feed do tesseract),
+    depois antes de títulos e só então entre parágrafos ou linhas.
+    """
+    unidades = []
+    for pagina in texto.split('\f'):
+        unidades.extend(_secoes(pagina))
+    return _agrupar(unidades, max_caracteres, '\n\n')
+
+
+def limpar_fragmento(html):
+    """Resposta do modelo saneada (html_seguro): sem cercas ```html, envoltórios
+    <html>/<head>/<body>, scripts nem atributos fora da lista"""
+    return html_seguro.sanear(html)
+
+
+# ========== ENVIO CONCORRENTE ==========
+def gerar_fragmentos(texto, gerar_bloco, max_simultaneos=MAX_SIMULTANEOS,
+                     max_caracteres=MAX_CARACTERES_BLOCO, progresso=None):
+    """Gera os fragmentos HTML de cada bloco, na ordem do documento.
+
+    Até `max_simultaneos` blocos do documento ficam em voo ao mesmo tempo (o
+    limite do processo e a taxa ficam no cliente_llm.ClienteLLM). Cada
+    fragmento é devolvido assim que ele e os anteriores ficam prontos;
+    `progresso(feitos, total)` acompanha a ordem.
+    """
+    blocos = dividir_em_blocos(normalizar_espacos(texto), max_caracteres)
+    return enviar_blocos(blocos, gerar_bloco, max_simultaneos, progresso)
+
+
+def enviar_blocos(blocos, gerar_bloco, max_simultaneos=MAX_SIMULTANEOS, progresso=None):
+    """Manda blocos já divididos ao modelo (mesma concorrência do gerar_fragmentos)
+    e devolve as respostas limpas, na ordem"""
+
+    def tarefa(bloco):
+        return limpar_fragmento(gerar_bloco(bloco))
+
+    with ThreadPoolExecutor(max_workers=max_simultaneos, thread_name_prefix='gemini') as pool:
+        futuros = [pool.submit(tarefa, bloco) for bloco in blocos]
+        try:
+            for feitos, futuro in enumerate(futuros, start=1):
+                fragmento = futuro.result()
+                if progresso:
+                    progresso(feitos, len(blocos))
+                yield fragmento
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+
+
+def gerar_fragmentos_em_fluxo(texto, gerar_bloco_fluxo, gerar_bloco, max_simultaneos=MAX_SIMULTANEOS,
+                              max_caracteres=MAX_CARACTERES_BLOCO):
+    """Como gerar_fragmentos, mas com o primeiro bloco em streaming.
+
+    O primeiro bloco vai por `gerar_bloco_fluxo(bloco) -> pedaços` e cada
+    elemento que fica completo (html_seguro.Fragmentador) sai na hora: a página
+    começa a aparecer no tempo do primeiro token. Enquanto isso os demais blocos
+    já rodam em paralelo com `gerar_bloco` e saem, saneados, na ordem.
+    """
+    blocos = dividir_em_blocos(normalizar_espacos(texto), max_caracteres)
+    if not blocos:
+        return
+    # O bloco em streaming ocupa uma das vagas do documento
+    with ThreadPoolExecutor(max_workers=max(1, max_simultaneos - 1), thread_name_prefix='gemini') as pool:
+        futuros = [pool.submit(gerar_bloco, bloco) for bloco in blocos[1:]]
+        try:
+            yield from html_seguro.fragmentos(gerar_bloco_fluxo(blocos[0]))
+            for futuro in futuros:
+                yield from html_seguro.fragmentos([futuro.result()])
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+
+
+def gerar_html_em_blocos(texto, gerar_bloco, **opcoes):
+    """Reestrutura o documento inteiro bloco a bloco e costura o HTML na ordem"""
+    return '\n'.join(gerar_fragmentos(texto, gerar_bloco, **opcoes))
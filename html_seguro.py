@@ -0,0 +1,163 @@
+"""HTML do Gemini saneado e entregue em fragmentos completos, mesmo em streaming.
+
+A resposta do modelo entra na página com |safe, então passa antes por uma
+lista de tags e atributos permitidos (html.parser da biblioteca padrão):
+
+- script, style, iframe, head... saem com o conteúdo;
+- tags fora da lista (html, body, font...) saem, o texto delas fica;
+- atributos on*, style e links que não sejam http(s), mailto ou âncora saem;
+- as cercas ```html que o modelo às vezes põe em volta da resposta saem.
+
+No streaming, os pedaços chegam cortados em qualquer ponto (no meio de uma
+tag, de uma tabela). O Fragmentador guarda o que ainda está aberto e só
+devolve elementos de primeiro nível já fechados: cada fragmento pode ir
+direto para a página e ser tipografado pelo MathJax sozinho.
+"""
+import html
+import re
+from html.parser import HTMLParser
+
+TAGS = {
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'caption', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'colgroup', 'col',
+    'strong', 'b', 'em', 'i', 'u', 's', 'sup', 'sub', 'small', 'mark', 'abbr', 'cite', 'q',
+    'code', 'pre', 'kbd', 'samp', 'var', 'blockquote', 'br', 'hr', 'span', 'div',
+    'section', 'article', 'aside', 'header', 'footer', 'nav', 'figure', 'figcaption',
+    'details', 'summary', 'a',
+    # MathML, que o MathJax também entende
+    'math', 'mrow', 'mi', 'mo', 'mn', 'ms', 'mtext', 'mspace', 'msup', 'msub', 'msubsup',
+    'mfrac', 'msqrt', 'mroot', 'mover', 'munder', 'munderover', 'mtable', 'mtr', 'mtd',
+    'mstyle', 'mpadded', 'mphantom', 'menclose', 'semantics', 'annotation',
+}
+# Somem junto com o que tiverem dentro
+DESCARTAR = {'script', 'style', 'iframe', 'object', 'embed', 'head', 'title', 'template',
+             'noscript', 'svg', 'form', 'textarea', 'select', 'button'}
+VAZIAS = {'br', 'hr', 'col', 'mspace', 'img', 'input', 'meta', 'link', 'wbr', 'source'}
+ATRIBUTOS = {'class', 'id', 'lang', 'dir', 'title', 'role', 'scope', 'colspan', 'rowspan',
+             'headers', 'start', 'reversed', 'href', 'abbr', 'open', 'display', 'xmlns',
+             'mathvariant', 'encoding'}
+# Abrir a chave fecha as do conjunto que estiverem no topo (<li>um<li>dois)
+FECHA_IMPLICITO = {'li': {'li'}, 'p': {'p'}, 'dt': {'dt', 'dd'}, 'dd': {'dt', 'dd'},
+                   'tr': {'tr', 'td', 'th'}, 'td': {'td', 'th'}, 'th': {'td', 'th'}}
+_LINK_SEGURO = re.compile(r'^(?:https?:|mailto:|#)', re.IGNORECASE)
+_CERCA = re.compile(r'```(?:html)?', re.IGNORECASE)
+
+
+class Fragmentador(HTMLParser):
+    """Recebe o HTML em pedaços (alimentar) e devolve fragmentos saneados e completos"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._abertas = []   # tags permitidas ainda abertas
+        self._descartando = []  # dentro de <script>, <head>...
+        self._atual = []
+        self._prontos = []
+
+    # ========== API ==========
+    def alimentar(self, pedaco):
+        """Processa mais um pedaço e devolve os fragmentos que ficaram completos"""
+        self.feed(pedaco)
+        return self._entregar()
+
+    def terminar(self):
+        """Fecha o que ficou aberto e devolve o resto"""
+        self.close()
+        while self._abertas:
+            self._escrever(f'</{self._abertas.pop()}>')
+        self._fechar_fragmento()
+        return self._entregar()
+
+    # ========== PARSER ==========
+    def handle_starttag(self, tag, attrs):
+        if self._descartando:
+            if tag in DESCARTAR:
+                self._descartando.append(tag)
+            return
+        if tag in DESCARTAR:
+            self._descartando.append(tag)
+            return
+        if tag not in TAGS:
+            return
+        while self._abertas and self._abertas[-1] in FECHA_IMPLICITO.get(tag, ()):
+            self._escrever(f'</{self._abertas.pop()}>')
+        if not self._abertas:
+            self._fechar_fragmento()  # texto solto antes de um elemento vira fragmento próprio
+        self._escrever(f'<{tag}{_atributos(attrs)}>')
+        if tag not in VAZIAS:
+            self._abertas.append(tag)
+        elif not self._abertas:
+            self._fechar_fragmento()
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in VAZIAS or tag in DESCARTAR:
+            self.handle_starttag(tag, attrs)
+        else:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._descartando:
+            if tag == self._descartando[-1]:
+                self._descartando.pop()
+            return
+        if tag not in self._abertas:
+            return  # fechamento sem abertura (ou de tag removida)
+        # Fecha também as de dentro que o modelo esqueceu de fechar
+        while self._abertas:
+            aberta = self._abertas.pop()
+            self._escrever(f'</{aberta}>')
+            if aberta == tag:
+                break
+        if not self._abertas:
+            self._fechar_fragmento()
+
+    def handle_data(self, data):
+        if not self._descartando:
+            self._escrever(html.escape(data, quote=False))
+
+    # ========== FRAGMENTOS ==========
+    def _escrever(self, texto):
+        self._atual.append(texto)
+
+    def _fechar_fragmento(self):
+        fragmento = ''.join(self._atual)
+        self._atual = []
+        if not self._abertas:
+            fragmento = _CERCA.sub('', fragmento)
+        if fragmento.strip():
+            self._prontos.append(fragmento.strip())
+
+    def _entregar(self):
+        prontos, self._prontos = self._prontos, []
+        return prontos
+
+
+def _atributos(attrs):
+    partes = []
+    for nome, valor in attrs:
+        if nome not in ATRIBUTOS and not nome.startswith('aria-'):
+            continue
+        valor = valor or ''
+        if nome == 'href' and not _LINK_SEGURO.match(valor.strip()):
+            continue
+        partes.append(f' {nome}="{html.escape(valor, quote=True)}"')
+    return ''.join(partes)
+
+
+def fragmentos(pedacos):
+    """Para um HTML que chega em pedaços, gera a cada pedaço o HTML saneado dos
+    elementos que ficaram completos com ele (um fragmento por pedaço, não por
+    elemento: menos nós e menos chamadas ao MathJax na página)"""
+    fragmentador = Fragmentador()
+    for pedaco in pedacos:
+        prontos = fragmentador.alimentar(pedaco)
+        if prontos:
+            yield '\n'.join(prontos)
+    prontos = fragmentador.terminar()
+    if prontos:
+        yield '\n'.join(prontos)
+
+
+def sanear(conteudo):
+    """Versão saneada de um HTML completo"""
+    return '\n'.join(fragmentos([conteudo]))
@@ -0,0 +1,621 @@
+"""OCR com layout: cada página vira uma lista de blocos (títulos, parágrafos,
+listas, tabelas e equações) com caixa, confiança e ordem de leitura.
+
+A página pré-processada é dividida em regiões pelos espaços em branco (recorte
+XY: faixas horizontais, depois colunas, recursivamente), o que já dá a ordem de
+leitura com colunas. Cada região passa pelo tesseract com image_to_data (as
+regiões de uma página podem rodar em paralelo) e as palavras são agrupadas em
+blocos; só as regiões com confiança baixa passam por uma segunda leitura (outro
+modo de segmentação, recorte ampliado). Páginas com camada de texto usam os
+blocos do próprio PDF.
+
+O resultado é uma estrutura simples, serializável em JSON:
+
+    {'pagina': 1, 'largura': 1654, 'altura': 2339, 'blocos': [
+        {'tipo': 'titulo', 'caixa': [x0, y0, x1, y1], 'confianca': 93.5,
+         'ordem': 0, 'linhas': ['Capítulo 1 - Funções']}, ...]}
+
+As caixas estão na unidade da página (pixels no OCR, pontos no texto nativo);
+blocos do tipo 'tabela' trazem também 'celulas' (uma lista por linha). Dela
+saem o HTML semântico (paginas_para_html, usado pelo converter_para_html do
+Modelo) e o texto compacto e marcado do prompt do Gemini (paginas_para_prompt).
+"""
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from PIL import Image
+import pytesseract
+
+import matematica_fala
+import motor_ocr
+import preprocessamento
+
+# ========== CONFIGS ==========
+# OCR_LAYOUT=0 volta ao texto corrido do image_to_string
+LAYOUT = os.environ.get('OCR_LAYOUT', '1') != '0'
+# Espaços (em alturas de linha) que separam faixas e colunas no recorte XY. O espaço
+# entre parágrafos (~1 linha) não corta: as regiões ficam grandes e o tesseract é
+# chamado poucas vezes por página
+ESPACO_FAIXA = 2.0
+ESPACO_COLUNA = 1.5
+# Colunas mais estreitas que isso (fração da faixa) costumam ser colunas de tabela
+LARGURA_MIN_COLUNA = 0.2
+# Regiões de uma mesma página em paralelo (threads; o tesseract roda fora do GIL)
+REGIOES_SIMULTANEAS = int(os.environ.get('OCR_REGIOES_SIMULTANEAS', 0)) or motor_ocr.NUM_WORKERS
+MARGEM_REGIAO = 10  # px de branco em volta de cada recorte; colado na borda o tesseract erra mais
+# Regiões com confiança média (0-100) abaixo disso passam pelo tesseract de novo;
+# o resto da página fica com a primeira leitura (OCR_REOCR=0 desliga a segunda passada)
+REOCR = os.environ.get('OCR_REOCR', '1') != '0'
+CONFIANCA_MINIMA = float(os.environ.get('OCR_CONFIANCA_MINIMA', 70))
+# Tentativas da segunda passada, em ordem de custo: (ampliação do recorte, PSM).
+# PSM 6 lê a região como um bloco só (o automático às vezes a picota); ampliar
+# ajuda a letra miúda, causa mais comum de confiança baixa
+TENTATIVAS_REOCR = ((1, 6), (2, 6))
+
+_MARCADOR_LISTA = re.compile(r'^(?:[-•*·–▪◦]|\(?\d{1,2}[.)]|\(?[a-z][.)])\s+')
+_MARCADOR_NUMERADO = re.compile(r'^\(?(?:\d{1,2}|[a-z])[.)]\s+')
+_TITULO = re.compile(
+    r'^(?:cap[ií]tulo|se[cç][aã]o|parte|unidade|m[oó]dulo|aula|exerc[ií]cios?)\b', re.IGNORECASE)
+_SIMBOLOS_MATEMATICOS = set('=+−×÷^∫∑∏√≤≥≠≈→∞πΔ∂·<>|')
+_PALAVRA = re.compile(r'[A-Za-zÀ-ÿ]{4,}')
+
+# Pools de threads das regiões, um por tamanho e por processo. Threads longas: o
+# motor do tesserocr fica em cada thread (motor_ocr._motor) e carregar o
+# traineddata custa mais que o OCR de muitas páginas
+_pools_regioes = {}
+_trava_pools = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+
+
+def _pool_regioes(simultaneas):
+    with _trava_pools:
+        pool = _pools_regioes.get(simultaneas)
+        if pool is None:
+            pool = _pools_regioes[simultaneas] = ThreadPoolExecutor(simultaneas, thread_name_prefix='regiao')
+        return pool
+
+
+def _descartar_pools_regioes():
+    # O filho de um fork (workers do motor_ocr) herda os pools, mas não as threads deles
+    global _trava_pools
+    _pools_regioes.clear()
+    _trava_pools = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):  # só POSIX; no Windows os workers nascem por spawn, sem herdar nada
+    os.register_at_fork(after_in_child=_descartar_pools_regioes)
+
+
+# ========== SEGMENTAÇÃO ==========
+def _intervalos(perfil, espaco_min):
+    """Trechos [início, fim) do perfil com tinta, separados por mais de `espaco_min` vazios"""
+    indices = np.flatnonzero(perfil)
+    if not len(indices):
+        return []
+    quebras = np.flatnonzero(np.diff(indices) > espaco_min)
+    inicios = np.concatenate(([indices[0]], indices[quebras + 1]))
+    fins = np.concatenate((indices[quebras], [indices[-1]])) + 1
+    return list(zip(inicios.tolist(), fins.tolist()))
+
+
+def segmentar(tinta, altura_linha):
+    """Regiões (x0, y0, x1, y1) com tinta, na ordem de leitura (recorte XY recursivo)"""
+    regioes = []
+
+    def cortar(x0, y0, x1, y1):
+        faixas = _intervalos(tinta[y0:y1, x0:x1].any(axis=1), ESPACO_FAIXA * altura_linha)
+        if len(faixas) > 1:
+            for inicio, fim in faixas:
+                cortar(x0, y0 + inicio, x1, y0 + fim)
+            return
+        if not faixas:
+            return
+        y0, y1 = y0 + faixas[0][0], y0 + faixas[0][1]
+        colunas = _intervalos(tinta[y0:y1, x0:x1].any(axis=0), ESPACO_COLUNA * altura_linha)
+        if len(colunas) > 1 and all(fim - inicio >= LARGURA_MIN_COLUNA * (x1 - x0)
+                                    for inicio, fim in colunas):
+            for inicio, fim in colunas:
+                cortar(x0 + inicio, y0, x0 + fim, y1)
+            return
+        regioes.append((x0 + colunas[0][0], y0, x0 + colunas[-1][1], y1))
+
+    altura, largura = tinta.shape
+    cortar(0, 0, largura, altura)
+    return regioes
+
+
+def _ordenar(blocos, largura, altura, altura_linha):
+    """Ordem de leitura de blocos que já têm caixa (texto nativo): desenha as caixas
+    numa grade e reaproveita o recorte XY"""
+    escala = min(1.0, 1000 / max(largura, altura))
+    grade = np.zeros((int(altura * escala) + 1, int(largura * escala) + 1), bool)
+    for bloco in blocos:
+        x0, y0, x1, y1 = (max(0, int(v * escala)) for v in bloco['caixa'])
+        grade[y0:y1 + 1, x0:x1 + 1] = True
+    regioes = segmentar(grade, altura_linha * escala)
+
+    def posicao(bloco):
+        cx = (bloco['caixa'][0] + bloco['caixa'][2]) / 2 * escala
+        cy = (bloco['caixa'][1] + bloco['caixa'][3]) / 2 * escala
+        for numero, (x0, y0, x1, y1) in enumerate(regioes):
+            if x0 <= cx <= x1 and y0 <= cy <= y1:
+                return numero, bloco['caixa'][1]
+        return len(regioes), bloco['caixa'][1]
+
+    return sorted(blocos, key=posicao)
+
+
+# ========== BLOCOS ==========
+def _celulas(palavras, altura):
+    """Divide uma linha onde o espaço entre palavras passa de 1,5 altura de linha"""
+    celulas = [[palavras[0][5]]]
+    for anterior, palavra in zip(palavras, palavras[1:]):
+        if palavra[0] - anterior[2] > 1.5 * altura:
+            celulas.append([])
+        celulas[-1].append(palavra[5])
+    return [' '.join(celula) for celula in celulas]
+
+
+def _eh_equacao(texto):
+    caracteres = [c for c in texto if not c.isspace()]
+    if not caracteres:
+        return False
+    simbolos = sum(c in _SIMBOLOS_MATEMATICOS for c in caracteres)
+    return simbolos / len(caracteres) >= 0.12 and len(_PALAVRA.findall(texto)) <= 2
+
+
+def _eh_titulo(linhas, altura, altura_mediana):
+    texto = linhas[0]
+    if len(linhas) > 1 or len(texto) > 80 or texto.endswith(('.', ',', ';', ':')):
+        return False
+    letras = [c for c in texto if c.isalpha()]
+    return (altura >= 1.25 * altura_mediana or bool(_TITULO.match(texto))
+            or (len(letras) >= 4 and all(c.isupper() for c in letras)))
+
+
+def _classificar(linhas, celulas, altura, altura_mediana):
+    if _eh_equacao(' '.join(linhas)):
+        return 'equacao'
+    if len(linhas) >= 2 and sum(len(c) > 1 for c in celulas) >= max(2, 2 * len(linhas) / 3):
+        return 'tabela'
+    if _eh_titulo(linhas, altura, altura_mediana):
+        return 'titulo'
+    if _MARCADOR_LISTA.match(linhas[0]):
+        return 'lista'
+    return 'paragrafo'
+
+
+def _altura(linha):
+    return max(p[3] - p[1] for p in linha)
+
+
+def _montar_blocos(paragrafos):
+    """Blocos a partir de parágrafos = listas de linhas = listas de palavras
+    (x0, y0, x1, y1, confiança, texto)"""
+    alturas = [_altura(linha) for paragrafo in paragrafos for linha in paragrafo]
+    if not alturas:
+        return []
+    altura_mediana = statistics.median(alturas)
+    blocos = []
+    for paragrafo in paragrafos:
+        palavras = [p for linha in paragrafo for p in linha]
+        altura = statistics.median(_altura(linha) for linha in paragrafo)
+        linhas = [' '.join(p[5] for p in linha) for linha in paragrafo]
+        celulas = [_celulas(linha, altura) for linha in paragrafo]
+        tipo = _classificar(linhas, celulas, altura, altura_mediana)
+        bloco = {
+            'tipo': tipo,
+            'caixa': [round(min(p[0] for p in palavras)), round(min(p[1] for p in palavras)),
+                      round(max(p[2] for p in palavras)), round(max(p[3] for p in palavras))],
+            'confianca': round(sum(p[4] for p in palavras) / len(palavras), 1),
+            'linhas': linhas,
+        }
+        if tipo == 'tabela':
+            bloco['celulas'] = celulas
+        blocos.append(bloco)
+    return blocos
+
+
+def _paragrafos_tsv(tsv, dx=0, dy=0, escala=1):
+    """Palavras do TSV do tesseract agrupadas em parágrafos e linhas, em coordenadas da
+    página (`escala` desfaz a ampliação do recorte)"""
+    paragrafos = {}
+    for registro in tsv.splitlines():
+        campos = registro.split('\t')
+        # nível 5 = palavra; confiança -1 são caixas sem texto
+        if len(campos) < 12 or campos[0] != '5' or not campos[11].strip() or float(campos[10]) < 0:
+            continue
+        x, y, largura, altura = (int(c) / escala for c in campos[6:10])
+        linhas = paragrafos.setdefault((campos[2], campos[3]), {})
+        linhas.setdefault(campos[4], []).append(
+            (x + dx, y + dy, x + dx + largura, y + dy + altura, float(campos[10]), campos[11].strip()))
+    return [list(linhas.values()) for linhas in paragrafos.values()]
+
+
+def _tsv(pixels, lang, psm=None):
+    """image_to_data de uma matriz em tons de cinza (TSV, com o backend configurado)"""
+    if motor_ocr.usar_tesserocr():
+        api = motor_ocr._motor(lang)
+        if psm is not None:
+            api.SetPageSegMode(psm)
+        try:
+            api.SetImageBytes(pixels.tobytes(), pixels.shape[1], pixels.shape[0], 1, pixels.strides[0])
+            return api.GetTSVText(0)
+        finally:
+            if psm is not None:
+                api.SetPageSegMode(3)  # PSM_AUTO, o padrão do motor
+    img = Image.fromarray(pixels)
+    img.format = 'PPM'
+    return pytesseract.image_to_data(img, lang=lang, config=f'--psm {psm}' if psm is not None else '')
+
+
+def _confianca(paragrafos):
+    """Confiança média das palavras (None se não há palavras)"""
+    confiancas = [p[4] for paragrafo in paragrafos for linha in paragrafo for p in linha]
+    return sum(confiancas) / len(confiancas) if confiancas else None
+
+
+def _reler(recorte, lang, dx, dy):
+    """Segunda passada numa região duvidosa: devolve a leitura de maior confiança
+    entre as TENTATIVAS_REOCR (None se nenhuma melhorou a primeira)"""
+    melhor, melhor_confianca = None, None
+    for ampliacao, psm in TENTATIVAS_REOCR:
+        imagem = recorte
+        if ampliacao != 1:
+            imagem = np.asarray(Image.fromarray(recorte).resize(
+                (recorte.shape[1] * ampliacao, recorte.shape[0] * ampliacao), Image.LANCZOS))
+        paragrafos = _paragrafos_tsv(_tsv(imagem, lang, psm), dx, dy, ampliacao)
+        confianca = _confianca(paragrafos)
+        if confianca is not None and (melhor_confianca is None or confianca > melhor_confianca):
+            melhor, melhor_confianca = paragrafos, confianca
+            if confianca >= CONFIANCA_MINIMA:
+                break
+    return melhor, melhor_confianca
+
+
+def layout_pixels(pixels, lang=motor_ocr.LANG_PADRAO, etapas=(), tempos=None,
+                  simultaneas=1, reocr=None):
+    """Blocos de uma imagem (matriz em tons de cinza); devolve (blocos, largura, altura).
+
+    Com `simultaneas` > 1, as regiões da página vão para o tesseract em paralelo.
+    Com `reocr` (padrão: REOCR), só as regiões com confiança abaixo de
+    CONFIANCA_MINIMA são lidas de novo; o tempo dessa passada fica em
+    tempos['reocr'].
+    """
+    reocr = REOCR if reocr is None else reocr
+    tempos = {} if tempos is None else tempos
+    if etapas:
+        pixels = preprocessamento.preprocessar(pixels, etapas, tempos)
+    inicio = time.perf_counter()
+    altura_linha = motor_ocr._altura_linha(pixels) or motor_ocr.ALTURA_LINHA_ALVO
+    regioes = [r for r in segmentar(pixels < preprocessamento.LIMIAR_TINTA, altura_linha)
+               if r[3] - r[1] >= altura_linha / 3]  # sobras de sujeira e sublinhados
+    tempos['segmentacao'] = tempos.get('segmentacao', 0.0) + time.perf_counter() - inicio
+
+    def recorte(regiao):
+        x0, y0, x1, y1 = regiao
+        return np.pad(pixels[y0:y1, x0:x1], MARGEM_REGIAO, constant_values=255)
+
+    def reconhecer(regiao):
+        return _paragrafos_tsv(_tsv(recorte(regiao), lang),
+                               regiao[0] - MARGEM_REGIAO, regiao[1] - MARGEM_REGIAO)
+
+    def reler(indice):
+        regiao = regioes[indice]
+        return _reler(recorte(regiao), lang, regiao[0] - MARGEM_REGIAO, regiao[1] - MARGEM_REGIAO)
+
+    def mapear(funcao, itens):
+        if simultaneas > 1 and len(itens) > 1:
+            return list(_pool_regioes(simultaneas).map(funcao, itens))
+        return [funcao(item) for item in itens]
+
+    inicio = time.perf_counter()
+    resultados = mapear(reconhecer, regioes)
+    tempos['tesseract'] = tempos.get('tesseract', 0.0) + time.perf_counter() - inicio
+
+    if reocr:
+        confiancas = [_confianca(resultado) for resultado in resultados]
+        duvidosas = [i for i, c in enumerate(confiancas) if c is not None and c < CONFIANCA_MINIMA]
+        if duvidosas:
+            inicio = time.perf_counter()
+            for indice, (paragrafos, confianca) in zip(duvidosas, mapear(reler, duvidosas)):
+                if confianca is not None and confianca > confiancas[indice]:
+                    resultados[indice] = paragrafos
+            tempos['reocr'] = tempos.get('reocr', 0.0) + time.perf_counter() - inicio
+    paragrafos = [paragrafo for resultado in resultados for paragrafo in resultado]
+    return _montar_blocos(paragrafos), pixels.shape[1], pixels.shape[0]
+
+
+def _mesma_altura(linhas):
+    """Junta as linhas do PDF que estão na mesma altura (células de tabela saem
+    como linhas separadas no PyMuPDF), em ordem da esquerda para a direita"""
+    juntas = []
+    for linha in sorted(linhas, key=lambda l: l[0][1]):
+        if juntas:
+            anterior = juntas[-1]
+            centro = (linha[0][1] + linha[0][3]) / 2
+            if anterior[0][1] <= centro <= anterior[0][3]:
+                anterior.extend(linha)
+                anterior.sort(key=lambda p: p[0])
+                continue
+        juntas.append(list(linha))
+    return juntas
+
+
+def _blocos_nativos(page):
+    """Blocos da camada de texto do PDF: cada trecho (span) conta como uma palavra"""
+    paragrafos = []
+    for bloco in page.get_text('dict')['blocks']:
+        if bloco['type'] != 0:
+            continue
+        linhas = []
+        for linha in bloco['lines']:
+            trechos = [(*s['bbox'], 100.0, s['text'].strip()) for s in linha['spans'] if s['text'].strip()]
+            if trechos:
+                linhas.append(trechos)
+        if linhas:
+            paragrafos.append(_mesma_altura(linhas))
+    return _montar_blocos(paragrafos)
+
+
+def _formato():
+    """Identifica no cache o layout e a segunda passada configurada"""
+    return f"layout:reocr{CONFIANCA_MINIMA:g}" if REOCR else 'layout'
+
+
+def _layout_pixmap(pix, dpi, lang, caminho_cache, etapas, tempos, simultaneas):
+    """layout_pixels de um pixmap, com o mesmo cache por conteúdo do _ocr_pixmap"""
+    cache = chave = None
+    if caminho_cache:
+        cache = motor_ocr.obter_cache(caminho_cache)
+        chave = motor_ocr._chave(_formato(), hashlib.sha256(pix.samples_mv).hexdigest(),
+                                 dpi, lang, preprocessamento.assinatura(etapas))
+        salvo = cache.obter(chave)
+        if salvo is not None:
+            return json.loads(salvo)
+    resultado = layout_pixels(motor_ocr._matriz(pix), lang, etapas, tempos, simultaneas)
+    if cache is not None:
+        cache.guardar(chave, json.dumps(resultado, ensure_ascii=False).encode('utf-8'))
+    return resultado
+
+
+def layout_pagina(origem, indice, dpi, lang, caminho_cache=None, texto_nativo=True,
+                  dpi_adaptativo=False, etapas=(), simultaneas=1):
+    """Tarefa do worker (mesmo contrato de motor_ocr._ocr_pagina): a página em JSON"""
+    page = motor_ocr._abrir_documento(origem)[indice]
+    nativo = motor_ocr._texto_nativo(page) if texto_nativo else None
+    tempos = {}
+    if nativo is None:
+        pix, dpi_usado = motor_ocr._renderizar(page, dpi, dpi_adaptativo)
+        blocos, largura, altura = _layout_pixmap(pix, dpi_usado, lang, caminho_cache, etapas,
+                                                 tempos, simultaneas)
+        via = 'ocr'
+    else:
+        blocos = _blocos_nativos(page)
+        regioes = motor_ocr._regioes_sem_texto(page)
+        for caixa in regioes:
+            pix, dpi_usado = motor_ocr._renderizar(page, dpi, dpi_adaptativo, caixa)
+            escala = 72 / dpi_usado
+            for bloco in _layout_pixmap(pix, dpi_usado, lang, caminho_cache, etapas, tempos,
+                                        simultaneas)[0]:
+                x0, y0, x1, y1 = bloco['caixa']
+                bloco['caixa'] = [round(caixa.x0 + x0 * escala), round(caixa.y0 + y0 * escala),
+                                  round(caixa.x0 + x1 * escala), round(caixa.y0 + y1 * escala)]
+                blocos.append(bloco)
+        largura, altura = page.rect.width, page.rect.height
+        alturas = [b['caixa'][3] - b['caixa'][1] for b in blocos if len(b['linhas']) == 1]
+        blocos = _ordenar(blocos, largura, altura, statistics.median(alturas) if alturas else 12)
+        via = 'misto' if regioes else 'texto'
+    for ordem, bloco in enumerate(blocos):
+        bloco['ordem'] = ordem
+    pagina = {'pagina': indice + 1, 'largura': round(largura), 'altura': round(altura),
+              'blocos': blocos}
+    return json.dumps(pagina, ensure_ascii=False), via, tempos
+
+
+def _layout_imagem_lote(origem, lang, usar_cache, etapas):
+    """Tarefa do ocr_lote para uma imagem, no formato de layout_pagina"""
+    tempos = {}
+    pagina = layout_imagem(origem, lang, usar_cache, etapas, tempos)
+    return json.dumps(pagina, ensure_ascii=False), 'ocr', tempos
+
+
+# ========== API ==========
+def _simultaneas(origem, workers):
+    """Regiões em paralelo por página: só sobra núcleo quando há menos páginas que workers"""
+    return max(1, (workers or motor_ocr.NUM_WORKERS) // max(1, motor_ocr.contar_paginas(origem)))
+
+
+def layout_paginas(origem, dpi=motor_ocr.DPI_PADRAO, lang=motor_ocr.LANG_PADRAO, workers=None,
+                   usar_cache=True, texto_nativo=None, relatorio=None, dpi_adaptativo=None,
+                   etapas=None):
+    """Como motor_ocr.ocr_paginas, mas gera (índice, página estruturada)"""
+    tarefa = partial(layout_pagina, simultaneas=_simultaneas(origem, workers))
+    for indice, valor in motor_ocr.processar_paginas(tarefa, _formato(), origem, dpi, lang, workers,
+                                                     usar_cache, texto_nativo, relatorio,
+                                                     dpi_adaptativo, etapas):
+        yield indice, json.loads(valor)
+
+
+def layout_pdf(origem, **opcoes):
+    """Lista com a estrutura de cada página do PDF, na ordem"""
+    return [pagina for _, pagina in layout_paginas(origem, **opcoes)]
+
+
+def layout_imagem(origem, lang=motor_ocr.LANG_PADRAO, usar_cache=True, etapas=None, tempos=None):
+    """Estrutura de uma imagem avulsa (caminho ou bytes); as regiões rodam em paralelo"""
+    etapas = preprocessamento.normalizar_etapas(etapas)
+    cache = motor_ocr.obter_cache() if usar_cache and motor_ocr.CACHE_CAMINHO else None
+    if cache is not None:
+        chave = motor_ocr._chave('arquivo', motor_ocr.hash_arquivo(origem), 0, 'imagem', lang,
+                                 preprocessamento.assinatura(etapas), _formato())
+        salvo = cache.obter(chave)
+        if salvo is not None:
+            return json.loads(salvo)
+    with Image.open(origem if motor_ocr._eh_caminho(origem) else io.BytesIO(origem)) as img:
+        pixels = np.asarray(img.convert('L'))
+    blocos, largura, altura = layout_pixels(pixels, lang, etapas, tempos, REGIOES_SIMULTANEAS)
+    for ordem, bloco in enumerate(blocos):
+        bloco['ordem'] = ordem
+    pagina = {'pagina': 1, 'largura': largura, 'altura': altura, 'blocos': blocos}
+    if cache is not None:
+        cache.guardar(chave, json.dumps(pagina, ensure_ascii=False).encode('utf-8'))
+    return pagina
+
+
+def layout_lote(origens, **opcoes):
+    """motor_ocr.ocr_lote com layout: gera (índice, páginas estruturadas, erro)"""
+    for indice, valores, erro in motor_ocr.ocr_lote(origens, tarefa_pagina=layout_pagina,
+                                                    tarefa_imagem=_layout_imagem_lote, **opcoes):
+        paginas = [json.loads(v) for v in valores if v] if valores is not None else None
+        yield indice, paginas, erro
+
+
+# ========== SAÍDAS ==========
+def _corrido(linhas):
+    """Junta as linhas de um parágrafo, desfazendo a hifenização de fim de linha"""
+    texto = ''
+    for linha in linhas:
+        if texto.endswith('-') and linha[:1].islower():
+            texto = texto[:-1] + linha
+        else:
+            texto = f"{texto} {linha}" if texto else linha
+    return texto
+
+
+def _itens(linhas):
+    """Itens de lista: cada marcador abre um item; as outras linhas continuam o anterior"""
+    itens = []
+    for linha in linhas:
+        if _MARCADOR_LISTA.match(linha) or not itens:
+            itens.append([linha])
+        else:
+            itens[-1].append(linha)
+    return [_corrido(item) for item in itens]
+
+
+def blocos_para_html(blocos, substituir=None):
+    """HTML semântico dos blocos, na ordem de leitura.
+
+    `substituir` ({ordem: html}) troca blocos por HTML pronto (ex.: a correção do Gemini).
+    """
+    substituir = substituir or {}
+    partes = []
+    lista = None
+    for bloco in blocos:
+        tipo = bloco['tipo']
+        pronto = substituir.get(bloco.get('ordem'))
+        if lista and (tipo != 'lista' or pronto is not None):
+            partes.append(f'</{lista}>')
+            lista = None
+        if pronto is not None:
+            partes.append(pronto)
+        elif tipo == 'titulo':
+            partes.append(f"<h2>{html.escape(_corrido(bloco['linhas']))}</h2>")
+        elif tipo == 'lista':
+            if not lista:
+                lista = 'ol' if _MARCADOR_NUMERADO.match(bloco['linhas'][0]) else 'ul'
+                partes.append(f'<{lista}>')
+            for item in _itens(bloco['linhas']):
+                partes.append(f"<li>{html.escape(_MARCADOR_LISTA.sub('', item))}</li>")
+        elif tipo == 'tabela':
+            cabecalho, *corpo = bloco['celulas']
+            partes.append('<table><thead><tr>'
+                          + ''.join(f'<th scope="col">{html.escape(c)}</th>' for c in cabecalho)
+                          + '</tr></thead><tbody>'
+                          + ''.join('<tr>' + ''.join(f'<td>{html.escape(c)}</td>' for c in linha) + '</tr>'
+                                    for linha in corpo)
+                          + '</tbody></table>')
+        elif tipo == 'equacao':
+            texto = ' '.join(bloco['linhas'])
+            # Descrição para leitores de tela + MathJax, quando o conversor local entende
+            if matematica_fala.reconhece(texto):
+                texto = matematica_fala.descrever(texto)
+            partes.append(f"<p class=\"equacao\">{html.escape(texto)}</p>")
+        else:
+            partes.append(f"<p>{html.escape(_corrido(bloco['linhas']))}</p>")
+    if lista:
+        partes.append(f'</{lista}>')
+    return ''.join(partes)
+
+
+def pagina_para_html(pagina, substituir=None):
+    return (f'<section class="pagina-estruturada" aria-label="Página {pagina["pagina"]}">'
+            f'{blocos_para_html(pagina["blocos"], substituir)}</section>')
+
+
+def paginas_para_html(paginas):
+    return ''.join(pagina_para_html(pagina) for pagina in paginas)
+
+
+def blocos_para_prompt(blocos):
+    """Texto compacto para o Gemini: a estrutura vai em marcadores curtos em vez de
+    espaços e quebras de linha do OCR ('# ' título, '- ' item, '| ' tabela,
+    '[equação] ')"""
+    partes = []
+    for bloco in blocos:
+        tipo = bloco['tipo']
+        if tipo == 'titulo':
+            partes.append('# ' + _corrido(bloco['linhas']))
+        elif tipo == 'lista':
+            partes.append('\n'.join(item if _MARCADOR_LISTA.match(item) else '- ' + item
+                                    for item in _itens(bloco['linhas'])))
+        elif tipo == 'tabela':
+            partes.append('\n'.join('| ' + ' | '.join(linha) + ' |' for linha in bloco['celulas']))
+        elif tipo == 'equacao':
+            partes.append('[equação] ' + ' '.join(bloco['linhas']))
+        else:
+            partes.append(_corrido(bloco['linhas']))
+    return '\n\n'.join(partes)
+
+
+def pagina_para_prompt(pagina):
+    return blocos_para_prompt(pagina['blocos'])
+
+
+def paginas_para_prompt(paginas):
+    """Páginas separadas por form feed, como no texto do tesseract (gemini_blocos corta ali)"""
+    return '\f'.join(pagina_para_prompt(pagina) for pagina in paginas)
+
+
+def texto_das_paginas(paginas):
+    """Texto corrido, sem marcadores (leitura em voz alta, busca)"""
+    return '\n\n'.join('\n\n'.join(_corrido(b['linhas']) for b in pagina['blocos'])
+                       for pagina in paginas)
+
+
+# ========== PARA AS ROTAS ==========
+def ocr_paginas_html(origem, relatorio=None, estrutura=None):
+    """Gera (html, texto para o prompt) de cada página do PDF, na ordem.
+
+    Se `estrutura` for uma lista, recebe as páginas estruturadas (para a correção
+    seletiva). Com OCR_LAYOUT=0, o html é só o texto do OCR escapado.
+    """
+    if not LAYOUT:
+        for _, texto in motor_ocr.ocr_paginas(origem, relatorio=relatorio):
+            yield html.escape(texto), texto
+        return
+    for _, pagina in layout_paginas(origem, relatorio=relatorio):
+        if estrutura is not None:
+            estrutura.append(pagina)
+        yield pagina_para_html(pagina), pagina_para_prompt(pagina)
+
+
+def ocr_imagem_html(origem, estrutura=None):
+    """(html, texto para o prompt) de uma imagem avulsa"""
+    if not LAYOUT:
+        texto = motor_ocr.ocr_imagem(origem)
+        return html.escape(texto), texto
+    pagina = layout_imagem(origem)
+    if estrutura is not None:
+        estrutura.append(pagina)
+    return pagina_para_html(pagina), pagina_para_prompt(pagina)
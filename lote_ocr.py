@@ -0,0 +1,170 @@
+"""OCR em lote: pastas inteiras de PDFs e imagens viram um HTML acessível por arquivo.
+
+As páginas de todos os arquivos vão para o mesmo pool de processos do motor_ocr
+(motor_ocr.ocr_lote), e o HTML é o mesmo do Modelo (formatar_texto +
+converter_para_html). Com o layout ligado (layout_ocr.LAYOUT), o HTML sai com
+os títulos, listas e tabelas reconhecidos em cada página.
+
+Uso:
+    python lote_ocr.py PASTA_OU_ARQUIVO [...] -o PASTA_SAIDA [--workers N] [--lang por+eng]
+"""
+import argparse
+import html
+import importlib.util
+import io
+import os
+import time
+import zipfile
+from importlib.machinery import SourceFileLoader
+
+import layout_ocr
+import motor_ocr
+
+EXTENSOES = ('.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif', '.webp')
+# Teto do conteúdo descompactado de um .zip enviado (protege contra zip bomb)
+MAX_DESCOMPACTADO = int(os.environ.get('LOTE_MAX_DESCOMPACTADO_MB', 1024)) * 1024 * 1024
+
+
+def _carregar_modelo():
+    """O script Modelo (sem extensão .py) como módulo, para reaproveitar o HTML dele"""
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Modelo')
+    loader = SourceFileLoader('modelo', caminho)
+    modulo = importlib.util.module_from_spec(importlib.util.spec_from_loader('modelo', loader))
+    loader.exec_module(modulo)
+    return modulo
+
+
+modelo = _carregar_modelo()
+
+
+# ========== ENTRADAS ==========
+def listar_arquivos(caminhos):
+    """(nome relativo, caminho) de cada PDF/imagem, descendo nas pastas em ordem alfabética"""
+    entradas = []
+    for caminho in caminhos:
+        if os.path.isfile(caminho):
+            entradas.append((os.path.basename(caminho), caminho))
+            continue
+        for raiz, pastas, arquivos in os.walk(caminho):
+            pastas.sort()
+            for nome in sorted(arquivos):
+                if nome.lower().endswith(EXTENSOES):
+                    completo = os.path.join(raiz, nome)
+                    entradas.append((os.path.relpath(completo, caminho), completo))
+    return entradas
+
+
+def _nome_seguro(nome):
+    partes = [p for p in nome.replace('\\', '/').split('/') if p not in ('', '.', '..')]
+    return '/'.join(partes)
+
+
+def expandir_zips(entradas):
+    """Troca cada .zip (bytes ou caminho) pelos PDFs e imagens que ele contém"""
+    expandidas = []
+    for nome, origem in entradas:
+        if not nome.lower().endswith('.zip'):
+            if nome.lower().endswith(EXTENSOES):
+                expandidas.append((nome, origem))
+            continue
+        with zipfile.ZipFile(origem if isinstance(origem, str) else io.BytesIO(origem)) as arquivo_zip:
+            membros = [m for m in arquivo_zip.infolist()
+                       if not m.is_dir() and m.filename.lower().endswith(EXTENSOES)
+                       and not m.filename.startswith('__MACOSX/')]
+            if sum(m.file_size for m in membros) > MAX_DESCOMPACTADO:
+                raise ValueError(f"{nome}: conteúdo descompactado acima do limite")
+            for membro in membros:
+                expandidas.append((_nome_seguro(membro.filename), arquivo_zip.read(membro)))
+    return expandidas
+
+
+# ========== PROCESSAMENTO ==========
+def pagina_html(texto, paginas=None):
+    """HTML acessível do Modelo para o texto (ou o layout) de um arquivo"""
+    if paginas:
+        corpo = layout_ocr.paginas_para_html(paginas)
+    else:
+        corpo = f"<pre>{html.escape(modelo.formatar_texto(texto))}</pre>"
+    return modelo.Config.HTML_TEMPLATE.format(corpo)
+
+
+def processar(entradas, relatorio=None, **opcoes):
+    """Gera (nome, texto, páginas estruturadas ou None, erro) de cada entrada, na
+    ordem em que terminam"""
+    if layout_ocr.LAYOUT:
+        for indice, paginas, erro in layout_ocr.layout_lote(entradas, relatorio=relatorio, **opcoes):
+            paginas = paginas or []
+            yield entradas[indice][0], layout_ocr.texto_das_paginas(paginas), paginas, erro
+        return
+    for indice, textos, erro in motor_ocr.ocr_lote(entradas, relatorio=relatorio, **opcoes):
+        yield entradas[indice][0], "\n\n".join(textos or []), None, erro
+
+
+def resumir(arquivos, segundos, relatorio, erros):
+    paginas = len(relatorio)
+    resumo = (f"{arquivos} arquivos, {paginas} páginas em {segundos:.1f} s "
+              f"({paginas / segundos if segundos else 0:.2f} pág/s, "
+              f"{arquivos / segundos if segundos else 0:.2f} arquivos/s)")
+    if relatorio:
+        resumo += f" - {motor_ocr.resumir_relatorio(relatorio)}"
+    if erros:
+        resumo += f"; {erros} com erro"
+    return resumo
+
+
+def zip_de_html(entradas, **opcoes):
+    """Processa as entradas e devolve (bytes de um .zip com um HTML por arquivo, resumo)"""
+    relatorio = []
+    erros = []
+    saida = io.BytesIO()
+    inicio = time.perf_counter()
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, texto, paginas, erro in processar(entradas, relatorio, **opcoes):
+            if erro is not None:
+                erros.append(f"{nome}: {erro}")
+            if texto.strip():
+                arquivo_zip.writestr(os.path.splitext(nome)[0] + '.html', pagina_html(texto, paginas))
+        if erros:
+            arquivo_zip.writestr('erros.txt', '\n'.join(erros) + '\n')
+    return saida.getvalue(), resumir(len(entradas), time.perf_counter() - inicio, relatorio, len(erros))
+
+
+# ========== CLI ==========
+def main():
+    parser = argparse.ArgumentParser(description="OCR em lote: um HTML acessível por PDF ou imagem")
+    parser.add_argument("entradas", nargs="+", help="arquivos ou pastas (percorridas recursivamente)")
+    parser.add_argument("-o", "--saida", default="html_acessivel", help="pasta dos HTMLs gerados")
+    parser.add_argument("--workers", type=int, default=None, help="processos de OCR (padrão: núcleos)")
+    parser.add_argument("--lang", default=motor_ocr.LANG_PADRAO)
+    parser.add_argument("--dpi", type=int, default=motor_ocr.DPI_PADRAO)
+    parser.add_argument("--sem-cache", action="store_true", help="não usa nem grava o cache de OCR")
+    args = parser.parse_args()
+
+    entradas = expandir_zips(listar_arquivos(args.entradas))
+    if not entradas:
+        parser.error("nenhum PDF ou imagem encontrado")
+    print(f"{len(entradas)} arquivos para processar com {args.workers or motor_ocr.NUM_WORKERS} workers")
+
+    relatorio = []
+    erros = 0
+    inicio = time.perf_counter()
+    try:
+        for feitos, (nome, texto, paginas, erro) in enumerate(
+                processar(entradas, relatorio, workers=args.workers, lang=args.lang, dpi=args.dpi,
+                          usar_cache=not args.sem_cache), start=1):
+            if erro is not None:
+                erros += 1
+                print(f"[{feitos}/{len(entradas)}] \033[31mErro em {nome}: {erro}\033[0m")
+            destino = os.path.join(args.saida, os.path.splitext(nome)[0] + '.html')
+            os.makedirs(os.path.dirname(destino) or '.', exist_ok=True)
+            if texto.strip():
+                modelo.converter_para_html(modelo.formatar_texto(texto), destino, paginas=paginas)
+    except KeyboardInterrupt:
+        print("\nLote interrompido pelo usuário.")
+    finally:
+        motor_ocr.encerrar_pool()
+    print(resumir(len(entradas), time.perf_counter() - inicio, relatorio, erros))
+
+
+if __name__ == "__main__":
+    main()
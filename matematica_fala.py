@@ -0,0 +1,719 @@
+r"""Expressões matemáticas em MathJax e em português falado, sem o Gemini.
+
+Boa parte do prompt existia só para o modelo transformar `f(x) = x^2 + 1`,
+`lim x→0 f(x)`, `∫x^2 dx`, `|x|` ou `Δx` em texto descritivo mais MathJax.
+Aqui isso sai de regras: um tokenizador e um parser descendente recursivo para
+a notação comum de material didático, e dois geradores sobre a mesma árvore
+(LaTeX e fala em pt-BR). Microssegundos por expressão, sem rede e sempre com
+a mesma saída.
+
+- converter(expr) -> (latex, fala); ExpressaoInvalida se não entender;
+- descrever(expr): "A função f de x é igual a x ao quadrado mais um.
+  Escrito como \( f(x) = x^2 + 1 \)" (números soltos: só a fala);
+- converter_texto(texto): troca as linhas '[equação] ' e as expressões no meio
+  da prosa pela descrição. Linhas de tabela ('| ') e o que não for claramente
+  matemática ficam como estão, para o Gemini cuidar.
+"""
+import functools
+import hashlib
+import re
+
+MARCADOR_EQUACAO = '[equação] '
+
+# nome -> (fala, LaTeX)
+FUNCOES = {
+    'sen': ('seno', r'\operatorname{sen}'), 'sin': ('seno', r'\sin'),
+    'cos': ('cosseno', r'\cos'),
+    'tg': ('tangente', r'\operatorname{tg}'), 'tan': ('tangente', r'\tan'),
+    'cotg': ('cotangente', r'\operatorname{cotg}'), 'cot': ('cotangente', r'\cot'),
+    'sec': ('secante', r'\sec'), 'cossec': ('cossecante', r'\operatorname{cossec}'),
+    'arcsen': ('arco seno', r'\operatorname{arcsen}'), 'arccos': ('arco cosseno', r'\arccos'),
+    'arctg': ('arco tangente', r'\operatorname{arctg}'),
+    'log': ('logaritmo', r'\log'), 'ln': ('logaritmo natural', r'\ln'), 'exp': ('exponencial', r'\exp'),
+    'max': ('máximo', r'\max'), 'min': ('mínimo', r'\min'),
+}
+# Letras que, seguidas de parênteses, são função (f(x)) e não produto (x(x + 1))
+LETRAS_FUNCAO = set('fghFGH')
+GREGAS = {
+    'α': ('alfa', r'\alpha'), 'β': ('beta', r'\beta'), 'γ': ('gama', r'\gamma'),
+    'δ': ('delta', r'\delta'), 'Δ': ('delta', r'\Delta'), 'ε': ('épsilon', r'\varepsilon'),
+    'θ': ('teta', r'\theta'), 'λ': ('lambda', r'\lambda'), 'μ': ('mi', r'\mu'),
+    'π': ('pi', r'\pi'), 'ρ': ('rô', r'\rho'), 'σ': ('sigma', r'\sigma'), 'Σ': ('sigma', r'\Sigma'),
+    'τ': ('tau', r'\tau'), 'φ': ('fi', r'\varphi'), 'ω': ('ômega', r'\omega'), 'Ω': ('ômega', r'\Omega'),
+    '∞': ('infinito', r'\infty'),
+}
+# op -> (fala, LaTeX)
+RELACOES = {
+    '=': ('é igual a', '='), '≠': ('é diferente de', r'\neq'), '≈': ('é aproximadamente igual a', r'\approx'),
+    '<': ('é menor que', '<'), '>': ('é maior que', '>'),
+    '≤': ('é menor ou igual a', r'\leq'), '≥': ('é maior ou igual a', r'\geq'),
+    '→': ('tende a', r'\to'),
+}
+_EQUIVALENTES = {'->': '→', '<=': '≤', '>=': '≥', '!=': '≠', '−': '-', '*': '·', '×': '·', '÷': '/',
+                 '′': "'"}
+
+_TOKEN = re.compile(r"""
+    (?P<num>\d+(?:[,.]\d+)?)
+  | (?P<palavra>[A-Za-z]+)
+  | (?P<simbolo>->|<=|>=|!=|″|[→≤≥≠≈=<>+\-−·*×/÷^()\[\]{}|'′,∫√_²³!]|[""" + ''.join(GREGAS) + r"""])
+  | (?P<espaco>\s+)
+""", re.VERBOSE)
+
+
+class ExpressaoInvalida(ValueError):
+    """A expressão usa notação que o conversor não conhece (ou está incompleta)"""
+
+
+# ========== TOKENS ==========
+def _tokens(expressao):
+    tokens = []
+    posicao = 0
+    for m in _TOKEN.finditer(expressao):
+        if m.start() != posicao:
+            break
+        posicao = m.end()
+        tipo = m.lastgroup
+        valor = m.group()
+        if tipo == 'num':
+            tokens.append(('num', valor))
+        elif tipo == 'palavra':
+            minuscula = valor.lower()
+            if minuscula in FUNCOES:
+                tokens.append(('func', minuscula))
+            elif minuscula in ('lim', 'matriz'):
+                tokens.append((minuscula, minuscula))
+            elif len(valor) <= 3:
+                tokens.extend(('var', letra) for letra in valor)  # xy, dx: letra a letra
+            else:
+                raise ExpressaoInvalida(f"palavra '{valor}'")
+        elif tipo == 'simbolo':
+            valor = _EQUIVALENTES.get(valor, valor)
+            if valor in '²³':
+                tokens.extend([('op', '^'), ('num', '2' if valor == '²' else '3')])
+            elif valor == '″':
+                tokens.extend([('op', "'"), ('op', "'")])
+            elif valor in GREGAS:
+                tokens.append(('var', valor))
+            else:
+                tokens.append(('op', valor))
+    if posicao != len(expressao):
+        raise ExpressaoInvalida(f"caractere inesperado {expressao[posicao]!r}")
+    return tokens
+
+
+# ========== PARSER ==========
+class _Parser:
+    """Descendente recursivo; cada regra devolve uma tupla (tipo, ...)"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.modulo = 0    # dentro de |...|: a barra fecha em vez de abrir
+        self.integral = 0  # dentro de ∫...: 'd' + variável fecha o integrando
+
+    def ver(self, deslocamento=0):
+        i = self.i + deslocamento
+        return self.tokens[i] if i < len(self.tokens) else (None, None)
+
+    def eh(self, valor):
+        return self.ver() == ('op', valor)
+
+    def consumir(self, valor=None):
+        token = self.ver()
+        if token[0] is None or (valor is not None and token != ('op', valor)):
+            raise ExpressaoInvalida(f"esperado {valor!r}" if valor else "expressão incompleta")
+        self.i += 1
+        return token
+
+    def analisar(self):
+        arvore = self.lista()
+        if self.i != len(self.tokens):
+            raise ExpressaoInvalida(f"sobrou {self.ver()[1]!r}")
+        return arvore
+
+    def lista(self):
+        itens = [self.relacao()]
+        while self.eh(','):
+            self.consumir()
+            itens.append(self.relacao())
+        return itens[0] if len(itens) == 1 else ('lista', itens)
+
+    def relacao(self):
+        termos = [self.soma()]
+        operadores = []
+        while self.ver()[0] == 'op' and self.ver()[1] in RELACOES:
+            operadores.append(self.consumir()[1])
+            termos.append(self.soma())
+        return termos[0] if not operadores else ('rel', termos, operadores)
+
+    def soma(self):
+        arvore = self.termo()
+        while self.eh('+') or self.eh('-'):
+            operador = self.consumir()[1]
+            arvore = ('bin', operador, arvore, self.termo())
+        return arvore
+
+    def termo(self):
+        arvore = self.unario()
+        while True:
+            if self.eh('·') or self.eh('/'):
+                operador = self.consumir()[1]
+                arvore = ('bin', operador, arvore, self.unario())
+            elif self._comeca_fator():
+                arvore = ('mul', arvore, self.potencia())  # produto implícito: 2x, x y
+            else:
+                return arvore
+
+    def _comeca_fator(self):
+        tipo, valor = self.ver()
+        if tipo in ('var', 'func', 'lim', 'num', 'matriz'):
+            if tipo == 'num' and self.tokens[self.i - 1][0] == 'num':
+                return False
+            if self.integral and tipo == 'var' and valor == 'd' and self.ver(1)[0] == 'var':
+                return False
+            return True
+        if tipo == 'op':
+            return valor in '(∫√[{' or (valor == '|' and not self.modulo)
+        return False
+
+    def unario(self):
+        if self.eh('-'):
+            self.consumir()
+            return ('neg', self.unario())
+        if self.eh('+'):
+            self.consumir()
+            return self.unario()
+        return self.potencia()
+
+    def potencia(self):
+        base = self.posfixo()
+        if self.eh('^'):
+            self.consumir()
+            return ('pot', base, self.unario())
+        return base
+
+    def posfixo(self):
+        arvore = self.primario()
+        while True:
+            if self.eh('!'):
+                self.consumir()
+                arvore = ('fat', arvore)
+            elif self.eh('_'):
+                self.consumir()
+                arvore = ('sub', arvore, self.primario())
+            else:
+                return arvore
+
+    def _argumentos(self):
+        self.consumir('(')
+        argumentos = [self.relacao()]
+        while self.eh(','):
+            self.consumir()
+            argumentos.append(self.relacao())
+        self.consumir(')')
+        return argumentos
+
+    def primario(self):
+        tipo, valor = self.ver()
+        if tipo == 'num':
+            self.consumir()
+            return ('num', valor)
+        if tipo == 'var':
+            return self._variavel()
+        if tipo == 'func':
+            self.consumir()
+            if self.eh('('):
+                return ('func', valor, self._argumentos(), True)
+            return ('func', valor, [self.potencia()], False)
+        if tipo == 'lim':
+            return self._limite()
+        if tipo == 'matriz':
+            self.consumir()
+            return self._matriz()
+        if tipo != 'op':
+            raise ExpressaoInvalida("expressão incompleta")
+        if valor == '(':
+            self.consumir()
+            dentro = self.lista()
+            self.consumir(')')
+            return ('par', dentro)
+        if valor == '{':
+            self.consumir()
+            dentro = self.lista()
+            self.consumir('}')
+            return ('grupo', dentro)
+        if valor == '[':
+            if self.ver(1) == ('op', '['):
+                return self._matriz()
+            self.consumir()
+            dentro = self.lista()
+            self.consumir(']')
+            return ('colchetes', dentro)
+        if valor == '|' and not self.modulo:
+            self.consumir()
+            self.modulo += 1
+            dentro = self.soma()
+            self.modulo -= 1
+            self.consumir('|')
+            return ('abs', dentro)
+        if valor == '√':
+            self.consumir()
+            return ('raiz', self.posfixo())
+        if valor == '∫':
+            return self._integral()
+        raise ExpressaoInvalida(f"inesperado {valor!r}")
+
+    def _variavel(self):
+        nome = self.consumir()[1]
+        linhas = 0
+        while self.eh("'"):
+            self.consumir()
+            linhas += 1
+        if self.eh('(') and (nome in LETRAS_FUNCAO or linhas):
+            return ('app', nome, self._argumentos(), linhas)
+        if linhas:
+            return ('linha', nome, linhas)
+        if nome == 'Δ' and (self.ver()[0] in ('var', 'num') or self.eh('(')):
+            return ('delta', self.posfixo())
+        return ('var', nome)
+
+    def _limite(self):
+        self.consumir()
+        if self.eh('_'):
+            self.consumir()
+        fechar = None
+        if self.eh('(') or self.eh('{'):
+            fechar = ')' if self.consumir()[1] == '(' else '}'
+        if self.ver()[0] != 'var':
+            raise ExpressaoInvalida("limite sem variável")
+        variavel = self.consumir()[1]
+        self.consumir('→')
+        alvo = self.unario()
+        if fechar:
+            self.consumir(fechar)
+        return ('lim', variavel, alvo, self.termo())
+
+    def _integral(self):
+        self.consumir()
+        inferior = superior = None
+        if self.eh('_'):
+            self.consumir()
+            inferior = self.primario()
+            self.consumir('^')
+            superior = self.primario()
+        self.integral += 1
+        integrando = self.soma()
+        self.integral -= 1
+        if self.ver() != ('var', 'd') or self.ver(1)[0] != 'var':
+            raise ExpressaoInvalida("integral sem diferencial (dx)")
+        self.consumir()
+        variavel = self.consumir()[1]
+        return ('int', integrando, variavel, inferior, superior)
+
+    def _matriz(self):
+        self.consumir('[')
+        linhas = []
+        while True:
+            self.consumir('[')
+            linha = [self.relacao()]
+            while self.eh(','):
+                self.consumir()
+                linha.append(self.relacao())
+            self.consumir(']')
+            linhas.append(linha)
+            if not self.eh(','):
+                break
+            self.consumir()
+        self.consumir(']')
+        if len({len(linha) for linha in linhas}) != 1:
+            raise ExpressaoInvalida("matriz com linhas de tamanhos diferentes")
+        return ('matriz', linhas)
+
+
+# ========== NÚMEROS POR EXTENSO ==========
+_UNIDADES = ['zero', 'um', 'dois', 'três', 'quatro', 'cinco', 'seis', 'sete', 'oito', 'nove', 'dez',
+             'onze', 'doze', 'treze', 'catorze', 'quinze', 'dezesseis', 'dezessete', 'dezoito', 'dezenove']
+_DEZENAS = ['', '', 'vinte', 'trinta', 'quarenta', 'cinquenta', 'sessenta', 'setenta', 'oitenta', 'noventa']
+_CENTENAS = ['', 'cento', 'duzentos', 'trezentos', 'quatrocentos', 'quinhentos', 'seiscentos',
+             'setecentos', 'oitocentos', 'novecentos']
+_ESCALAS = [(10 ** 9, 'bilhão', 'bilhões'), (10 ** 6, 'milhão', 'milhões'), (1000, 'mil', 'mil')]
+_ORDINAIS = ['primeira', 'segunda', 'terceira', 'quarta', 'quinta', 'sexta', 'sétima', 'oitava',
+             'nona', 'décima']
+
+
+def _unidade(n, feminino):
+    palavra = _UNIDADES[n]
+    if feminino and n in (1, 2):
+        return 'uma' if n == 1 else 'duas'
+    return palavra
+
+
+def _ate_mil(n, feminino):
+    if n == 100:
+        return 'cem'
+    centena, resto = divmod(n, 100)
+    partes = []
+    if centena:
+        partes.append(_CENTENAS[centena][:-2] + 'as' if feminino and centena > 1 else _CENTENAS[centena])
+    if resto >= 20:
+        dezena, unidade = divmod(resto, 10)
+        partes.append(_DEZENAS[dezena] + (' e ' + _unidade(unidade, feminino) if unidade else ''))
+    elif resto:
+        partes.append(_unidade(resto, feminino))
+    return ' e '.join(partes)
+
+
+def por_extenso(n, feminino=False):
+    """Inteiro não negativo por extenso ('duas linhas': feminino=True)"""
+    if n >= 10 ** 12:
+        return ' '.join(_UNIDADES[int(d)] for d in str(n))
+    if n < 20:
+        return _unidade(n, feminino)
+    partes = []
+    resto = n
+    for valor, singular, plural in _ESCALAS:
+        quantidade, resto = divmod(resto, valor)
+        if quantidade:
+            if valor == 1000:
+                partes.append('mil' if quantidade == 1 else f"{_ate_mil(quantidade, feminino)} mil")
+            else:
+                partes.append(f"{_ate_mil(quantidade, False)} {singular if quantidade == 1 else plural}")
+    if resto:
+        final = _ate_mil(resto, feminino)
+        partes.append('e ' + final if partes and (resto < 100 or resto % 100 == 0) else final)
+    return ' '.join(partes)
+
+
+def _numero(texto):
+    """'2,34' -> 'dois vírgula três quatro' (as casas decimais dígito a dígito)"""
+    inteiro, separador, decimais = re.fullmatch(r'(\d+)(?:([,.])(\d+))?', texto).groups()
+    fala = por_extenso(int(inteiro))
+    if separador:
+        fala += (' vírgula ' if separador == ',' else ' ponto ') + ' '.join(_UNIDADES[int(d)] for d in decimais)
+    return fala
+
+
+def _juntar(itens):
+    return itens[0] if len(itens) == 1 else ', '.join(itens[:-1]) + ' e ' + itens[-1]
+
+
+# ========== LATEX ==========
+_CDOT = r'\cdot'
+
+
+def _sem_parenteses(no):
+    return no[1] if no[0] == 'par' else no
+
+
+def _chaves(texto):
+    return texto if len(texto) == 1 else '{' + texto + '}'
+
+
+def _latex(no):
+    tipo = no[0]
+    if tipo == 'num':
+        return no[1].replace(',', '{,}')
+    if tipo == 'var':
+        return GREGAS[no[1]][1] if no[1] in GREGAS else no[1]
+    if tipo == 'bin':
+        _, operador, a, b = no
+        if operador == '/':
+            return rf"\frac{{{_latex(_sem_parenteses(a))}}}{{{_latex(_sem_parenteses(b))}}}"
+        return f"{_latex(a)} {_CDOT if operador == '·' else operador} {_latex(b)}"
+    if tipo == 'mul':
+        a, b = _latex(no[1]), _latex(no[2])
+        return a + b if no[1][0] == 'num' and b[:1].isalpha() else f"{a} {b}"
+    if tipo == 'neg':
+        return '-' + _latex(no[1])
+    if tipo == 'pot':
+        return f"{_latex(no[1])}^{_chaves(_latex(_sem_parenteses(no[2])) if no[2][0] == 'grupo' else _latex(no[2]))}"
+    if tipo == 'par':
+        return f"({_latex(no[1])})"
+    if tipo == 'grupo':
+        return _latex(no[1])
+    if tipo == 'colchetes':
+        return f"[{_latex(no[1])}]"
+    if tipo == 'app':
+        _, nome, argumentos, linhas = no
+        return f"{nome}{chr(39) * linhas}({', '.join(_latex(a) for a in argumentos)})"
+    if tipo == 'func':
+        _, nome, argumentos, parenteses = no
+        comando = FUNCOES[nome][1]
+        if parenteses:
+            return f"{comando}({', '.join(_latex(a) for a in argumentos)})"
+        return f"{comando} {_latex(argumentos[0])}"
+    if tipo == 'linha':
+        return no[1] + "'" * no[2]
+    if tipo == 'abs':
+        return f"|{_latex(no[1])}|"
+    if tipo == 'raiz':
+        return rf"\sqrt{{{_latex(_sem_parenteses(no[1]))}}}"
+    if tipo == 'delta':
+        return rf"\Delta {_latex(no[1])}"
+    if tipo == 'lim':
+        _, variavel, alvo, corpo = no
+        return rf"\lim_{{{variavel} \to {_latex(alvo)}}} {_latex(corpo)}"
+    if tipo == 'int':
+        _, integrando, variavel, inferior, superior = no
+        limites = f"_{{{_latex(inferior)}}}^{{{_latex(superior)}}}" if inferior is not None else ''
+        return rf"\int{limites} {_latex(integrando)} \, d{variavel}"
+    if tipo == 'sub':
+        return f"{_latex(no[1])}_{_chaves(_latex(no[2]))}"
+    if tipo == 'fat':
+        return _latex(no[1]) + '!'
+    if tipo == 'rel':
+        _, termos, operadores = no
+        partes = [_latex(termos[0])]
+        for operador, termo in zip(operadores, termos[1:]):
+            partes += [RELACOES[operador][1], _latex(termo)]
+        return ' '.join(partes)
+    if tipo == 'lista':
+        return ', '.join(_latex(item) for item in no[1])
+    if tipo == 'matriz':
+        linhas = r' \\ '.join(' & '.join(_latex(e) for e in linha) for linha in no[1])
+        return rf"\begin{{bmatrix}} {linhas} \end{{bmatrix}}"
+    raise ExpressaoInvalida(tipo)
+
+
+# ========== FALA ==========
+_SIMPLES = {'num', 'var', 'app', 'func', 'abs', 'raiz', 'par', 'delta', 'linha', 'sub', 'fat', 'pot',
+            'colchetes', 'matriz'}
+
+
+def _simples(no):
+    if no[0] == 'grupo':
+        return _simples(no[1])
+    if no[0] == 'mul':
+        return no[1][0] == 'num' and no[2][0] == 'var'  # 2x
+    return no[0] in _SIMPLES
+
+
+def _agrupado(no):
+    """Fala do nó; se composto, entre 'abre parênteses' e 'fecha parênteses'"""
+    fala = _fala(no)
+    return fala if _simples(no) else f"abre parênteses {fala} fecha parênteses"
+
+
+def _fala(no, sujeito=None):
+    """sujeito: True põe o artigo ('a função f de x'); None só no sujeito de
+    uma relação, como numa frase solta; False nunca (fala no meio de uma frase)"""
+    tipo = no[0]
+    if tipo == 'num':
+        return _numero(no[1])
+    if tipo == 'var':
+        return GREGAS[no[1]][0] if no[1] in GREGAS else no[1]
+    if tipo == 'bin':
+        _, operador, a, b = no
+        if operador == '/':
+            a, b = _sem_parenteses(a), _sem_parenteses(b)
+            if _simples(a) and _simples(b):
+                return f"{_fala(a)} dividido por {_fala(b)}"
+            return f"fração de numerador {_fala(a)} e denominador {_fala(b)}"
+        palavra = {'+': 'mais', '-': 'menos', '·': 'vezes'}[operador]
+        return f"{_fala(a, sujeito)} {palavra} {_fala(b)}"
+    if tipo == 'mul':
+        juncao = ' vezes ' if no[2][0] in ('par', 'colchetes') else ' '
+        return _fala(no[1], sujeito) + juncao + _fala(no[2])
+    if tipo == 'neg':
+        return 'menos ' + _fala(no[1])
+    if tipo == 'pot':
+        _, base, expoente = no
+        if expoente == ('num', '2'):
+            return f"{_fala(base)} ao quadrado"
+        if expoente == ('num', '3'):
+            return f"{_fala(base)} ao cubo"
+        return f"{_fala(base)} elevado a {_agrupado(expoente)}"
+    if tipo == 'par':
+        return f"abre parênteses {_fala(no[1])} fecha parênteses"
+    if tipo == 'grupo':
+        return _fala(no[1], sujeito)
+    if tipo == 'colchetes':
+        return f"abre colchetes {_fala(no[1])} fecha colchetes"
+    if tipo == 'app':
+        _, nome, argumentos, linhas = no
+        if not linhas:
+            fala = f"{nome} de {_juntar([_agrupado(a) for a in argumentos])}"
+            return 'a função ' + fala if sujeito else fala
+        ordem = {1: '', 2: ' segunda', 3: ' terceira'}.get(linhas, f" de ordem {por_extenso(linhas, True)}")
+        if len(argumentos) == 1 and argumentos[0][0] == 'var':
+            fala = f"derivada{ordem} da função {nome} em relação a {_fala(argumentos[0])}"
+        else:
+            fala = f"derivada{ordem} da função {nome} aplicada em {_juntar([_agrupado(a) for a in argumentos])}"
+        return 'a ' + fala if sujeito else fala
+    if tipo == 'func':
+        _, nome, argumentos, _ = no
+        return f"{FUNCOES[nome][0]} de {_juntar([_agrupado(a) for a in argumentos])}"
+    if tipo == 'linha':
+        return f"{no[1]} linha" if no[2] == 1 else f"{no[1]} {por_extenso(no[2], True)} linhas"
+    if tipo == 'abs':
+        return f"valor absoluto de {_agrupado(no[1])}"
+    if tipo == 'raiz':
+        return f"raiz quadrada de {_agrupado(_sem_parenteses(no[1]))}"
+    if tipo == 'delta':
+        return f"variação de {_agrupado(no[1])}"
+    if tipo == 'lim':
+        _, variavel, alvo, corpo = no
+        return f"o limite de {_fala(corpo)} quando {_fala(('var', variavel))} tende a {_fala(alvo)}"
+    if tipo == 'int':
+        _, integrando, variavel, inferior, superior = no
+        limites = f" de {_fala(inferior)} a {_fala(superior)}" if inferior is not None else ''
+        return f"a integral{limites} de {_fala(integrando)} em relação a {_fala(('var', variavel))}"
+    if tipo == 'sub':
+        return f"{_fala(no[1])} índice {_fala(no[2])}"
+    if tipo == 'fat':
+        return f"{_agrupado(no[1])} fatorial"
+    if tipo == 'rel':
+        _, termos, operadores = no
+        partes = [_fala(termos[0], sujeito is not False)]
+        for operador, termo in zip(operadores, termos[1:]):
+            partes += [RELACOES[operador][0], _fala(termo)]
+        return ' '.join(partes)
+    if tipo == 'lista':
+        return _juntar([_fala(item, sujeito if i == 0 else None) for i, item in enumerate(no[1])])
+    if tipo == 'matriz':
+        linhas = no[1]
+        n, m = len(linhas), len(linhas[0])
+        elementos = ', '.join(
+            f"{_ORDINAIS[i] if i < len(_ORDINAIS) else 'linha ' + por_extenso(i + 1, True)}"
+            f"{' linha' if i < len(_ORDINAIS) else ''} {_juntar([_fala(e) for e in linha])}"
+            for i, linha in enumerate(linhas))
+        return (f"matriz de {por_extenso(n, True)} {'linha' if n == 1 else 'linhas'} e "
+                f"{por_extenso(m, True)} {'coluna' if m == 1 else 'colunas'} com os elementos: {elementos}")
+    raise ExpressaoInvalida(tipo)
+
+
+# ========== API ==========
+@functools.lru_cache(maxsize=4096)
+def converter(expressao, frase=True):
+    """(latex, fala) de uma expressão; ExpressaoInvalida se não for reconhecida.
+    frase=False tira o artigo do sujeito, para a fala caber no meio de uma frase"""
+    tokens = _tokens(expressao.strip())
+    if not tokens:
+        raise ExpressaoInvalida("expressão vazia")
+    try:
+        arvore = _Parser(tokens).analisar()
+        return _latex(arvore), _fala(arvore, None if frase else False)
+    except RecursionError:
+        # Parser e geradores são recursivos: lixo do OCR muito aninhado ('------x', 'x^x^x^...')
+        raise ExpressaoInvalida("expressão aninhada demais") from None
+
+
+def reconhece(expressao):
+    try:
+        converter(expressao)
+    except ExpressaoInvalida:
+        return False
+    return True
+
+
+def descrever(expressao):
+    r"""Frase para leitores de tela seguida da forma MathJax: 'Valor absoluto de x.
+    Escrito como \( |x| \)'. Um número sozinho vira só a fala"""
+    latex, fala = converter(expressao)
+    if _SO_NUMERO.fullmatch(expressao.strip()):
+        return fala
+    if not fala.startswith(expressao.strip()[:1] + ' '):  # 'x é igual a ...' continua com x minúsculo
+        fala = fala[0].upper() + fala[1:]
+    return f"{fala}. Escrito como \\( {latex} \\)"
+
+
+# ========== TEXTO CORRIDO ==========
+_SO_NUMERO = re.compile(r'\d+(?:[,.]\d+)?')
+# Trechos já em MathJax não são convertidos de novo
+_DELIMITADO = re.compile(r'\\\(.*?\\\)|\$\$.*?\$\$', re.DOTALL)
+_NOMES = '|'.join(sorted(list(FUNCOES) + ['lim'], key=len, reverse=True))
+_ATOMO = (rf"(?:\d+(?:[,.]\d+)?|(?:{_NOMES}|d?[A-Za-z])(?![A-Za-z])|[{''.join(GREGAS)}]"
+          r"|->|<=|>=|!=|[→≤≥≠≈=<>+\-−·*×/÷^()\[\]{}|'′″∫√_²³!])")
+# Sequência de átomos separados por espaços; ", " só continua se vier um número (x = 0, 1, 2).
+# Não termina colada numa palavra (copo d'água)
+_EXPRESSAO = re.compile(rf"(?<![\w\\]){_ATOMO}(?:[ \t]*(?:,[ \t]*(?=\d))?{_ATOMO})*(?!\w)")
+_SINAL = re.compile(r"[=≠≈<>≤≥→^²³∫√Δ|'′+·*×/]|->")
+_RELACAO = re.compile(r"[=≠≈<>≤≥→]|->")
+_VARIAVEL = re.compile(rf"[A-Za-z{''.join(GREGAS)}∫√]")
+# Valor absoluto encosta no conteúdo (|x|, |x - 1|); barra com espaço dos dois
+# lados separa colunas ou opções (a | b | c)
+_MODULO = re.compile(r"\|[^\s|](?:[^|]*[^\s|])?\|")
+# Linha de tabela do layout_ocr.blocos_para_prompt: as células vão como estão
+_LINHA_TABELA = '| '
+# Palavras curtas do português que encostam na expressão ("e |x| indica", "∫x^2 dx e")
+_BORDA = {'a', 'e', 'o', 'de', 'do', 'da'}
+# ...ou ficam entre duas delas ("f(x) e ∫x^2 dx"); do lado de um operador são variáveis (a ≤ b)
+_OPERADORES = set('-+=<>≤≥≠≈→·*×/÷^_')
+_CONECTIVO = re.compile(r"(?<![-+=<>≤≥≠≈→·*×/÷^_,(∫√]) ((?:a|e|o|de|do|da)) (?![-+=<>≤≥≠≈→·*×/÷^_,)!])")
+
+
+def _aparar(trecho):
+    """(antes, expressão, depois): tira das pontas palavras soltas e parênteses sem par"""
+    partes = trecho.split(' ')
+    inicio, fim = 0, len(partes)
+    # Ao lado de um operador, a letra é variável (a ≤ b)
+    while inicio < fim - 1 and partes[inicio] in _BORDA and partes[inicio + 1][:1] not in _OPERADORES:
+        inicio += 1
+    while fim > inicio + 1 and partes[fim - 1] in _BORDA and partes[fim - 2][-1:] not in _OPERADORES:
+        fim -= 1
+    antes, meio, depois = ' '.join(partes[:inicio]), ' '.join(partes[inicio:fim]), ' '.join(partes[fim:])
+    while meio.endswith(')') and meio.count(')') > meio.count('('):
+        meio, depois = meio[:-1], ')' + depois
+    while meio.startswith('(') and meio.count('(') > meio.count(')'):
+        antes, meio = antes + '(', meio[1:]
+    return antes, meio, depois
+
+
+def _converter_expressao(trecho):
+    antes, expressao, depois = _aparar(trecho)
+    # Precisa de algum operador, e de uma variável ou uma relação: datas
+    # (12/05/2024) e números soltos ficam como estão. Barras soltas e "C++"
+    # são texto, não matemática
+    if not (_SINAL.search(expressao) and (_VARIAVEL.search(expressao) or _RELACAO.search(expressao))):
+        return trecho
+    if '|' in _MODULO.sub('', expressao) or '++' in expressao:
+        return trecho
+    try:
+        latex, fala = converter(expressao, False)
+    except ExpressaoInvalida:
+        return trecho
+    espaco_antes = ' ' if antes and not antes.endswith('(') else ''
+    espaco_depois = ' ' if depois and not depois.startswith(')') else ''
+    return f"{antes}{espaco_antes}\\( {latex} \\) ({fala}){espaco_depois}{depois}"
+
+
+def _substituir(m):
+    # split com grupo: expressão, conectivo, expressão, ...
+    pedacos = _CONECTIVO.split(m.group())
+    return ''.join(f" {p} " if i % 2 else _converter_expressao(p) for i, p in enumerate(pedacos))
+
+
+def _converter_trecho(texto):
+    linhas = []
+    for linha in texto.split('\n'):
+        if linha.startswith(MARCADOR_EQUACAO) and reconhece(linha[len(MARCADOR_EQUACAO):]):
+            linhas.append(descrever(linha[len(MARCADOR_EQUACAO):]))
+        elif linha.startswith(_LINHA_TABELA):
+            linhas.append(linha)
+        else:
+            linhas.append(_EXPRESSAO.sub(_substituir, linha))
+    return '\n'.join(linhas)
+
+
+def converter_texto(texto):
+    r"""Texto com as expressões reconhecidas já descritas: as linhas '[equação] '
+    viram a frase de descrever() e as expressões no meio da prosa viram
+    '\( latex \) (fala)'. O resto, inclusive linhas de tabela e o que já está
+    em MathJax, fica igual."""
+    partes = []
+    ultimo = 0
+    for m in _DELIMITADO.finditer(texto):
+        partes += [_converter_trecho(texto[ultimo:m.start()]), m.group()]
+        ultimo = m.end()
+    partes.append(_converter_trecho(texto[ultimo:]))
+    return ''.join(partes)
+
+
+def _versao():
+    with open(__file__, 'rb') as arquivo:
+        return hashlib.sha256(arquivo.read()).hexdigest()[:16]
+
+
+# Muda com qualquer mudança no conversor: entra na chave do cache do Gemini
+# (prompt_gemini.VERSAO_TEXTO), que recebe o texto já convertido
+VERSAO = _versao()
@@ -0,0 +1,587 @@
+import hashlib
+import importlib.util
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+import pytesseract
+
+import preprocessamento
+from cache_sqlite import CacheSQLite
+
+# ========== CONFIGS DO MOTOR ==========
+DPI_PADRAO = 200
+# DPI por página a partir do tamanho do texto (OCR_DPI_ADAPTATIVO=0 usa sempre o DPI pedido)
+DPI_ADAPTATIVO = os.environ.get('OCR_DPI_ADAPTATIVO', '1') != '0'
+DPI_SONDA = 72
+DPI_MIN = 100
+DPI_MAX = 400
+# Altura das linhas de texto (px) que o DPI escolhido deve produzir. Corpo 11 fica
+# nos mesmos 200 DPI de antes; acima disso o tesseract só gasta tempo e memória,
+# abaixo os caracteres miúdos se perdem
+ALTURA_LINHA_ALVO = 28
+LANG_PADRAO = 'por+eng'
+# Número de processos do pool (padrão: todos os núcleos); ajuste com OCR_WORKERS
+NUM_WORKERS = int(os.environ.get('OCR_WORKERS', 0)) or os.cpu_count() or 1
+# Cache de resultados por página (OCR_CACHE vazio desativa)
+CACHE_CAMINHO = os.environ.get('OCR_CACHE', os.path.join('cache', 'ocr.sqlite3'))
+CACHE_MAX_BYTES = int(os.environ.get('OCR_CACHE_MAX_MB', 512)) * 1024 * 1024
+# Páginas com camada de texto aproveitável pulam o OCR (OCR_TEXTO_NATIVO=0 desativa)
+TEXTO_NATIVO = os.environ.get('OCR_TEXTO_NATIVO', '1') != '0'
+MIN_CARACTERES_NATIVOS = 25
+AREA_MIN_IMAGEM = 0.05  # fração da página a partir da qual uma imagem vai para o OCR
+# 'tesserocr' roda o tesseract dentro do processo (API C, motor carregado uma vez);
+# 'pytesseract' chama o executável a cada imagem; 'auto' usa tesserocr se instalado
+OCR_BACKEND = os.environ.get('OCR_BACKEND', 'auto')
+
+_pool = None
+_pool_config = None
+_trava_pool = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+_caches = {}
+
+# PDFs recebidos em memória chegam aos workers como 'shm:<nome>:<tamanho>'
+_PREFIXO_SHM = 'shm:'
+
+# Estado de cada processo worker: documentos abertos (reaproveitados entre páginas).
+# Mais de um porque no lote as páginas de documentos diferentes se intercalam
+DOCS_ABERTOS_POR_WORKER = 4
+_docs_abertos = OrderedDict()
+# Motores tesserocr já inicializados, por thread e idioma
+_local = threading.local()
+
+
+# ========== LADO DO WORKER ==========
+def _inicializar_worker(tesseract_cmd, backend):
+    """Prepara o processo worker: caminho do tesseract, backend e uma thread por processo"""
+    global OCR_BACKEND
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    OCR_BACKEND = backend
+    # O paralelismo vem do pool; evita que cada tesseract dispare várias threads OpenMP.
+    # Vem antes de qualquer import do tesserocr, que lê a variável ao carregar a lib
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+
+def usar_tesserocr():
+    """Se o OCR roda pelo tesserocr (dentro do processo) ou pelo executável"""
+    if OCR_BACKEND == 'auto':
+        return importlib.util.find_spec('tesserocr') is not None
+    return OCR_BACKEND == 'tesserocr'
+
+
+def _tessdata():
+    """Pasta tessdata ao lado do executável configurado (instalação do Windows)"""
+    pasta = os.path.join(os.path.dirname(pytesseract.pytesseract.tesseract_cmd), 'tessdata')
+    return pasta if os.path.isdir(pasta) else None
+
+
+def _motor(lang):
+    """API do tesseract inicializada com `lang`, criada uma vez por thread.
+
+    Carregar os traineddata de por+eng custa mais que o OCR de muitas páginas;
+    aqui isso acontece só na primeira página que o worker recebe.
+    """
+    motores = getattr(_local, 'motores', None)
+    if motores is None:
+        motores = _local.motores = {}
+    if lang not in motores:
+        import tesserocr
+        tessdata = _tessdata()
+        opcoes = {'path': tessdata} if tessdata else {}
+        motores[lang] = tesserocr.PyTessBaseAPI(lang=lang, **opcoes)
+    return motores[lang]
+
+
+def _reconhecer_pixmap(pix, lang):
+    """Roda o tesseract sobre os pixels do pixmap sem passar por PNG nem subprocesso"""
+    if usar_tesserocr():
+        api = _motor(lang)
+        api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+        return api.GetUTF8Text()
+    # Sem tesserocr: a imagem PIL só aponta para o buffer do pixmap (sem cópia) e o
+    # temporário que o pytesseract grava sai em PPM, sem o custo de comprimir um PNG
+    modo = 'L' if pix.n == 1 else 'RGB'
+    img = Image.frombuffer(modo, (pix.width, pix.height), pix.samples_mv, 'raw', modo, pix.stride, 1)
+    img.format = 'PPM'
+    return pytesseract.image_to_string(img, lang=lang)
+
+
+def _reconhecer_matriz(pixels, lang):
+    """Mesmo que _reconhecer_pixmap para uma matriz NumPy em tons de cinza (já pré-processada)"""
+    if usar_tesserocr():
+        api = _motor(lang)
+        api.SetImageBytes(pixels.tobytes(), pixels.shape[1], pixels.shape[0], 1, pixels.strides[0])
+        return api.GetUTF8Text()
+    img = Image.fromarray(pixels)
+    img.format = 'PPM'
+    return pytesseract.image_to_string(img, lang=lang)
+
+
+def _reconhecer_imagem(img, lang):
+    if usar_tesserocr():
+        api = _motor(lang)
+        api.SetImage(img)
+        return api.GetUTF8Text()
+    return pytesseract.image_to_string(img, lang=lang)
+
+
+def _ler_compartilhado(origem):
+    """Bytes do PDF publicado pelo servidor num bloco de memória compartilhada"""
+    nome, tamanho = origem[len(_PREFIXO_SHM):].rsplit(':', 1)
+    shm = shared_memory.SharedMemory(name=nome)
+    try:
+        return bytes(shm.buf[:int(tamanho)])
+    finally:
+        shm.close()
+
+
+def _abrir_documento(origem):
+    """Abre o PDF uma única vez por worker e reaproveita nas páginas seguintes"""
+    if origem in _docs_abertos:
+        _docs_abertos.move_to_end(origem)
+        return _docs_abertos[origem]
+    if origem.startswith(_PREFIXO_SHM):
+        dados = _ler_compartilhado(origem)
+    else:
+        # Lê para a memória: o worker não segura o arquivo aberto e o servidor
+        # consegue apagar o temporário (no Windows, arquivo aberto não é removido)
+        with open(origem, 'rb') as f:
+            dados = f.read()
+    _docs_abertos[origem] = fitz.open(stream=dados, filetype='pdf')
+    while len(_docs_abertos) > DOCS_ABERTOS_POR_WORKER:
+        _docs_abertos.popitem(last=False)[1].close()
+    return _docs_abertos[origem]
+
+
+def _texto_nativo(page):
+    """Texto da camada de texto do PDF, se existir e for aproveitável"""
+    texto = page.get_text()
+    legiveis = sum(c.isalnum() for c in texto)
+    # Fontes sem mapa Unicode viram U+FFFD: nesse caso a camada não serve
+    if legiveis < MIN_CARACTERES_NATIVOS or texto.count('\ufffd') > 0.05 * legiveis:
+        return None
+    return texto
+
+
+def _regioes_sem_texto(page):
+    """Imagens relevantes da página que não têm texto por cima (figuras escaneadas)"""
+    area_pagina = abs(page.rect)
+    regioes = []
+    for info in page.get_image_info():
+        caixa = fitz.Rect(info['bbox']) & page.rect
+        if abs(caixa) < AREA_MIN_IMAGEM * area_pagina:
+            continue  # ícones, logos, marcadores
+        if page.get_text(clip=caixa).strip():
+            continue  # já tem texto (ex.: PDF escaneado que já passou por OCR)
+        regioes.append(caixa)
+    return regioes
+
+
+def _matriz(pix):
+    """Pixels de um pixmap em tons de cinza como matriz NumPy, sem cópia"""
+    return np.frombuffer(pix.samples_mv, np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+
+def _altura_linha(pixels):
+    """Altura mediana (px) das linhas de texto de uma matriz em tons de cinza.
+
+    Usa a projeção horizontal: linhas da imagem com tinta formam faixas, e cada
+    faixa é uma linha de texto. Devolve None se não achar texto.
+    """
+    com_tinta = (pixels < 128).sum(axis=1) > max(1, pixels.shape[1] // 200)
+    bordas = np.flatnonzero(np.diff(np.concatenate(([0], com_tinta.view(np.int8), [0]))))
+    alturas = bordas[1::2] - bordas[::2]
+    alturas = alturas[alturas >= 2]  # sujeira e sublinhados
+    if len(alturas) < 3:
+        return None
+    return float(np.median(alturas))
+
+
+def _escolher_dpi(page, clip=None, padrao=DPI_PADRAO):
+    """DPI que deixa as linhas de texto da página perto de ALTURA_LINHA_ALVO.
+
+    Renderiza uma sonda barata a DPI_SONDA; slides com letra grande descem até
+    DPI_MIN e notas de rodapé miúdas sobem até DPI_MAX.
+    """
+    sonda = page.get_pixmap(dpi=DPI_SONDA, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+    altura = _altura_linha(_matriz(sonda))
+    if altura is None:
+        return padrao
+    dpi = DPI_SONDA * ALTURA_LINHA_ALVO / altura
+    return int(min(DPI_MAX, max(DPI_MIN, round(dpi / 25) * 25)))
+
+
+def _renderizar(page, dpi, adaptativo, clip=None):
+    """Pixmap em tons de cinza (1/3 da memória do RGB) no DPI fixo ou escolhido"""
+    if adaptativo:
+        dpi = _escolher_dpi(page, clip, dpi)
+    return page.get_pixmap(dpi=dpi, clip=clip, colorspace=fitz.csGRAY, alpha=False), dpi
+
+
+def _ocr_pixmap(pix, dpi, lang, caminho_cache, etapas=(), tempos=None):
+    """OCR de um pixmap; com cache, identifica a imagem pelo hash dos pixels.
+
+    Assim, se um PDF mudou só em algumas páginas, as demais são reaproveitadas
+    sem rodar o tesseract (nem o pré-processamento). `tempos` acumula os
+    segundos de cada etapa do pré-processamento e do tesseract.
+    """
+    cache = chave = None
+    if caminho_cache:
+        cache = obter_cache(caminho_cache)
+        chave = _chave('conteudo', hashlib.sha256(pix.samples_mv).hexdigest(), dpi, lang,
+                       preprocessamento.assinatura(etapas))
+        texto = cache.obter(chave)
+        if texto is not None:
+            return texto.decode('utf-8')
+    tempos = {} if tempos is None else tempos
+    if etapas:
+        pixels = preprocessamento.preprocessar(_matriz(pix), etapas, tempos)
+        inicio = time.perf_counter()
+        texto = _reconhecer_matriz(pixels, lang)
+    else:
+        inicio = time.perf_counter()
+        texto = _reconhecer_pixmap(pix, lang)
+    tempos['tesseract'] = tempos.get('tesseract', 0.0) + time.perf_counter() - inicio
+    if cache is not None:
+        cache.guardar(chave, texto.encode('utf-8'))
+    return texto
+
+
+def _ocr_pagina(origem, indice, dpi, lang, caminho_cache=None, texto_nativo=True,
+                dpi_adaptativo=False, etapas=()):
+    """Extrai o texto de uma página (executa dentro do worker).
+
+    Devolve (texto, via, tempos). `via` é 'texto' quando a camada de texto do
+    PDF basta, 'misto' quando além dela há imagens sem texto que passam pelo
+    OCR, 'ocr' para páginas escaneadas inteiras; `tempos` tem os segundos de
+    cada etapa do pré-processamento e do tesseract.
+    """
+    page = _abrir_documento(origem)[indice]
+    nativo = _texto_nativo(page) if texto_nativo else None
+    tempos = {}
+    if nativo is None:
+        pix, dpi_usado = _renderizar(page, dpi, dpi_adaptativo)
+        return _ocr_pixmap(pix, dpi_usado, lang, caminho_cache, etapas, tempos), 'ocr', tempos
+    regioes = _regioes_sem_texto(page)
+    if not regioes:
+        return nativo, 'texto', tempos
+    textos = [nativo]
+    for caixa in regioes:
+        pix, dpi_usado = _renderizar(page, dpi, dpi_adaptativo, caixa)
+        textos.append(_ocr_pixmap(pix, dpi_usado, lang, caminho_cache, etapas, tempos))
+    return "\n\n".join(textos), 'misto', tempos
+
+
+# ========== CACHE ==========
+def _chave(*partes):
+    return ':'.join(str(p) for p in partes)
+
+
+def obter_cache(caminho=None):
+    """Instância do cache (uma por processo e por arquivo de banco)"""
+    caminho = caminho or CACHE_CAMINHO
+    if caminho not in _caches:
+        _caches[caminho] = CacheSQLite(caminho, CACHE_MAX_BYTES)
+    return _caches[caminho]
+
+
+def hash_arquivo(origem):
+    """SHA-256 do arquivo enviado (bytes em memória ou caminho, lido em blocos)"""
+    if not _eh_caminho(origem):
+        return hashlib.sha256(origem).hexdigest()
+    sha = hashlib.sha256()
+    with open(origem, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+# ========== LADO DO SERVIDOR ==========
+def obter_pool(workers=None):
+    """Retorna o pool de processos compartilhado, recriando se o tamanho ou o backend mudar"""
+    global _pool, _pool_config
+    workers = workers or NUM_WORKERS
+    with _trava_pool:
+        if _pool is None or _pool_config != (workers, OCR_BACKEND):
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_inicializar_worker,
+                initargs=(pytesseract.pytesseract.tesseract_cmd, OCR_BACKEND),
+            )
+            _pool_config = (workers, OCR_BACKEND)
+        return _pool
+
+
+def encerrar_pool():
+    """Finaliza os processos do pool (útil em testes e benchmarks)"""
+    global _pool, _pool_config
+    with _trava_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_config = None
+
+
+def _eh_caminho(origem):
+    return isinstance(origem, (str, os.PathLike))
+
+
+def contar_paginas(origem):
+    if _eh_caminho(origem):
+        doc = fitz.open(origem)
+    else:
+        doc = fitz.open(stream=origem, filetype='pdf')
+    with doc:
+        return doc.page_count
+
+
+def _compartilhar(dados):
+    """Publica o PDF recebido em memória para os workers, sem passar pelo disco.
+
+    Cada worker copia o bloco uma vez, ao abrir o documento; quem o apaga é o
+    servidor, quando o último resultado chega.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(dados)))
+    shm.buf[:len(dados)] = dados
+    return shm, f"{_PREFIXO_SHM}{shm.name}:{len(dados)}"
+
+
+def ocr_paginas(origem, dpi=DPI_PADRAO, lang=LANG_PADRAO, workers=None, usar_cache=True,
+                texto_nativo=None, relatorio=None, dpi_adaptativo=None, etapas=None):
+    """Gera (índice, texto) de cada página do PDF, em ordem, processando em paralelo.
+
+    `origem` é o caminho do PDF ou o seu conteúdo (bytes), como veio do upload.
+    Páginas já conhecidas (mesmo arquivo, página, DPI e idioma) saem direto do
+    cache; as demais são enviadas ao pool de uma vez e o gerador devolve cada uma
+    assim que ela e todas as anteriores estiverem prontas. Se `relatorio` for uma
+    lista, recebe um dicionário por página com o caminho usado ('cache', 'texto',
+    'misto' ou 'ocr') e os tempos do pré-processamento e do tesseract. Com
+    `dpi_adaptativo`, `dpi` vira só o valor usado quando a sonda não encontra
+    texto na página. `etapas` escolhe o pré-processamento das imagens antes do
+    tesseract (padrão: preprocessamento.ETAPAS; () desliga).
+    """
+    return processar_paginas(_ocr_pagina, 'texto', origem, dpi, lang, workers, usar_cache,
+                             texto_nativo, relatorio, dpi_adaptativo, etapas)
+
+
+def processar_paginas(tarefa, formato, origem, dpi=DPI_PADRAO, lang=LANG_PADRAO, workers=None,
+                      usar_cache=True, texto_nativo=None, relatorio=None, dpi_adaptativo=None,
+                      etapas=None):
+    """Agendador do ocr_paginas com a tarefa de cada página como parâmetro.
+
+    `tarefa` roda no worker com os mesmos argumentos de _ocr_pagina e devolve
+    (valor, via, tempos), com `valor` uma string; `formato` separa no cache os
+    resultados de tarefas diferentes (ex.: 'texto', 'layout').
+    """
+    texto_nativo = TEXTO_NATIVO if texto_nativo is None else texto_nativo
+    dpi_adaptativo = DPI_ADAPTATIVO if dpi_adaptativo is None else dpi_adaptativo
+    etapas = preprocessamento.normalizar_etapas(etapas)
+    total = contar_paginas(origem)
+    cache = obter_cache() if usar_cache and CACHE_CAMINHO else None
+    chaves, prontas = {}, {}
+    if cache is not None:
+        sha = hash_arquivo(origem)
+        modo = 'nativo' if texto_nativo else 'ocr'
+        resolucao = f'auto{dpi}' if dpi_adaptativo else dpi
+        pre = preprocessamento.assinatura(etapas)
+        chaves = {i: _chave('arquivo', sha, i, resolucao, lang, modo, pre, formato)
+                  for i in range(total)}
+        prontas = cache.obter_varios(chaves.values())
+
+    pendentes = [indice for indice in range(total) if chaves.get(indice) not in prontas]
+    shm = None
+    futuros = {}
+    try:
+        if pendentes:
+            pool = obter_pool(workers)
+            if _eh_caminho(origem):
+                publicado = os.fspath(origem)
+            else:
+                shm, publicado = _compartilhar(origem)
+            futuros = {
+                indice: pool.submit(tarefa, publicado, indice, dpi, lang,
+                                    cache and cache.caminho, texto_nativo, dpi_adaptativo, etapas)
+                for indice in pendentes
+            }
+        for indice in range(total):
+            if indice in futuros:
+                texto, via, tempos = futuros[indice].result()
+                if cache is not None:
+                    cache.guardar(chaves[indice], texto.encode('utf-8'))
+            else:
+                texto, via, tempos = prontas[chaves[indice]].decode('utf-8'), 'cache', {}
+            if relatorio is not None:
+                relatorio.append({'pagina': indice + 1, 'via': via, 'caracteres': len(texto),
+                                  'tempos': tempos})
+            yield indice, texto
+    finally:
+        # Se o consumidor desistir no meio (ex.: conexão fechada), libera o pool
+        for futuro in futuros.values():
+            futuro.cancel()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+def resumir_relatorio(relatorio):
+    """Resumo de uma linha, ex.: '12 páginas: 9 texto, 3 ocr (binarizacao 0.40 s, tesseract 6.10 s)'"""
+    contagem = {}
+    tempos = {}
+    for item in relatorio:
+        contagem[item['via']] = contagem.get(item['via'], 0) + 1
+        for etapa, segundos in item.get('tempos', {}).items():
+            tempos[etapa] = tempos.get(etapa, 0.0) + segundos
+    detalhes = ', '.join(f"{n} {via}" for via, n in sorted(contagem.items()))
+    if tempos:
+        detalhes += f" ({preprocessamento.resumir_tempos(tempos)})"
+    return f"{len(relatorio)} páginas: {detalhes}"
+
+
+def ocr_imagem(origem, lang=LANG_PADRAO, usar_cache=True, etapas=None, tempos=None):
+    """OCR de uma imagem avulsa (caminho ou bytes), tratada como documento de página única"""
+    etapas = preprocessamento.normalizar_etapas(etapas)
+    cache = obter_cache() if usar_cache and CACHE_CAMINHO else None
+    if cache is not None:
+        chave = _chave('arquivo', hash_arquivo(origem), 0, 'imagem', lang,
+                       preprocessamento.assinatura(etapas))
+        texto = cache.obter(chave)
+        if texto is not None:
+            return texto.decode('utf-8')
+    with Image.open(origem if _eh_caminho(origem) else io.BytesIO(origem)) as img:
+        if etapas:
+            pixels = preprocessamento.preprocessar(np.asarray(img.convert('L')), etapas, tempos)
+            inicio = time.perf_counter()
+            texto = _reconhecer_matriz(pixels, lang)
+        else:
+            inicio = time.perf_counter()
+            texto = _reconhecer_imagem(img, lang)
+    if tempos is not None:
+        tempos['tesseract'] = tempos.get('tesseract', 0.0) + time.perf_counter() - inicio
+    if cache is not None:
+        cache.guardar(chave, texto.encode('utf-8'))
+    return texto
+
+
+def _ocr_imagem_lote(origem, lang, usar_cache, etapas):
+    """Tarefa do ocr_lote para uma imagem, no mesmo formato de _ocr_pagina"""
+    tempos = {}
+    return ocr_imagem(origem, lang, usar_cache, etapas, tempos), 'ocr', tempos
+
+
+def ocr_pdf(origem, dpi=DPI_PADRAO, lang=LANG_PADRAO, workers=None, usar_cache=True,
+            texto_nativo=None, relatorio=None, dpi_adaptativo=None, etapas=None):
+    """Retorna a lista com o texto de cada página do PDF (caminho ou bytes), na ordem original"""
+    return [texto for _, texto in ocr_paginas(origem, dpi, lang, workers, usar_cache,
+                                               texto_nativo, relatorio, dpi_adaptativo, etapas)]
+
+
+def ocr_lote(origens, dpi=DPI_PADRAO, lang=LANG_PADRAO, workers=None, usar_cache=True,
+             texto_nativo=None, relatorio=None, dpi_adaptativo=None, em_voo=None, etapas=None,
+             tarefa_pagina=_ocr_pagina, tarefa_imagem=_ocr_imagem_lote):
+    """OCR de muitos documentos como um único fluxo de páginas no pool.
+
+    `origens` é uma lista de (nome, origem), com origem caminho ou bytes; o nome
+    diz se é PDF ou imagem. As páginas de todos os documentos dividem os mesmos
+    workers, com no máximo `em_voo` tarefas pendentes (padrão: 4 por worker),
+    para que uma pasta com milhares de arquivos não vire milhares de futuros na
+    memória. Gera (índice, textos, erro) assim que cada documento termina, na
+    ordem em que terminam; um arquivo com defeito sai com `erro` e o lote segue,
+    e um PDF sem páginas sai com `textos` vazio.
+    As tarefas de página e de imagem podem ser trocadas (ex.: layout_ocr).
+    """
+    texto_nativo = TEXTO_NATIVO if texto_nativo is None else texto_nativo
+    dpi_adaptativo = DPI_ADAPTATIVO if dpi_adaptativo is None else dpi_adaptativo
+    etapas = preprocessamento.normalizar_etapas(etapas)
+    workers = workers or NUM_WORKERS
+    em_voo = em_voo or 4 * workers
+    pool = obter_pool(workers)
+    caminho_cache = obter_cache().caminho if usar_cache and CACHE_CAMINHO else None
+    docs = {}  # índice -> {'textos', 'faltam', 'erro', 'shm'}
+
+    def tarefas():
+        for indice, (nome, origem) in enumerate(origens):
+            if not nome.lower().endswith('.pdf'):
+                docs[indice] = {'textos': [None], 'faltam': 1, 'erro': None, 'shm': None}
+                yield indice, 0, (tarefa_imagem, origem, lang, usar_cache, etapas)
+                continue
+            try:
+                total = contar_paginas(origem)
+            except Exception as e:
+                yield indice, e, None
+                continue
+            if not total:  # PDF sem páginas: resultado vazio, senão o documento nunca sairia
+                yield indice, None, None
+                continue
+            shm, publicado = (None, os.fspath(origem)) if _eh_caminho(origem) else _compartilhar(origem)
+            docs[indice] = {'textos': [None] * total, 'faltam': total, 'erro': None, 'shm': shm}
+            for pagina in range(total):
+                yield indice, pagina, (tarefa_pagina, publicado, pagina, dpi, lang, caminho_cache,
+                                       texto_nativo, dpi_adaptativo, etapas)
+
+    def liberar(doc):
+        if doc['shm'] is not None:
+            doc['shm'].close()
+            doc['shm'].unlink()
+
+    fila = tarefas()
+    futuros = {}
+    esgotada = False
+    try:
+        while futuros or not esgotada:
+            while not esgotada and len(futuros) < em_voo:
+                item = next(fila, None)
+                if item is None:
+                    esgotada = True
+                elif item[2] is None:  # não abriu (ou não tem páginas): nem chega ao pool
+                    yield item[0], None if item[1] else [], item[1]
+                else:
+                    indice, pagina, (funcao, *argumentos) = item
+                    futuros[pool.submit(funcao, *argumentos)] = (indice, pagina)
+            if not futuros:
+                continue
+            prontos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                indice, pagina = futuros.pop(futuro)
+                doc = docs[indice]
+                try:
+                    texto, via, tempos = futuro.result()
+                except Exception as e:
+                    doc['erro'] = doc['erro'] or e
+                    texto, via, tempos = '', 'erro', {}
+                doc['textos'][pagina] = texto
+                doc['faltam'] -= 1
+                if relatorio is not None:
+                    relatorio.append({'documento': indice, 'pagina': pagina + 1, 'via': via,
+                                      'caracteres': len(texto), 'tempos': tempos})
+                if doc['faltam'] == 0:
+                    liberar(docs.pop(indice))
+                    yield indice, doc['textos'], doc['erro']
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+        for doc in docs.values():
+            liberar(doc)
+
+
+def ocr_arquivo(caminho, progresso=None):
+    """OCR de um PDF ou imagem; chama progresso(feitos, total) a cada página concluída"""
+    if os.path.splitext(caminho)[1].lower() != '.pdf':
+        textos = [ocr_imagem(caminho)]
+        if progresso:
+            progresso(1, 1)
+        return textos
+    total = contar_paginas(caminho)
+    textos = []
+    for indice, texto in ocr_paginas(caminho):
+        textos.append(texto)
+        if progresso:
+            progresso(indice + 1, total)
+    return textos
@@ -0,0 +1,165 @@
+"""Prompts do Gemini: instruções enxutas, texto do OCR normalizado e orçamento de tokens.
+
+Antes, app3 e app6 tinham cada um a sua cópia de um bloco de instruções longo
+(exemplos repetidos, pedidos contraditórios como "HTML completo" e "sem
+<html>"), mandado em toda chamada junto do texto bruto do tesseract. Aqui:
+
+- uma cópia só das instruções, enxutas (INSTRUCOES_HTML, INSTRUCOES_CORRECAO);
+- normalizar(): espaços e linhas vazias repetidos saem (a limpeza do
+  formatar_texto do Modelo, em gemini_blocos.normalizar_espacos) e a
+  hifenização de fim de linha é desfeita;
+- as expressões matemáticas que o matematica_fala reconhece já vão descritas
+  e em MathJax, e o modelo só as copia;
+- estimar_tokens() e ORCAMENTO_TOKENS: nenhuma requisição passa do orçamento;
+  caracteres_por_bloco() dá o tamanho dos blocos do gemini_blocos para isso;
+- ModeloComInstrucoes: as instruções vão fora do prompt de cada chamada, num
+  CachedContent (context caching) quando passam do mínimo que a API aceita,
+  senão como system_instruction.
+"""
+import datetime
+import hashlib
+import inspect
+import math
+import os
+import re
+import threading
+import time
+
+import gemini_blocos
+import matematica_fala
+
+# ========== CONFIGS ==========
+# Teto de tokens de entrada por requisição (instruções + texto). ~12 mil
+# caracteres de texto por bloco: a saída, maior que a entrada depois de virar
+# HTML, ainda cabe com folga no limite de saída do modelo
+ORCAMENTO_TOKENS = int(os.environ.get('GEMINI_ORCAMENTO_TOKENS', 4000))
+# Estimativa local (sem chamar o count_tokens da API); português com
+# marcação dá entre 3,5 e 4 caracteres por token, e o orçamento usa o pior caso
+CARACTERES_POR_TOKEN = float(os.environ.get('GEMINI_CARACTERES_POR_TOKEN', 3.5))
+# Context caching só aceita conteúdos a partir de um mínimo de tokens (4096 no
+# gemini-2.0-flash); abaixo disso as instruções vão como system_instruction
+CACHE_CONTEXTO_MIN_TOKENS = int(os.environ.get('GEMINI_CACHE_CONTEXTO_MIN_TOKENS', 4096))
+CACHE_CONTEXTO_TTL = float(os.environ.get('GEMINI_CACHE_CONTEXTO_TTL', 3600))
+
+# ========== PROMPTS ==========
+INSTRUCOES_HTML = r"""Converta texto de OCR de material didático em HTML acessível para leitores de tela.
+- Corrija erros de OCR e de ortografia sem mudar o sentido; mantenha títulos e parágrafos.
+- Use HTML semântico: <h2>/<h3>, <p>, <ul>/<ol>, <table> com <th>, <strong>/<em>.
+- O texto pode vir marcado: '# ' título, '- ' ou '1. ' item de lista, '| a | b |' linha de tabela,
+  '[equação] ' expressão matemática. Siga essa estrutura em vez de adivinhá-la.
+- Matemática em \( ... \) já vem com a descrição em português: copie as duas sem mudar.
+  Expressão que ainda vier crua vira descrição em português seguida da forma MathJax
+  (\( ... \) na linha, $$ ... $$ em bloco).
+- Responda só com o HTML do conteúdo, sem <html>, <head>, <body> nem ```."""
+TEXTO_HTML = 'Texto OCR:\n"""{texto_ocr}"""'
+
+INSTRUCOES_CORRECAO = r"""Corrija trechos de material didático extraídos por OCR. Cada trecho começa com um
+marcador [[n]]; o resto do documento já está estruturado e não é enviado.
+- Corrija erros de OCR e de ortografia sem mudar o sentido.
+- Devolva cada trecho em HTML simples (<h2>, <p>, <ul>/<ol>, <table>) seguindo a marcação:
+  '# ' título, '- ' ou '1. ' itens de lista, '| a | b |' linhas de tabela.
+- Matemática em \( ... \) já vem com a descrição em português: copie as duas sem mudar.
+- Trechos '[equação]' viram descrição em português seguida da forma MathJax, ex.:
+  f(x) = x^2 + 1 → A função f de x é igual a x ao quadrado mais um. Escrito como \( f(x) = x^2 + 1 \)
+- Escreva cada marcador [[n]] sozinho numa linha, antes do HTML do trecho, sem omitir nenhum."""
+TEXTO_CORRECAO = 'Trechos:\n"""{texto_ocr}"""'
+
+# O que identifica cada prompt no cache de respostas (cache_gemini.versao_prompt)
+PROMPT_HTML = INSTRUCOES_HTML + TEXTO_HTML
+PROMPT_CORRECAO = INSTRUCOES_CORRECAO + TEXTO_CORRECAO
+
+# Palavra quebrada no fim da linha que continua em minúscula na seguinte ("conti-\nnua")
+_HIFENIZACAO = re.compile(r'(?<=\w)-\n(?=[a-zà-ÿ])')
+
+
+# ========== TEXTO E TOKENS ==========
+def normalizar(texto):
+    """Texto do OCR sem espaços redundantes nem hifenização de fim de linha"""
+    return _HIFENIZACAO.sub('', gemini_blocos.normalizar_espacos(texto))
+
+
+def estimar_tokens(texto):
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def caracteres_por_bloco(prompt, orcamento=ORCAMENTO_TOKENS):
+    """Quantos caracteres de texto cabem numa requisição com `prompt` (instruções
+    e template) sem passar do orçamento"""
+    return max(1000, int((orcamento - estimar_tokens(prompt)) * CARACTERES_POR_TOKEN))
+
+
+def montar(template, texto_ocr, instrucoes='', orcamento=ORCAMENTO_TOKENS):
+    """Prompt de uma chamada: `template` com o texto normalizado e a matemática
+    já convertida (matematica_fala.converter_texto).
+
+    `instrucoes` (as que vão fora do prompt) entram na conta do orçamento, já
+    que são cobradas como entrada; ValueError se a requisição passar dele.
+    """
+    texto = normalizar(texto_ocr)
+    prompt = template.format(texto_ocr=matematica_fala.converter_texto(texto))
+    tokens = estimar_tokens(instrucoes) + estimar_tokens(prompt)
+    if orcamento and tokens > orcamento:
+        # Os blocos são medidos no texto cru e a descrição é mais longa que a
+        # expressão: se não couber, a matemática vai crua e o modelo converte
+        prompt = template.format(texto_ocr=texto)
+        tokens = estimar_tokens(instrucoes) + estimar_tokens(prompt)
+    if orcamento and tokens > orcamento:
+        raise ValueError(f"Requisição com ~{tokens} tokens passa do orçamento de {orcamento}; "
+                         f"divida o texto em blocos (caracteres_por_bloco)")
+    return prompt
+
+
+# O que montar() faz com o texto antes do envio (normalização, matemática). Vai na
+# chave do cache_gemini junto do prompt: com outro conversor, o HTML guardado
+# a partir da conversão antiga deixa de valer
+VERSAO_TEXTO = hashlib.sha256(
+    (matematica_fala.VERSAO + inspect.getsource(normalizar) + inspect.getsource(montar)).encode('utf-8')
+).hexdigest()[:16]
+
+
+# ========== INSTRUÇÕES FORA DO PROMPT ==========
+class ModeloComInstrucoes:
+    """GenerativeModel com instruções fixas fora do prompt de cada chamada.
+
+    Instruções a partir de CACHE_CONTEXTO_MIN_TOKENS vão para um CachedContent,
+    cobrado uma vez por TTL e renovado antes de expirar; abaixo disso (ou se a
+    criação falhar) vão como system_instruction, prefixo igual em todas as
+    chamadas. Mesma interface do GenerativeModel para o cliente_llm.ClienteLLM.
+    """
+
+    def __init__(self, nome_modelo, instrucoes, ttl=CACHE_CONTEXTO_TTL):
+        import google.generativeai as genai
+        self._genai = genai
+        self.instrucoes = instrucoes
+        self.ttl = ttl
+        self._modelo = genai.GenerativeModel(nome_modelo, system_instruction=instrucoes)
+        self.model_name = self._modelo.model_name
+        self._com_cache = None
+        self._renovar_em = 0.0
+        self._usar_cache = estimar_tokens(instrucoes) >= CACHE_CONTEXTO_MIN_TOKENS
+        self._trava = threading.Lock()
+
+    def _modelo_atual(self):
+        if not self._usar_cache:
+            return self._modelo
+        with self._trava:
+            if time.monotonic() >= self._renovar_em:
+                try:
+                    conteudo = self._genai.caching.CachedContent.create(
+                        model=self.model_name, system_instruction=self.instrucoes,
+                        ttl=datetime.timedelta(seconds=self.ttl))
+                except Exception as e:
+                    print(f"\033[31mContext caching indisponível ({e}); "
+                          f"instruções vão como system_instruction\033[0m")
+                    self._usar_cache = False
+                    return self._modelo
+                self._com_cache = self._genai.GenerativeModel.from_cached_content(conteudo)
+                # O antigo expira sozinho; o novo entra antes disso
+                self._renovar_em = time.monotonic() + self.ttl * 0.9
+            return self._com_cache
+
+    def generate_content(self, prompt, **opcoes):
+        return self._modelo_atual().generate_content(prompt, **opcoes)
+
+    def count_tokens(self, conteudo):
+        return self._modelo.count_tokens(conteudo)
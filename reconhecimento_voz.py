@@ -0,0 +1,138 @@
+"""Reconhecimento da pergunta por voz, com backends trocáveis.
+
+- 'google': o serviço web do speech_recognition (recognize_google); uma ida e
+  volta pela rede a cada pergunta, e sr.RequestError quando a rede falha;
+- 'vosk': modelo local e offline (https://alphacephei.com/vosk/models, ex.:
+  vosk-model-small-pt-0.3), carregado uma vez por processo e mantido na
+  memória; cada pergunta cria só um KaldiRecognizer, que é barato;
+- 'auto': vosk se o pacote e o modelo existirem, senão google.
+
+Todo backend é um gerador (pcm) -> (texto, final): o PCM vem do audio_voz
+(16 bits, mono, TAXA Hz), os textos parciais saem conforme o áudio é
+processado e o último tem final=True. O Google só tem o resultado final.
+"""
+import json
+import os
+import threading
+import time
+
+import audio_voz
+
+# ========== CONFIGS ==========
+RECONHECIMENTO_BACKEND = os.environ.get('RECONHECIMENTO_BACKEND', 'google')
+IDIOMA = 'pt-BR'
+MODELO_VOSK = os.environ.get('VOSK_MODELO', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'modelos', 'vosk-model-small-pt-0.3'))
+# Sem isso, uma rede lenta segura a requisição até o timeout do servidor
+TIMEOUT_GOOGLE = float(os.environ.get('RECONHECIMENTO_TIMEOUT', 10))
+BLOCO_MS = 250  # áudio entregue ao vosk por vez; cada bloco pode gerar um parcial
+
+_modelo_vosk = None
+_trava_modelo = threading.Lock()
+
+
+class FalaNaoEntendida(Exception):
+    pass
+
+
+class ReconhecimentoIndisponivel(Exception):
+    pass
+
+
+# ========== BACKENDS ==========
+def _google(pcm):
+    import speech_recognition as sr
+    r = sr.Recognizer()
+    r.operation_timeout = TIMEOUT_GOOGLE
+    try:
+        yield r.recognize_google(sr.AudioData(pcm, audio_voz.TAXA, 2), language=IDIOMA), True
+    except sr.UnknownValueError:
+        raise FalaNaoEntendida() from None
+    except sr.RequestError as e:
+        raise ReconhecimentoIndisponivel(str(e)) from e
+
+
+def vosk_disponivel():
+    import importlib.util
+    return importlib.util.find_spec('vosk') is not None and os.path.isdir(MODELO_VOSK)
+
+
+def carregar_vosk():
+    """Modelo do vosk do processo, carregado na primeira chamada (leva alguns segundos)"""
+    global _modelo_vosk
+    with _trava_modelo:  # duas perguntas simultâneas no início não carregam o modelo duas vezes
+        if _modelo_vosk is None:
+            import vosk
+            vosk.SetLogLevel(-1)
+            if not os.path.isdir(MODELO_VOSK):
+                raise ReconhecimentoIndisponivel(f"Modelo do vosk não encontrado em {MODELO_VOSK} (VOSK_MODELO)")
+            inicio = time.perf_counter()
+            _modelo_vosk = vosk.Model(MODELO_VOSK)
+            print(f"Modelo do vosk carregado em {time.perf_counter() - inicio:.1f} s")
+        return _modelo_vosk
+
+
+def _vosk(pcm):
+    import vosk
+    # O modelo é compartilhado entre as threads; o reconhecedor é um por pergunta
+    reconhecedor = vosk.KaldiRecognizer(carregar_vosk(), audio_voz.TAXA)
+    tamanho = audio_voz.TAXA * 2 * BLOCO_MS // 1000
+    frases = []
+    anterior = ''
+    for inicio in range(0, len(pcm), tamanho):
+        if reconhecedor.AcceptWaveform(pcm[inicio:inicio + tamanho]):
+            # Fim de um trecho de fala: o texto dele não muda mais
+            frases.append(json.loads(reconhecedor.Result())['text'])
+            parcial = ''
+        else:
+            parcial = json.loads(reconhecedor.PartialResult())['partial']
+        texto = ' '.join(f for f in frases + [parcial] if f)
+        if texto and texto != anterior:
+            anterior = texto
+            yield texto, False
+    frases.append(json.loads(reconhecedor.FinalResult())['text'])
+    texto = ' '.join(f for f in frases if f)
+    if not texto:
+        raise FalaNaoEntendida()
+    yield texto, True
+
+
+BACKENDS = {'google': _google, 'vosk': _vosk}
+
+
+# ========== INTERFACE ==========
+def backend_padrao():
+    if RECONHECIMENTO_BACKEND == 'auto':
+        return 'vosk' if vosk_disponivel() else 'google'
+    return RECONHECIMENTO_BACKEND
+
+
+def aquecer(backend=None):
+    """Carrega o modelo local numa thread, para a primeira pergunta não esperar por ele"""
+    if (backend or backend_padrao()) == 'vosk':
+        threading.Thread(target=carregar_vosk, name='vosk-modelo', daemon=True).start()
+
+
+def em_fluxo(pcm, backend=None):
+    """Gera (texto, final) conforme o áudio é reconhecido.
+
+    `backend` é um nome de BACKENDS ou uma função geradora (pcm) -> (texto, final)
+    (os benchmarks usam reconhecedores falsos).
+    """
+    backend = backend or backend_padrao()
+    funcao = backend if callable(backend) else BACKENDS.get(backend)
+    if funcao is None:
+        raise ValueError(f"Backend de reconhecimento desconhecido: {backend}")
+    return funcao(pcm)
+
+
+def transcrever(pcm, backend=None, tempos=None):
+    """Texto final da fala; registra 'reconhecimento' em `tempos`, se dado"""
+    inicio = time.perf_counter()
+    texto = ''
+    for texto, final in em_fluxo(pcm, backend):
+        if final:
+            break
+    if tempos is not None:
+        tempos['reconhecimento'] = time.perf_counter() - inicio
+    return texto
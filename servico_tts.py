@@ -0,0 +1,266 @@
+"""Síntese de voz num pool de processos: cada worker tem o seu motor de TTS.
+
+O pyttsx3 não é thread-safe (runAndWait roda o laço do driver; no Windows o
+SAPI ainda exige COM inicializado na thread), então um motor global chamado
+pelas threads do Flask serializa as respostas e quebra com requisições
+simultâneas. Aqui cada processo do pool cria o seu motor uma vez, os pedidos
+entram na fila do pool e voltam como bytes de WAV.
+
+Backends (TTS_BACKEND):
+- 'espeak': chama o espeak-ng/espeak com --stdout, o WAV vem pelo pipe;
+- 'pyttsx3': motor do sistema (SAPI5 no Windows); o pyttsx3 só sabe gravar em
+  arquivo, então cada worker usa um arquivo de rascunho próprio, fora do
+  temp_audios, reescrito a cada pedido e apagado quando o worker termina;
+- 'auto': espeak se houver o executável, senão pyttsx3.
+
+Para respostas longas, falar_em_fluxo quebra o texto em frases conforme ele
+chega (ex.: o streaming do Gemini) e sintetiza cada uma assim que fica
+completa: o primeiro áudio sai depois de uma frase, não do texto inteiro.
+"""
+import io
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import util
+
+# ========== CONFIGS ==========
+TTS_BACKEND = os.environ.get('TTS_BACKEND', 'auto')
+# Cada worker tem um motor carregado; 2 atendem respostas simultâneas sem pesar na memória
+NUM_WORKERS = int(os.environ.get('TTS_WORKERS', 2))
+VELOCIDADE = 150  # palavras por minuto, como no app6
+VOLUME = 1.0
+VOZ_ESPEAK = 'pt-br'
+TIMEOUT = float(os.environ.get('TTS_TIMEOUT', 60))
+# Frases mais curtas que isso juntam com a seguinte ("Sim." sozinho vira um segmento
+# de meio segundo); sem pontuação, o texto é cortado num espaço perto do máximo
+MIN_CARACTERES_FRASE = 25
+MAX_CARACTERES_FRASE = 300
+ABREVIACOES = {'sr', 'sra', 'dr', 'dra', 'prof', 'profa', 'ex', 'p', 'pág', 'etc', 'obs', 'fig',
+               'cap', 'n', 'nº', 'vol', 'art'}
+
+_FIM_FRASE = re.compile(r'(?<=[.!?…:;])\s+|\n\s*')
+_ULTIMA_PALAVRA = re.compile(r'(\w+)\.$')
+_MARCACAO = re.compile(r'<[^>]+>|[*_#`]+|^\s*[-•]\s+', re.MULTILINE)
+
+_pool = None
+_pool_config = None
+_trava_pool = threading.Lock()  # as threads do Flask chegam juntas no primeiro pedido
+
+# Estado de cada processo worker
+_backend = None
+_engine = None
+_rascunho = None
+
+
+# ========== LADO DO WORKER ==========
+def _executavel_espeak():
+    return shutil.which('espeak-ng') or shutil.which('espeak')
+
+
+def _criar_engine():
+    import pyttsx3
+    engine = pyttsx3.init()
+    voices = engine.getProperty('voices')
+    for voice in voices:
+        if "brazil" in voice.name.lower() or "portuguese" in voice.name.lower():
+            engine.setProperty('voice', voice.id)
+            break
+    else:
+        if voices:
+            engine.setProperty('voice', voices[0].id)
+    engine.setProperty('rate', VELOCIDADE)
+    engine.setProperty('volume', VOLUME)
+    return engine
+
+
+def _inicializar_worker(backend):
+    """Carrega o motor do worker uma vez (o pyttsx3 leva centenas de ms para iniciar)"""
+    global _backend, _engine, _rascunho
+    if backend == 'auto':
+        backend = 'espeak' if _executavel_espeak() else 'pyttsx3'
+    _backend = backend
+    if backend == 'pyttsx3':
+        _engine = _criar_engine()
+        pasta = tempfile.mkdtemp(prefix='tts_')
+        # atexit não roda nos processos do multiprocessing; o Finalize roda na saída do worker
+        util.Finalize(None, shutil.rmtree, args=(pasta, True), exitpriority=0)
+        _rascunho = os.path.join(pasta, 'fala.wav')
+
+
+def _corrigir_tamanhos(wav):
+    """Escrevendo num pipe, o espeak não sabe o tamanho do áudio e deixa um valor de
+    reserva no cabeçalho; aqui entram os tamanhos reais"""
+    dados = wav.find(b'data', 12)
+    if wav[:4] != b'RIFF' or dados < 0:
+        return wav
+    wav = bytearray(wav)
+    wav[4:8] = (len(wav) - 8).to_bytes(4, 'little')
+    wav[dados + 4:dados + 8] = (len(wav) - dados - 8).to_bytes(4, 'little')
+    return bytes(wav)
+
+
+def _sintetizar_espeak(texto, velocidade, volume):
+    comando = [_executavel_espeak(), '-v', VOZ_ESPEAK, '-s', str(velocidade),
+               '-a', str(int(volume * 100)), '--stdout']
+    # Texto pela entrada padrão: não esbarra no limite de tamanho da linha de comando
+    saida = subprocess.run(comando, input=texto.encode('utf-8'), capture_output=True, check=True)
+    return _corrigir_tamanhos(saida.stdout)
+
+
+def _sintetizar_pyttsx3(texto, velocidade, volume):
+    _engine.setProperty('rate', velocidade)
+    _engine.setProperty('volume', volume)
+    _engine.save_to_file(texto, _rascunho)
+    _engine.runAndWait()
+    with open(_rascunho, 'rb') as f:
+        return f.read()
+
+
+def _sintetizar(texto, velocidade, volume):
+    """Tarefa do worker: WAV do texto"""
+    if callable(_backend):
+        return _backend(texto, velocidade, volume)
+    if _backend == 'espeak':
+        return _sintetizar_espeak(texto, velocidade, volume)
+    return _sintetizar_pyttsx3(texto, velocidade, volume)
+
+
+# ========== LADO DO SERVIDOR ==========
+def obter_pool(workers=None, backend=None):
+    """Pool compartilhado, recriado se o tamanho ou o backend mudar.
+
+    `backend` também aceita uma função (texto, velocidade, volume) -> bytes,
+    definida no nível de um módulo (os benchmarks usam um sintetizador falso).
+    """
+    global _pool, _pool_config
+    workers = workers or NUM_WORKERS
+    backend = backend or TTS_BACKEND
+    with _trava_pool:
+        if _pool is None or _pool_config != (workers, backend):
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker,
+                                        initargs=(backend,))
+            _pool_config = (workers, backend)
+        return _pool
+
+
+def encerrar_pool():
+    global _pool, _pool_config
+    with _trava_pool:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _pool_config = None
+
+
+def submeter(funcao, *args):
+    """Roda `funcao(*args)` num worker do pool (o atual, se já existe), onde o motor já
+    está carregado; `funcao` fica no nível de um módulo e pode chamar _sintetizar"""
+    pool = _pool if _pool is not None else obter_pool()
+    return pool.submit(funcao, *args)
+
+
+def enviar(texto, velocidade=None, volume=None):
+    """Põe o texto na fila do pool e devolve o Future com os bytes do WAV"""
+    return submeter(_sintetizar, texto, velocidade or VELOCIDADE, VOLUME if volume is None else volume)
+
+
+def voz(backend=None):
+    """Identificador da voz que o pool usa (ou usaria), para chaves de cache"""
+    if backend is None:
+        backend = _pool_config[1] if _pool_config else TTS_BACKEND
+    if callable(backend):
+        return f"{backend.__module__}.{backend.__qualname__}"
+    if backend == 'auto':
+        backend = 'espeak' if _executavel_espeak() else 'pyttsx3'
+    # O pyttsx3 escolhe a primeira voz "brazil"/"portuguese" do sistema
+    return f"espeak:{VOZ_ESPEAK}" if backend == 'espeak' else 'pyttsx3:pt'
+
+
+def sintetizar(texto, velocidade=None, volume=None, timeout=TIMEOUT):
+    """Bytes de um WAV com o texto falado; pode ser chamado de várias threads"""
+    try:
+        return enviar(texto, velocidade, volume).result(timeout)
+    except BrokenProcessPool:
+        # Um driver de TTS que derruba o processo não deve derrubar o serviço
+        print("\033[31mPool de TTS quebrado; recriando os workers\033[0m")
+        encerrar_pool()
+        return enviar(texto, velocidade, volume).result(timeout)
+
+
+# ========== FALA EM FLUXO ==========
+def _para_fala(texto):
+    """Tira tags, marcação de markdown e marcadores de lista, que o motor leria em voz alta"""
+    return ' '.join(_MARCACAO.sub(' ', texto).split())
+
+
+def _proximo_corte(texto, min_caracteres, max_caracteres):
+    """Posição onde termina a primeira frase completa do texto (None se ainda não há)"""
+    for fim in _FIM_FRASE.finditer(texto):
+        frase = texto[:fim.start()].strip()
+        abreviacao = _ULTIMA_PALAVRA.search(frase)
+        if len(frase) < min_caracteres or (abreviacao and abreviacao.group(1).lower() in ABREVIACOES):
+            continue
+        return fim.end()
+    if len(texto) > max_caracteres:
+        espaco = texto.rfind(' ', 0, max_caracteres)
+        return espaco + 1 if espaco > 0 else max_caracteres
+    return None
+
+
+def frases(pedacos, min_caracteres=MIN_CARACTERES_FRASE, max_caracteres=MAX_CARACTERES_FRASE):
+    """Gera as frases de um texto que chega em pedaços, cada uma assim que termina"""
+    pendente = ''
+    for pedaco in pedacos:
+        pendente += pedaco
+        while (corte := _proximo_corte(pendente, min_caracteres, max_caracteres)) is not None:
+            frase, pendente = _para_fala(pendente[:corte]), pendente[corte:]
+            if frase:
+                yield frase
+    frase = _para_fala(pendente)
+    if frase:
+        yield frase
+
+
+def falar_em_fluxo(pedacos, velocidade=None, mensagem_erro=None):
+    """Gera o WAV de cada frase, na ordem, enquanto o texto ainda está chegando.
+
+    Uma thread lê `pedacos` e põe cada frase na fila do pool assim que ela fecha,
+    então a síntese de uma frase corre junto com a geração das seguintes. Se a
+    leitura falhar no meio, `mensagem_erro` (se dada) é falada no lugar do resto.
+    """
+    futuros = queue.Queue()
+
+    def produzir():
+        try:
+            for frase in frases(pedacos):
+                futuros.put(enviar(frase, velocidade))
+        except Exception as e:
+            print(f"\033[31mErro no texto da fala: {e}\033[0m")
+            if mensagem_erro:
+                futuros.put(enviar(mensagem_erro, velocidade))
+        finally:
+            futuros.put(None)
+
+    threading.Thread(target=produzir, name='tts-frases', daemon=True).start()
+    while (futuro := futuros.get()) is not None:
+        yield futuro.result(TIMEOUT)
+
+
+def segmento(wav):
+    """Enquadra um WAV para a resposta em fluxo: 4 bytes de tamanho (big-endian) + o WAV"""
+    return len(wav).to_bytes(4, 'big') + wav
+
+
+def duracao(wav):
+    """Segundos de áudio de um WAV em bytes"""
+    with wave.open(io.BytesIO(wav)) as arquivo:
+        return arquivo.getnframes() / arquivo.getframerate()
@@ -0,0 +1,65 @@
+// Audiolivro: o servidor sintetiza o documento parágrafo a parágrafo (em cache) e o
+// <audio> busca por Range só o trecho que vai tocar; o índice leva a cada parágrafo
+const botaoAudiolivro = document.getElementById('audiolivro');
+const painelAudiolivro = document.getElementById('painel-audiolivro');
+const playerAudiolivro = document.getElementById('player-audiolivro');
+const listaAudiolivro = document.getElementById('indice-audiolivro');
+
+async function esperarAudiolivro(urlStatus) {
+    while (true) {
+        const status = await (await fetch(urlStatus)).json();
+        if (status.estado === 'concluido') return;
+        if (status.estado === 'erro' || status.estado === 'cancelado') {
+            throw new Error(status.erro || status.estado);
+        }
+        if (status.total) botaoAudiolivro.textContent = `🎧 Gerando ${status.feitos}/${status.total}`;
+        await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+}
+
+function mostrarIndiceAudiolivro(indice) {
+    listaAudiolivro.innerHTML = '';
+    for (const paragrafo of indice.paragrafos) {
+        const item = document.createElement('li');
+        const botao = document.createElement('button');
+        botao.type = 'button';
+        botao.textContent = paragrafo.texto.length > 80 ? paragrafo.texto.slice(0, 80) + '…' : paragrafo.texto;
+        botao.onclick = () => {
+            playerAudiolivro.currentTime = paragrafo.inicio;
+            playerAudiolivro.play();
+        };
+        item.appendChild(botao);
+        listaAudiolivro.appendChild(item);
+    }
+    playerAudiolivro.ontimeupdate = () => {
+        const agora = playerAudiolivro.currentTime;
+        indice.paragrafos.forEach((p, i) => {
+            listaAudiolivro.children[i].classList.toggle('tocando', agora >= p.inicio && agora < p.inicio + p.segundos);
+        });
+    };
+}
+
+botaoAudiolivro.onclick = async () => {
+    const dados = new FormData();
+    const campoId = document.querySelector('input[name="documento_id"]');
+    if (campoId && campoId.value) dados.append('documento_id', campoId.value);
+    else dados.append('ocr_texto', document.querySelector('.page-content').innerText);
+
+    botaoAudiolivro.disabled = true;
+    try {
+        const resposta = await fetch('/audiolivro', { method: 'POST', body: dados });
+        const livro = await resposta.json();
+        if (!resposta.ok) throw new Error(livro.erro);
+        // 202: há parágrafos novos sendo sintetizados; 200: tudo já estava no cache
+        if (livro.status) await esperarAudiolivro(livro.status);
+        mostrarIndiceAudiolivro(await (await fetch(livro.indice)).json());
+        playerAudiolivro.src = livro.audio;
+        painelAudiolivro.hidden = false;
+        playerAudiolivro.play();
+    } catch (erro) {
+        alert('Erro ao gerar o audiolivro: ' + erro.message);
+    } finally {
+        botaoAudiolivro.disabled = false;
+        botaoAudiolivro.textContent = '🎧 Audiolivro';
+    }
+};
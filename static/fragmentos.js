@@ -0,0 +1,37 @@
+// Reestruturação em streaming: cada fragmento do HTML do Gemini chega seguido de
+// <script>tipografarFragmento(document.currentScript)</script>. Carregado no <head>
+// antes do MathJax, porque a configuração precisa existir quando ele iniciar.
+//
+// MathJax.typesetPromise espera a página terminar de carregar, o que só acontece
+// quando a resposta inteira chegou; MathJax.typeset (síncrono) não espera, então
+// cada fragmento é tipografado assim que aparece.
+const fragmentosPendentes = [];
+
+function tipografarElemento(el) {
+    try {
+        MathJax.typeset([el]);
+    } catch (erro) {
+        // Alguma extensão ainda carregando: tenta de novo quando a página terminar
+        MathJax.typesetPromise([el]).catch(e => console.error('MathJax:', e));
+    }
+}
+
+function tipografarFragmento(script) {
+    const fragmento = script.previousElementSibling;
+    script.remove();  // não vai junto no "Salvar"
+    if (window.MathJax && typeof MathJax.typeset === 'function' && MathJax.startup.document) {
+        tipografarElemento(fragmento);
+    } else {
+        fragmentosPendentes.push(fragmento);
+    }
+}
+
+window.MathJax = {
+    startup: {
+        ready() {
+            MathJax.startup.defaultReady();
+            // Fragmentos que chegaram antes de o MathJax carregar
+            fragmentosPendentes.splice(0).forEach(tipografarElemento);
+        }
+    }
+};
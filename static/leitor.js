@@ -0,0 +1,94 @@
+let currentFontSize = 16;
+const fonts = ['Atkinson Hyperlegible','Lexend','OpenDyslexicRegular','Verdana','Arial','Times New Roman','Courier New'];
+let currentFontIndex = 0;
+const synth = window.speechSynthesis;
+let utterance, isPaused = false;
+
+function applyFontSize() {
+  document.querySelectorAll('.page-content').forEach(el => {
+    el.style.fontSize = currentFontSize + 'px';
+  });
+}
+
+function applyFontFamily() {
+  const ff = fonts[currentFontIndex];
+  document.querySelectorAll('.page-content').forEach(el => {
+    el.style.fontFamily = ff + ', sans-serif';
+  });
+}
+
+function changeTheme(mode) {
+  document.body.classList.remove('normal-mode','dark-mode','high-contrast-mode');
+  document.body.classList.add(mode + '-mode');
+}
+
+function getTextToSpeak() {
+  const sel = window.getSelection().toString();
+  return sel || document.querySelector('.page-content').innerText;
+}
+
+function speak() {
+  const text = getTextToSpeak();
+  if (!text) return alert('Nada para ler');
+  if (synth.speaking) return;
+  utterance = new SpeechSynthesisUtterance(text);
+  utterance.lang = 'pt-BR';
+  synth.speak(utterance);
+}
+
+function pauseSpeech() { if (synth.speaking) { synth.pause(); isPaused = true; } }
+function resumeSpeech() { if (isPaused) { synth.resume(); isPaused = false; } }
+function stopSpeech() { synth.cancel(); isPaused = false; }
+
+document.getElementById('decreaseFont').onclick = () => {
+  currentFontSize = Math.max(10, currentFontSize - 2);
+  applyFontSize();
+};
+document.getElementById('increaseFont').onclick = () => {
+  currentFontSize = Math.min(40, currentFontSize + 2);
+  applyFontSize();
+};
+document.getElementById('fontSelector').onchange = e => {
+  currentFontIndex = fonts.indexOf(e.target.value);
+  applyFontFamily();
+};
+
+document.getElementById('play').onclick = () => {
+  if (isPaused) resumeSpeech();
+  else speak();
+};
+document.getElementById('pause').onclick = pauseSpeech;
+document.getElementById('stop').onclick = stopSpeech;
+
+document.getElementById('themeSelector').onchange = e => {
+  changeTheme(e.target.value);
+};
+
+function copyText() {
+  const text = document.querySelector('.page-content').innerText;
+  navigator.clipboard.writeText(text).then(() => alert('Texto copiado!'));
+}
+
+async function saveHTML() {
+  // O CSS vem de /static: embute no arquivo salvo para ele continuar legível offline
+  const copia = document.documentElement.cloneNode(true);
+  for (const link of copia.querySelectorAll('link[rel="stylesheet"][href^="/static/"]')) {
+    const style = document.createElement('style');
+    style.textContent = await (await fetch(link.getAttribute('href'))).text();
+    link.replaceWith(style);
+  }
+  const content = copia.outerHTML;
+  const blob = new Blob([content], { type: 'text/html' });
+  const link = document.createElement('a');
+  link.href = URL.createObjectURL(blob);
+  link.download = 'documento_acessivel.html';
+  link.click();
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  applyFontSize();
+  applyFontFamily();
+  changeTheme('normal');
+  document.getElementById('fontSelector').value = fonts[0];
+  document.getElementById('themeSelector').value = 'normal';
+});
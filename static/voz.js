@@ -0,0 +1,118 @@
+let mediaRecorder;
+let audioChunks = [];
+const talkToAIButton = document.getElementById('talkToAI');
+const recordingStatus = document.getElementById('recordingStatus');
+
+// Resposta em fluxo do /ask_ai_voice: segmentos [4 bytes de tamanho][WAV], um por frase,
+// tocados em sequência enquanto os próximos ainda estão chegando
+async function tocarSegmentos(response) {
+    const leitor = response.body.getReader();
+    const fila = [];
+    let pendente = new Uint8Array(0);
+    let tocando = false;
+    let terminou = false;
+
+    const tocarProximo = () => {
+        if (!fila.length) {
+            tocando = false;
+            if (terminou) recordingStatus.textContent = 'Pronto!';
+            return;
+        }
+        tocando = true;
+        const url = fila.shift();
+        const audio = new Audio(url);
+        // Segmento que não decodifica (ou play() recusado) é pulado; erro e
+        // rejeição podem vir os dois para o mesmo segmento, então avança uma vez só
+        let avancou = false;
+        const avancar = () => {
+            if (avancou) return;
+            avancou = true;
+            URL.revokeObjectURL(url);
+            tocarProximo();
+        };
+        audio.onended = avancar;
+        audio.onerror = avancar;
+        audio.play().catch(avancar);
+    };
+
+    while (true) {
+        const { done, value } = await leitor.read();
+        if (done) break;
+        const junto = new Uint8Array(pendente.length + value.length);
+        junto.set(pendente);
+        junto.set(value, pendente.length);
+        pendente = junto;
+        while (pendente.length >= 4) {
+            const tamanho = new DataView(pendente.buffer, pendente.byteOffset).getUint32(0);
+            if (pendente.length < 4 + tamanho) break;
+            const wav = new Blob([pendente.slice(4, 4 + tamanho)], { type: 'audio/wav' });
+            fila.push(URL.createObjectURL(wav));
+            pendente = pendente.slice(4 + tamanho);
+            recordingStatus.textContent = 'Respondendo...';
+            if (!tocando) tocarProximo();
+        }
+    }
+    terminou = true;
+    if (!tocando) recordingStatus.textContent = 'Pronto!';
+}
+
+// LÓGICA PARA INTERAÇÃO COM A IA POR VOZ - AJUSTADA PARA GARANTIR COMPATIBILIDADE
+talkToAIButton.onclick = async () => {
+    if (mediaRecorder && mediaRecorder.state === 'recording') {
+        mediaRecorder.stop();
+        talkToAIButton.textContent = '🗣️ Falar com IA';
+        recordingStatus.textContent = '';
+    } else {
+        try {
+            const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+
+            // Definir o mimeType para WebM com Opus, que é um formato eficiente e amplamente suportado
+            // pelo MediaRecorder; o servidor decodifica em memória (audio_voz: PyAV ou ffmpeg por pipe).
+            const options = { mimeType: 'audio/webm;codecs=opus' };
+            mediaRecorder = new MediaRecorder(stream, options);
+
+            audioChunks = [];
+
+            mediaRecorder.ondataavailable = event => {
+                audioChunks.push(event.data);
+            };
+
+            mediaRecorder.onstop = async () => {
+                const audioBlob = new Blob(audioChunks, { type: mediaRecorder.mimeType }); // Usa o tipo MIME real da gravação
+                const formData = new FormData();
+                formData.append('audio', audioBlob, 'query.webm'); // Envia como .webm
+                formData.append('stream', '1'); // áudio frase a frase (tocarSegmentos)
+
+                recordingStatus.textContent = 'Enviando e processando...';
+
+                try {
+                    const response = await fetch('/ask_ai_voice', {
+                        method: 'POST',
+                        body: formData
+                    });
+
+                    if (response.ok) {
+                        await tocarSegmentos(response);
+                    } else {
+                        const errorText = await response.text();
+                        recordingStatus.textContent = `Erro: ${errorText}`;
+                        alert('Erro ao se comunicar com a IA: ' + errorText);
+                    }
+                } catch (error) {
+                    recordingStatus.textContent = `Erro de rede: ${error.message}`;
+                    console.error('Erro ao enviar áudio para a IA:', error);
+                    alert('Erro de conexão ao enviar áudio.');
+                } finally {
+                    stream.getTracks().forEach(track => track.stop()); // Para o microfone
+                }
+            };
+
+            mediaRecorder.start();
+            talkToAIButton.textContent = '🔴 Parar Gravação';
+            recordingStatus.textContent = 'Gravando...';
+        } catch (error) {
+            console.error('Erro ao acessar o microfone:', error);
+            alert('Não foi possível acessar o microfone. Verifique as permissões.');
+        }
+    }
+};
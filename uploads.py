@@ -0,0 +1,68 @@
+import io
+import os
+import tempfile
+
+from flask import Request, request
+
+# ========== CONFIGS ==========
+MB = 1024 * 1024
+# Requisições até este tamanho ficam só na memória; acima disso o arquivo vai
+# direto para um temporário enquanto chega (UPLOAD_MEMORIA_MAX_MB)
+LIMITE_MEMORIA = int(os.environ.get('UPLOAD_MEMORIA_MAX_MB', 16)) * MB
+# Tamanho máximo aceito; acima disso o Flask responde 413 sem ler o corpo
+MAX_UPLOAD = int(os.environ.get('UPLOAD_MAX_MB', 200)) * MB
+# Pasta dos temporários (padrão: a do sistema)
+PASTA_TEMPORARIOS = os.environ.get('UPLOAD_TMP') or None
+
+
+def _remover(caminhos):
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+class RequisicaoUpload(Request):
+    """Request do Flask que decide onde cada upload fica e garante a limpeza.
+
+    Os temporários passam para a resposta e são apagados quando o servidor a
+    fecha, o que em respostas em streaming (stream_template) só acontece depois
+    da última parte ou da desconexão do cliente. Se a requisição falhar antes de
+    haver resposta, o `close()` apaga.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        if total_content_length is not None and total_content_length <= LIMITE_MEMORIA:
+            return io.BytesIO()
+        # Com nome: os workers do OCR abrem o arquivo pelo caminho
+        arquivo = tempfile.NamedTemporaryFile(prefix='upload_', dir=PASTA_TEMPORARIOS, delete=False)
+        self.__dict__.setdefault('_temporarios', []).append(arquivo.name)
+        return arquivo
+
+    def close(self):
+        super().close()
+        _remover(self.__dict__.pop('_temporarios', ()))
+
+
+def _entregar_temporarios(response):
+    temporarios = request.__dict__.pop('_temporarios', None)
+    if temporarios:
+        response.call_on_close(lambda: _remover(temporarios))
+    return response
+
+
+def configurar(app):
+    app.request_class = RequisicaoUpload
+    app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD
+    app.after_request(_entregar_temporarios)
+
+
+def conteudo(arquivo):
+    """O upload pronto para o motor de OCR: bytes se está na memória, caminho se foi para o disco"""
+    stream = arquivo.stream
+    if isinstance(stream, io.BytesIO):
+        return stream.getvalue()  # sem cópia: o BytesIO devolve o próprio buffer
+    stream.flush()
+    return stream.name